@@ -1,22 +1,74 @@
 """API routes for health check endpoints."""
-from flask import Blueprint, request, jsonify
+import base64
+import binascii
+import hashlib
+import json
+import math
+import time
+from flask import Blueprint, Response, current_app, g, request, jsonify
 from datetime import datetime
-from app.services.health_check import get_instance_health
+from app.services.health_check import (
+    get_instance_health,
+    get_instances_health,
+)
+from app.infrastructure.cloud import resilience
+from app.infrastructure.cloud.resilience import UpstreamUnavailableError
+from app.infrastructure.logging import logger
 from app.infrastructure.logging.logger import log_request
+from app.infrastructure.metrics.prometheus import (
+    HEALTH_RESULTS,
+    REQUEST_LATENCY,
+    RESPONSES,
+    STAGE_LATENCY,
+    render_counter,
+    render_gauge,
+    render_metrics,
+)
+from app.services.cache import CachedResult
+from app.services.summary import HEALTH_VALUES
+from app.services.tag_index import (
+    FIELD_AZ,
+    FIELD_HEALTH,
+    FIELD_STATE,
+    FIELD_TAG,
+    parse_tag_filter,
+)
 
 health_bp = Blueprint("health", __name__, url_prefix="/api")
 
 
+@health_bp.before_request
+def start_request_timer():
+    """Record when the request started, for the latency histogram."""
+    g.request_started = time.perf_counter()
+
+
+@health_bp.after_request
+def record_request_metrics(response):
+    """Record total request latency and the response status code."""
+    started = g.get("request_started")
+    if started is not None:
+        REQUEST_LATENCY.observe(
+            time.perf_counter() - started,
+            endpoint=request.endpoint or "unknown",
+        )
+    RESPONSES.inc(status=response.status_code)
+    return response
+
+
 def check_api_key(f):
     """Decorator to validate API key in request header.
 
     Checks if the X-API-Key header is present and valid.
-    Returns 401 Unauthorized if missing or invalid.
+    Returns 401 Unauthorized if missing or invalid, and 429 Too Many
+    Requests if the key has used up its quota.
     """
     def decorated_function(*args, **kwargs):
-        from flask import current_app
-
-        api_key = request.headers.get("X-API-Key")
+        key_ring = current_app.extensions["api_keys"]
+        with STAGE_LATENCY.time(stage="api_key_check"):
+            api_key = request.headers.get("X-API-Key")
+            digest = key_ring.verify(api_key)
+            valid = digest is not None
 
         if not api_key:
             log_request(
@@ -28,7 +80,7 @@ def check_api_key(f):
             )
             return jsonify({"error": "Missing API key"}), 401
 
-        if api_key not in current_app.config["VALID_API_KEYS"]:
+        if not valid:
             log_request(
                 method=request.method,
                 path=request.path,
@@ -38,12 +90,163 @@ def check_api_key(f):
             )
             return jsonify({"error": "Invalid API key"}), 401
 
+        retry_after = key_ring.consume(digest)
+        if retry_after:
+            log_request(
+                method=request.method,
+                path=request.path,
+                api_key=api_key,
+                status_code=429,
+                result="Rate limit exceeded",
+            )
+            return (
+                jsonify({"error": "Rate limit exceeded"}),
+                429,
+                {"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
         return f(*args, **kwargs)
 
     decorated_function.__name__ = f.__name__
     return decorated_function
 
 
+def lookup_instance_health(instance_id):
+    """Resolve instance health from the fleet snapshot or result cache.
+
+    When the fleet poller is enabled and has completed a poll, the answer
+    comes straight from its snapshot without any AWS call. Otherwise the
+    lookup goes through the app's result cache, if enabled, and concurrent
+    misses for the same instance share a single AWS lookup. With several
+    regions configured, the lookup fans out to find the instance's region;
+    the poller's snapshot already covers every configured region.
+
+    Args:
+        instance_id (str): AWS EC2 instance ID
+
+    Returns:
+        CachedResult: Health status dict (or None if not found) with the
+                      time it was fetched and its age in milliseconds
+    """
+    poller = current_app.extensions.get("fleet_poller")
+    if poller is not None:
+        snapshot = poller.snapshot
+        if snapshot is not None:
+            age = snapshot.age_seconds()
+            return CachedResult(
+                value=snapshot.get(instance_id),
+                cached_at=snapshot.taken_at,
+                age_ms=int(age * 1000),
+                stale=age > 2 * poller.interval,
+                max_age=max(0, int(poller.interval - age)),
+            )
+
+    # Read config here: load() also runs on the cache's refresh thread,
+    # which has no application context
+    mode = current_app.config["HEALTH_RESOLUTION_MODE"]
+    default_region = current_app.config["AWS_REGIONS"][0]
+    single_flight = current_app.extensions.get("single_flight")
+    resolver = current_app.extensions.get("region_resolver")
+
+    def fetch():
+        if resolver is None:
+            return get_instance_health(
+                instance_id, mode=mode, region=default_region
+            )
+        return resolver.resolve(
+            instance_id,
+            lambda region: get_instance_health(
+                instance_id, mode=mode, region=region
+            ),
+        )
+
+    def load():
+        if single_flight is None:
+            return fetch()
+        if resolver is None:
+            region = default_region
+        else:
+            region = resolver.index.get(instance_id) or "*"
+        return single_flight.do((region, instance_id), fetch)
+
+    cache = current_app.extensions.get("health_cache")
+    if cache is None:
+        return CachedResult(
+            value=load(),
+            cached_at=datetime.utcnow(),
+            age_ms=0,
+            stale=False,
+        )
+    return cache.get(instance_id, load)
+
+
+def lookup_instances_health(instance_ids):
+    """Resolve the health of many instances in as few AWS calls as possible.
+
+    With several regions configured, each instance is looked up in its
+    remembered region, and the rest are searched for in every region.
+
+    Args:
+        instance_ids (list): AWS EC2 instance IDs
+
+    Returns:
+        dict: Maps every requested instance ID to a health status dict,
+              or None if not found
+    """
+    max_workers = current_app.config["BATCH_MAX_WORKERS"]
+    resolver = current_app.extensions.get("region_resolver")
+    if resolver is None:
+        return get_instances_health(
+            instance_ids,
+            max_workers=max_workers,
+            region=current_app.config["AWS_REGIONS"][0],
+        )
+    return resolver.resolve_many(
+        instance_ids,
+        lambda region, ids: get_instances_health(
+            ids, max_workers=max_workers, region=region
+        ),
+    )
+
+
+def health_etag(health_status):
+    """Return a strong ETag for an instance's health.
+
+    Derived from the state, status check and health value only, so it
+    changes exactly when the response's health content changes.
+    """
+    fingerprint = "|".join((
+        str(health_status.get("state")),
+        str(health_status.get("status_code")),
+        str(health_status.get("health")),
+    ))
+    return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:16]
+
+
+def upstream_unavailable(error, api_key):
+    """Build the 503 response for a call the guard refused to make.
+
+    Args:
+        error (UpstreamUnavailableError): Circuit-open or rate-limit error
+        api_key (str): Caller's API key, for the request log
+
+    Returns:
+        tuple: JSON response, 503 status and a Retry-After header
+    """
+    log_request(
+        method=request.method,
+        path=request.path,
+        api_key=api_key,
+        status_code=503,
+        result=f"EC2 unavailable: {str(error)}",
+    )
+    return (
+        jsonify({"error": "EC2 is temporarily unavailable"}),
+        503,
+        {"Retry-After": str(max(1, math.ceil(error.retry_after)))},
+    )
+
+
 @health_bp.route("/health/<instance_id>", methods=["GET"])
 @check_api_key
 def health_check(instance_id):
@@ -57,14 +260,28 @@ def health_check(instance_id):
 
     Status Codes:
         200: Instance health retrieved successfully
+        304: Health unchanged since the ETag sent in If-None-Match
         401: Missing or invalid API key
         404: Instance not found
         500: AWS API error
+        503: EC2 circuit open or rate limited, and nothing cached
     """
     api_key = request.headers.get("X-API-Key")
 
     try:
-        health_status = get_instance_health(instance_id)
+        try:
+            cached = lookup_instance_health(instance_id)
+        except UpstreamUnavailableError as e:
+            # Serve the last known result rather than queueing on AWS
+            cache = current_app.extensions.get("health_cache")
+            cached = cache.peek(instance_id) if cache is not None else None
+            if cached is None or cached.value is None:
+                return upstream_unavailable(e, api_key)
+        health_status = cached.value
+        # Feed streams and the fleet summary; a no-op if nothing changed
+        current_app.extensions["health_events"].publish(
+            {instance_id: health_status}
+        )
 
         if health_status is None:
             log_request(
@@ -76,13 +293,34 @@ def health_check(instance_id):
             )
             return jsonify({"error": "Instance not found"}), 404
 
+        etag = health_etag(health_status)
+        headers = {
+            "ETag": f'"{etag}"',
+            "Cache-Control": f"max-age={cached.max_age}",
+        }
+        if request.if_none_match.contains_weak(etag):
+            log_request(
+                method=request.method,
+                path=request.path,
+                api_key=api_key,
+                status_code=304,
+                result="Not modified",
+            )
+            return Response(status=304, headers=headers)
+
         response = {
             "instance_id": instance_id,
             "state": health_status.get("state"),
             "status_code": health_status.get("status_code"),
             "health": health_status.get("health"),
             "timestamp": datetime.utcnow().isoformat() + "Z",
+            "cached_at": cached.cached_at.isoformat() + "Z",
+            "age_ms": cached.age_ms,
         }
+        if cached.stale:
+            response["stale"] = True
+
+        HEALTH_RESULTS.inc(health=health_status.get("health"))
 
         log_request(
             method=request.method,
@@ -92,7 +330,7 @@ def health_check(instance_id):
             result=health_status.get("status_code"),
         )
 
-        return jsonify(response), 200
+        return jsonify(response), 200, headers
 
     except Exception as e:
         log_request(
@@ -106,3 +344,763 @@ def health_check(instance_id):
             jsonify({"error": "Unable to retrieve instance health"}),
             500,
         )
+
+
+@health_bp.route("/health/<instance_id>/history", methods=["GET"])
+@check_api_key
+def health_history(instance_id):
+    """Get an instance's recent health transitions and flap count.
+
+    Resolves the instance's current health the same way as
+    ``/api/health/<instance_id>`` (which also records it), then reports
+    the transitions kept for it, oldest first.
+
+    Query Parameters:
+        window: Seconds back to count transitions over
+                (default HISTORY_FLAP_WINDOW)
+
+    Returns:
+        JSON response with 'transitions', 'flap_count' within the window
+        and 'flapping' once it reaches HISTORY_FLAP_THRESHOLD
+
+    Status Codes:
+        200: History returned
+        400: Invalid window
+        401: Missing or invalid API key
+        404: Instance not found and no history recorded
+        500: AWS API error
+        503: EC2 circuit open or rate limited, and no history recorded
+    """
+    api_key = request.headers.get("X-API-Key")
+    try:
+        window = float(request.args.get(
+            "window", current_app.config["HISTORY_FLAP_WINDOW"]
+        ))
+    except ValueError:
+        window = 0
+    if not 0 < window < math.inf:
+        error = "window must be a positive number of seconds"
+        log_request(
+            method=request.method,
+            path=request.path,
+            api_key=api_key,
+            status_code=400,
+            result=error,
+        )
+        return jsonify({"error": error}), 400
+
+    history = current_app.extensions["health_history"]
+    health = None
+    try:
+        try:
+            health_status = lookup_instance_health(instance_id).value
+            current_app.extensions["health_events"].publish(
+                {instance_id: health_status}
+            )
+            if health_status is not None:
+                health = health_status.get("health")
+        except UpstreamUnavailableError as e:
+            # Recorded history is still worth serving while EC2 is down
+            if history.history(instance_id) is None:
+                return upstream_unavailable(e, api_key)
+    except Exception as e:
+        log_request(
+            method=request.method,
+            path=request.path,
+            api_key=api_key,
+            status_code=500,
+            result=f"AWS API error: {str(e)}",
+        )
+        return (
+            jsonify({"error": "Unable to retrieve instance health"}),
+            500,
+        )
+
+    threshold = current_app.config["HISTORY_FLAP_THRESHOLD"]
+    result = history.history(instance_id, window, threshold)
+    if result is None:
+        log_request(
+            method=request.method,
+            path=request.path,
+            api_key=api_key,
+            status_code=404,
+            result="Instance not found",
+        )
+        return jsonify({"error": "Instance not found"}), 404
+
+    log_request(
+        method=request.method,
+        path=request.path,
+        api_key=api_key,
+        status_code=200,
+        result=f"History: {result['flap_count']} transitions",
+    )
+    return jsonify({
+        "instance_id": instance_id,
+        "health": health,
+        "transitions": [
+            dict(
+                transition,
+                timestamp=datetime.utcfromtimestamp(
+                    transition["timestamp"]
+                ).isoformat() + "Z",
+            )
+            for transition in result["transitions"]
+        ],
+        "truncated": result["truncated"],
+        "window_seconds": window,
+        "flap_count": result["flap_count"],
+        "flap_threshold": threshold,
+        "flapping": result["flapping"],
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }), 200
+
+
+@health_bp.route("/health/batch", methods=["POST"])
+@check_api_key
+def batch_health_check():
+    """Get health status of many EC2 instances in one request.
+
+    Expects a JSON body of the form ``{"instance_ids": ["i-...", ...]}``.
+    Unknown IDs are reported per instance and never fail the batch.
+
+    Returns:
+        JSON response mapping each instance ID to its health status
+
+    Status Codes:
+        200: Batch resolved (individual IDs may be not found)
+        400: Missing or malformed instance_ids list
+        401: Missing or invalid API key
+        500: AWS API error
+        503: EC2 circuit open or rate limited
+    """
+    api_key = request.headers.get("X-API-Key")
+    payload = request.get_json(silent=True) or {}
+    instance_ids = payload.get("instance_ids")
+
+    error = None
+    if not isinstance(instance_ids, list) or not instance_ids:
+        error = "instance_ids must be a non-empty list"
+    elif not all(isinstance(i, str) and i for i in instance_ids):
+        error = "instance_ids must contain only non-empty strings"
+    elif len(instance_ids) > current_app.config["BATCH_MAX_INSTANCES"]:
+        error = (
+            "instance_ids exceeds the limit of "
+            f"{current_app.config['BATCH_MAX_INSTANCES']}"
+        )
+
+    if error:
+        log_request(
+            method=request.method,
+            path=request.path,
+            api_key=api_key,
+            status_code=400,
+            result=error,
+        )
+        return jsonify({"error": error}), 400
+
+    try:
+        health_by_id = lookup_instances_health(instance_ids)
+    except UpstreamUnavailableError as e:
+        return upstream_unavailable(e, api_key)
+    except Exception as e:
+        log_request(
+            method=request.method,
+            path=request.path,
+            api_key=api_key,
+            status_code=500,
+            result=f"AWS API error: {str(e)}",
+        )
+        return (
+            jsonify({"error": "Unable to retrieve instance health"}),
+            500,
+        )
+
+    current_app.extensions["health_events"].publish(health_by_id)
+
+    results = {}
+    not_found = 0
+    for instance_id, health_status in health_by_id.items():
+        if health_status is None:
+            not_found += 1
+            results[instance_id] = {"error": "Instance not found"}
+        else:
+            HEALTH_RESULTS.inc(health=health_status.get("health"))
+            results[instance_id] = {
+                "state": health_status.get("state"),
+                "status_code": health_status.get("status_code"),
+                "health": health_status.get("health"),
+            }
+
+    log_request(
+        method=request.method,
+        path=request.path,
+        api_key=api_key,
+        status_code=200,
+        result=f"Batch: {len(results)} instances, {not_found} not found",
+    )
+
+    return jsonify({
+        "results": results,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }), 200
+
+
+def instance_row(instance_id, status):
+    """Build the JSON object describing one indexed instance."""
+    return {
+        "instance_id": instance_id,
+        "state": status.get("state"),
+        "status_code": status.get("status_code"),
+        "health": status.get("health"),
+        "availability_zone": status.get("availability_zone"),
+        "tags": status.get("tags") or {},
+    }
+
+
+def encode_cursor(instance_id):
+    """Return an opaque pagination cursor resuming after an instance."""
+    payload = json.dumps({"after": instance_id}).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return the instance ID a cursor resumes after.
+
+    Raises:
+        ValueError: If the cursor was not produced by encode_cursor
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        after = payload["after"]
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError,
+            TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(after, str):
+        raise ValueError("Invalid cursor")
+    return after
+
+
+def parse_query_filters(args):
+    """Turn query parameters into InstanceIndex filters.
+
+    Each ``tag`` parameter is its own filter; ``health``, ``state`` and
+    ``availability_zone`` take comma-separated alternatives.
+
+    Args:
+        args (MultiDict): Request query parameters
+
+    Returns:
+        list: Filters for :meth:`InstanceIndex.query`
+
+    Raises:
+        ValueError: On a malformed tag or unknown health value
+    """
+    filters = []
+    for tag in args.getlist("tag"):
+        key, value = parse_tag_filter(tag)
+        filters.append([(FIELD_TAG, key, value)])
+    for field in (FIELD_HEALTH, FIELD_STATE, FIELD_AZ):
+        if field not in args:
+            continue
+        values = [v.strip() for v in args[field].split(",") if v.strip()]
+        if not values:
+            raise ValueError(f"{field} must not be empty")
+        if field == FIELD_HEALTH:
+            unknown = sorted(set(values) - set(HEALTH_VALUES))
+            if unknown:
+                raise ValueError(f"Unknown health value: {unknown[0]}")
+        filters.append([(field, value) for value in values])
+    return filters
+
+
+@health_bp.route("/health", methods=["GET"])
+@check_api_key
+def health_query():
+    """Get health of every instance matching tag and status filters.
+
+    Answered from an in-memory index of every instance whose health the
+    API has seen (the whole region when the fleet poller is enabled),
+    without calling AWS.
+
+    Query Parameters:
+        tag: ``key:value`` or ``key=value``; repeat to require several
+        health: Comma-separated health values, e.g. ``unhealthy``
+        state: Comma-separated instance states
+        availability_zone: Comma-separated availability zones
+
+    Returns:
+        JSON response with the matching 'instances' and their 'count'
+
+    Status Codes:
+        200: Query answered (possibly with no matches)
+        400: No filters, or a malformed filter
+        401: Missing or invalid API key
+    """
+    api_key = request.headers.get("X-API-Key")
+    try:
+        filters = parse_query_filters(request.args)
+        if not filters:
+            raise ValueError(
+                "At least one of tag, health, state or availability_zone "
+                "is required"
+            )
+    except ValueError as e:
+        log_request(
+            method=request.method,
+            path=request.path,
+            api_key=api_key,
+            status_code=400,
+            result=str(e),
+        )
+        return jsonify({"error": str(e)}), 400
+
+    matches = current_app.extensions["instance_index"].query(filters)
+    instances = [
+        instance_row(instance_id, status)
+        for instance_id, status in matches.items()
+    ]
+
+    log_request(
+        method=request.method,
+        path=request.path,
+        api_key=api_key,
+        status_code=200,
+        result=f"Query: {len(instances)} instances",
+    )
+    return jsonify({
+        "instances": instances,
+        "count": len(instances),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }), 200
+
+
+@health_bp.route("/instances", methods=["GET"])
+@check_api_key
+def list_instances():
+    """List every known instance with its health, in instance ID order.
+
+    Returns JSON pages of ``limit`` instances with an opaque
+    ``next_cursor``. Clients that send ``Accept: application/x-ndjson``
+    instead get every instance after ``cursor`` streamed one JSON object
+    per line, without the response being built in memory.
+
+    Query Parameters:
+        limit: Page size for JSON responses (default INSTANCES_PAGE_SIZE)
+        cursor: ``next_cursor`` from the previous page
+
+    Returns:
+        JSON page with 'instances' and 'next_cursor' (null on the last
+        page), or an application/x-ndjson stream of instance rows
+
+    Status Codes:
+        200: Page or stream returned
+        400: Invalid cursor or limit
+        401: Missing or invalid API key
+    """
+    api_key = request.headers.get("X-API-Key")
+    max_limit = current_app.config["INSTANCES_PAGE_MAX"]
+    error = None
+    after = None
+    try:
+        if request.args.get("cursor"):
+            after = decode_cursor(request.args["cursor"])
+    except ValueError as e:
+        error = str(e)
+    try:
+        limit = int(request.args.get(
+            "limit", current_app.config["INSTANCES_PAGE_SIZE"]
+        ))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= max_limit:
+        error = f"limit must be an integer between 1 and {max_limit}"
+
+    if error:
+        log_request(
+            method=request.method,
+            path=request.path,
+            api_key=api_key,
+            status_code=400,
+            result=error,
+        )
+        return jsonify({"error": error}), 400
+
+    index = current_app.extensions["instance_index"]
+    mimetype = request.accept_mimetypes.best_match(
+        ["application/json", "application/x-ndjson"]
+    )
+
+    if mimetype == "application/x-ndjson":
+        log_request(
+            method=request.method,
+            path=request.path,
+            api_key=api_key,
+            status_code=200,
+            result="Instances: NDJSON stream",
+        )
+
+        def generate():
+            for instance_id, status in index.iter_instances(after):
+                yield json.dumps(
+                    instance_row(instance_id, status),
+                    separators=(",", ":"),
+                ) + "\n"
+
+        return Response(generate(), mimetype="application/x-ndjson")
+
+    rows, more = index.page(after, limit)
+    log_request(
+        method=request.method,
+        path=request.path,
+        api_key=api_key,
+        status_code=200,
+        result=f"Instances: {len(rows)} of {len(index)}",
+    )
+    return jsonify({
+        "instances": [
+            instance_row(instance_id, status) for instance_id, status in rows
+        ],
+        "next_cursor": encode_cursor(rows[-1][0]) if more else None,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }), 200
+
+
+@health_bp.route("/health/summary", methods=["GET"])
+@check_api_key
+def health_summary():
+    """Get instance counts by health and state across the fleet.
+
+    Counts cover every instance whose health the API has seen: the whole
+    region when the fleet poller is enabled, otherwise the instances
+    looked up or streamed so far.
+
+    Query Parameters:
+        by: Optional breakdown, 'availability_zone' or 'tag:<key>'
+
+    Returns:
+        JSON response with 'total', 'by_health', 'by_state' and, when
+        requested, a 'breakdown' of health counts per group
+
+    Status Codes:
+        200: Summary returned
+        400: Unknown breakdown dimension
+        401: Missing or invalid API key
+    """
+    dimension = request.args.get("by") or None
+    if dimension is not None and dimension != "availability_zone" and not (
+        dimension.startswith("tag:") and len(dimension) > len("tag:")
+    ):
+        error = "by must be 'availability_zone' or 'tag:<key>'"
+        log_request(
+            method=request.method,
+            path=request.path,
+            api_key=request.headers.get("X-API-Key"),
+            status_code=400,
+            result=error,
+        )
+        return jsonify({"error": error}), 400
+
+    response = current_app.extensions["fleet_summary"].summary(dimension)
+    if dimension is not None:
+        response["by"] = dimension
+    response["timestamp"] = datetime.utcnow().isoformat() + "Z"
+
+    log_request(
+        method=request.method,
+        path=request.path,
+        api_key=request.headers.get("X-API-Key"),
+        status_code=200,
+        result=f"Summary: {response['total']} instances",
+    )
+    return jsonify(response), 200
+
+
+@health_bp.route("/metrics", methods=["GET"])
+@check_api_key
+def metrics():
+    """Expose request metrics in Prometheus text format.
+
+    Includes latency histograms for whole requests and for each stage
+    (API key check, EC2 calls, log write), counters by status code, health
+    value and AWS error code, running totals for the cache, coalescing,
+    webhooks, streams and log queue, and gauges for current state.
+
+    Returns:
+        text/plain response in Prometheus exposition format
+
+    Status Codes:
+        200: Metrics rendered
+        401: Missing or invalid API key
+    """
+    extra = []
+
+    cache = current_app.extensions.get("health_cache")
+    if cache is not None:
+        extra += render_counter(
+            "health_api_cache_lookups_total",
+            "Result cache lookups by outcome.",
+            {"hit": cache.hits, "stale": cache.stale_hits,
+             "miss": cache.misses},
+            labelname="outcome",
+        )
+        extra += render_gauge(
+            "health_api_cache_entries", "Entries in the result cache.",
+            len(cache),
+        )
+
+    single_flight = current_app.extensions.get("single_flight")
+    if single_flight is not None:
+        stats = single_flight.stats()
+        extra += render_counter(
+            "health_api_coalescing_calls_total",
+            "AWS lookups executed versus coalesced into an in-flight call.",
+            {"executed": stats["executed"],
+             "coalesced": stats["coalesced"]},
+            labelname="outcome",
+        )
+
+    webhooks = current_app.extensions.get("webhooks")
+    if webhooks is not None:
+        stats = webhooks.stats()
+        extra += render_counter(
+            "health_api_webhook_deliveries_total",
+            "Webhook batch deliveries by outcome.",
+            {outcome: stats[outcome]
+             for outcome in ("delivered", "failed", "retried", "dropped")},
+            labelname="outcome",
+        )
+        extra += render_counter(
+            "health_api_webhook_skipped_changes_total",
+            "Health changes left to the process elected to deliver them.",
+            stats["skipped"],
+        )
+        extra += render_gauge(
+            "health_api_webhook_pending",
+            "Webhook deliveries queued or in progress.",
+            stats["pending"],
+        )
+
+    limiter = current_app.extensions["stream_limiter"]
+    extra += render_gauge(
+        "health_api_streams_open", "Event streams open in this worker.",
+        limiter.open_streams,
+    )
+    extra += render_counter(
+        "health_api_streams_rejected_total",
+        "Event streams refused because STREAM_MAX_CONNECTIONS were open.",
+        limiter.rejected,
+    )
+
+    guard = resilience.get_guard()
+    if guard is not None and guard.breaker is not None:
+        extra += render_gauge(
+            "health_api_circuit_open",
+            "1 while the EC2 circuit breaker is open or half-open.",
+            int(guard.breaker.state != resilience.CIRCUIT_CLOSED),
+        )
+    if guard is not None and guard.limiter is not None:
+        extra += render_gauge(
+            "health_api_ec2_rate_limit",
+            "Current outbound EC2 call rate after throttling backoff.",
+            guard.limiter.rate,
+        )
+
+    dropped = logger.dropped_lines()
+    if dropped is not None:
+        extra += render_counter(
+            "health_api_log_dropped_total",
+            "Log lines dropped on queue overflow.",
+            dropped,
+        )
+    errors = logger.write_errors()
+    if errors is not None:
+        extra += render_counter(
+            "health_api_log_write_errors_total",
+            "Log batches that failed to write to disk.",
+            errors,
+        )
+
+    return Response(
+        render_metrics(extra),
+        mimetype="text/plain; version=0.0.4",
+    )
+
+
+@health_bp.route("/upstream", methods=["GET"])
+@check_api_key
+def upstream_status():
+    """Report the EC2 circuit breaker and outbound rate limiter state.
+
+    Returns:
+        JSON response with 'circuit' and 'rate_limiter' objects (null when
+        the feature is disabled)
+
+    Status Codes:
+        200: State returned
+        401: Missing or invalid API key
+    """
+    guard = resilience.get_guard()
+    if guard is None:
+        return jsonify({"circuit": None, "rate_limiter": None}), 200
+    return jsonify(guard.state()), 200
+
+
+def format_sse(data, event=None, event_id=None):
+    """Format one Server-Sent Events message with a JSON payload."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
+
+
+def health_event_stream(bus, watcher, instance_ids, last_event_id,
+                        heartbeat):
+    """Yield Server-Sent Events for health changes until disconnected.
+
+    Starts with a 'snapshot' event of the latest known health, or, when
+    resuming from a ``Last-Event-ID`` that is still buffered, with the
+    events missed since. After that only 'health' change events and
+    heartbeat comments are sent.
+
+    Args:
+        bus (HealthEventBus): Source of health change events
+        watcher (HealthWatcher): Refresh loop to subscribe to, or None
+                                 when the fleet poller feeds the bus
+        instance_ids (set): Instances to stream, or None for the fleet
+        last_event_id (int): ID from the Last-Event-ID header, or None
+        heartbeat (float): Seconds between heartbeats on a quiet stream
+    """
+    token = watcher.subscribe(instance_ids) if watcher is not None else None
+    try:
+        events = None
+        if last_event_id is not None and last_event_id <= bus.last_event_id:
+            events = bus.wait(last_event_id, 0)
+        last_write = time.monotonic()
+        while True:
+            if events is None:
+                # First connection, or too far behind to replay: resync
+                last_event_id, statuses = bus.current(instance_ids)
+                yield format_sse(
+                    {
+                        "instances": statuses,
+                        "timestamp": datetime.utcnow().isoformat() + "Z",
+                    },
+                    event="snapshot",
+                    event_id=last_event_id,
+                )
+                last_write = time.monotonic()
+            else:
+                for event in events:
+                    last_event_id = event.event_id
+                    if instance_ids is None or (
+                        event.instance_id in instance_ids
+                    ):
+                        yield format_sse(
+                            event.to_dict(), event="health",
+                            event_id=event.event_id,
+                        )
+                        last_write = time.monotonic()
+                if time.monotonic() - last_write >= heartbeat:
+                    yield ": heartbeat\n\n"
+                    last_write = time.monotonic()
+            events = bus.wait(last_event_id, heartbeat)
+    finally:
+        if token is not None:
+            watcher.unsubscribe(token)
+
+
+@health_bp.route("/health/stream", methods=["GET"])
+@check_api_key
+def health_stream():
+    """Stream health changes as Server-Sent Events.
+
+    Query Parameters:
+        ids: Comma-separated instance IDs to watch; omit to stream every
+             instance in the fleet
+
+    Headers:
+        Last-Event-ID: Resume after this event instead of starting with
+                       a full snapshot
+
+    Returns:
+        text/event-stream response of 'snapshot' and 'health' events
+
+    Status Codes:
+        200: Stream opened
+        400: Empty or oversized ids list
+        401: Missing or invalid API key
+        503: STREAM_MAX_CONNECTIONS streams already open in this worker
+    """
+    api_key = request.headers.get("X-API-Key")
+
+    instance_ids = None
+    error = None
+    if "ids" in request.args:
+        instance_ids = {
+            i.strip() for i in request.args["ids"].split(",") if i.strip()
+        }
+        if not instance_ids:
+            error = "ids must list at least one instance ID"
+        elif len(instance_ids) > current_app.config["BATCH_MAX_INSTANCES"]:
+            error = (
+                "ids exceeds the limit of "
+                f"{current_app.config['BATCH_MAX_INSTANCES']}"
+            )
+    if error:
+        log_request(
+            method=request.method,
+            path=request.path,
+            api_key=api_key,
+            status_code=400,
+            result=error,
+        )
+        return jsonify({"error": error}), 400
+
+    last_event_id = request.headers.get("Last-Event-ID", "")
+    last_event_id = int(last_event_id) if last_event_id.isdigit() else None
+
+    limiter = current_app.extensions["stream_limiter"]
+    if not limiter.acquire():
+        log_request(
+            method=request.method,
+            path=request.path,
+            api_key=api_key,
+            status_code=503,
+            result=f"Stream refused: {limiter.max_streams} already open",
+        )
+        return (
+            jsonify({"error": "Too many open streams, retry later"}),
+            503,
+            {"Retry-After": str(current_app.config["STREAM_RETRY_AFTER"])},
+        )
+
+    log_request(
+        method=request.method,
+        path=request.path,
+        api_key=api_key,
+        status_code=200,
+        result=(
+            "Stream opened: fleet" if instance_ids is None
+            else f"Stream opened: {len(instance_ids)} instances"
+        ),
+    )
+    response = Response(
+        health_event_stream(
+            current_app.extensions["health_events"],
+            current_app.extensions.get("health_watcher"),
+            instance_ids,
+            last_event_id,
+            current_app.config["STREAM_HEARTBEAT_INTERVAL"],
+        ),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # Runs when the server closes the response, even if the client left
+    # before the first event was generated
+    response.call_on_close(limiter.release)
+    return response
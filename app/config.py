@@ -1,10 +1,27 @@
 """Application configuration module."""
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+def env_bool(name, default):
+    """Read a boolean flag from the environment.
+
+    Args:
+        name (str): Environment variable name
+        default (bool): Value used when the variable is not set
+
+    Returns:
+        bool: True for "1", "true", "yes" or "on" (case-insensitive)
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 class Config:
     """Base configuration."""
 
@@ -14,6 +31,149 @@ class Config:
         "VALID_API_KEYS", "default-key-1,default-key-2"
     ).split(",")
 
+    # Per-key request quotas; API_KEY_QUOTAS overrides individual keys
+    # as comma-separated key=rate[:burst] entries
+    API_KEY_RATE_LIMIT = float(os.getenv("API_KEY_RATE_LIMIT", "50"))
+    API_KEY_RATE_BURST = int(os.getenv("API_KEY_RATE_BURST", "100"))
+    API_KEY_QUOTAS = os.getenv("API_KEY_QUOTAS", "")
+
+    # Regions searched for instances; defaults to AWS_REGION alone
+    AWS_REGIONS = [
+        region.strip()
+        for region in os.getenv(
+            "AWS_REGIONS", os.getenv("AWS_REGION", "us-east-1")
+        ).split(",")
+        if region.strip()
+    ]
+    REGION_FANOUT_WORKERS = int(os.getenv("REGION_FANOUT_WORKERS", "8"))
+    REGION_INDEX_MAX_ENTRIES = int(
+        os.getenv("REGION_INDEX_MAX_ENTRIES", "100000")
+    )
+    # JSON file the instance-to-region index is saved to (empty disables)
+    REGION_INDEX_PATH = os.getenv("REGION_INDEX_PATH", "")
+
+    # "boto3" for real AWS, or "fake" for an in-memory fleet (load testing)
+    CLOUD_BACKEND = os.getenv("CLOUD_BACKEND", "boto3")
+    FAKE_FLEET_SIZE = int(os.getenv("FAKE_FLEET_SIZE", "1000"))
+    FAKE_FLEET_SEED = int(os.getenv("FAKE_FLEET_SEED", "42"))
+    FAKE_EC2_LATENCY_MS = float(os.getenv("FAKE_EC2_LATENCY_MS", "0"))
+    FAKE_EC2_ERROR_RATE = float(os.getenv("FAKE_EC2_ERROR_RATE", "0"))
+    FAKE_EC2_MAX_CALLS_PER_SEC = float(
+        os.getenv("FAKE_EC2_MAX_CALLS_PER_SEC", "0")
+    )
+
+    # Pooled EC2 client settings (see app.infrastructure.cloud.ec2_client)
+    EC2_MAX_POOL_CONNECTIONS = int(os.getenv("EC2_MAX_POOL_CONNECTIONS", "10"))
+    EC2_TCP_KEEPALIVE = env_bool("EC2_TCP_KEEPALIVE", True)
+    EC2_CONNECT_TIMEOUT = float(os.getenv("EC2_CONNECT_TIMEOUT", "5"))
+    EC2_READ_TIMEOUT = float(os.getenv("EC2_READ_TIMEOUT", "10"))
+    EC2_RETRY_MODE = os.getenv("EC2_RETRY_MODE", "standard")
+    EC2_MAX_ATTEMPTS = int(os.getenv("EC2_MAX_ATTEMPTS", "3"))
+    # Build clients and open connections at startup instead of on the
+    # first request; boto3 is otherwise imported on first use
+    EC2_WARMUP_ENABLED = env_bool("EC2_WARMUP_ENABLED", False)
+    EC2_WARMUP_CONNECTIONS = int(os.getenv("EC2_WARMUP_CONNECTIONS", "1"))
+
+    # Outbound EC2 rate limit and circuit breaker
+    # (see app.infrastructure.cloud.resilience)
+    EC2_RATE_LIMIT_ENABLED = env_bool("EC2_RATE_LIMIT_ENABLED", True)
+    EC2_RATE_LIMIT = float(os.getenv("EC2_RATE_LIMIT", "20"))
+    EC2_RATE_BURST = int(os.getenv("EC2_RATE_BURST", "100"))
+    EC2_RATE_MAX_WAIT = float(os.getenv("EC2_RATE_MAX_WAIT", "0.5"))
+    EC2_RATE_MIN = float(os.getenv("EC2_RATE_MIN", "1"))
+    CIRCUIT_BREAKER_ENABLED = env_bool("CIRCUIT_BREAKER_ENABLED", True)
+    CIRCUIT_FAILURE_THRESHOLD = int(
+        os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")
+    )
+    CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+
+    # "two-call" or "single-call" (see get_instance_health)
+    HEALTH_RESOLUTION_MODE = os.getenv("HEALTH_RESOLUTION_MODE", "two-call")
+
+    # Batch health endpoint limits
+    BATCH_MAX_INSTANCES = int(os.getenv("BATCH_MAX_INSTANCES", "1000"))
+    BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "4"))
+
+    # Instance health result cache (see app.services.cache)
+    HEALTH_CACHE_ENABLED = env_bool("HEALTH_CACHE_ENABLED", True)
+    HEALTH_CACHE_MAX_ENTRIES = int(
+        os.getenv("HEALTH_CACHE_MAX_ENTRIES", "10000")
+    )
+    HEALTH_CACHE_TTL = float(os.getenv("HEALTH_CACHE_TTL", "5"))
+    HEALTH_CACHE_STALE_TTL = float(os.getenv("HEALTH_CACHE_STALE_TTL", "60"))
+    HEALTH_CACHE_NEGATIVE_TTL = float(
+        os.getenv("HEALTH_CACHE_NEGATIVE_TTL", "1")
+    )
+
+    # Request log file and rotation (see app.infrastructure.logging)
+    LOG_FILE = os.getenv("LOG_FILE", "logs/api.log")
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+    LOG_MAX_AGE = float(os.getenv("LOG_MAX_AGE", "86400"))
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "7"))
+    LOG_COMPRESS = env_bool("LOG_COMPRESS", True)
+
+    # Background request log writer
+    LOG_ASYNC_ENABLED = env_bool("LOG_ASYNC_ENABLED", True)
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "100"))
+    LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "0.5"))
+    LOG_OVERFLOW_POLICY = os.getenv("LOG_OVERFLOW_POLICY", "drop")
+
+    # Share one AWS lookup among concurrent requests for the same instance
+    COALESCE_ENABLED = env_bool("COALESCE_ENABLED", True)
+
+    # Region-wide background poller (see app.services.poller)
+    FLEET_POLLER_ENABLED = env_bool("FLEET_POLLER_ENABLED", False)
+    FLEET_POLL_INTERVAL = float(os.getenv("FLEET_POLL_INTERVAL", "30"))
+    # SQLite file sharing the snapshot between worker processes and across
+    # restarts (see app.services.shared_store); empty keeps it in memory.
+    # SHARED_STORE_ROLE: auto (elect one writer), writer or reader
+    SHARED_STORE_PATH = os.getenv("SHARED_STORE_PATH", "")
+    SHARED_STORE_ROLE = os.getenv("SHARED_STORE_ROLE", "auto")
+
+    # /api/instances page sizes
+    INSTANCES_PAGE_SIZE = int(os.getenv("INSTANCES_PAGE_SIZE", "100"))
+    INSTANCES_PAGE_MAX = int(os.getenv("INSTANCES_PAGE_MAX", "1000"))
+
+    # Per-instance health transition history and flap detection
+    # (see app.services.history)
+    HISTORY_CAPACITY = int(os.getenv("HISTORY_CAPACITY", "32"))
+    HISTORY_MAX_INSTANCES = int(os.getenv("HISTORY_MAX_INSTANCES", "100000"))
+    HISTORY_IDLE_TTL = float(os.getenv("HISTORY_IDLE_TTL", "86400"))
+    HISTORY_FLAP_WINDOW = float(os.getenv("HISTORY_FLAP_WINDOW", "600"))
+    HISTORY_FLAP_THRESHOLD = int(os.getenv("HISTORY_FLAP_THRESHOLD", "4"))
+
+    # Batched webhook POSTs of health changes (see app.services.webhooks);
+    # WEBHOOK_URLS is comma-separated, empty disables webhooks
+    WEBHOOK_URLS = [
+        url.strip()
+        for url in os.getenv("WEBHOOK_URLS", "").split(",")
+        if url.strip()
+    ]
+    WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+    WEBHOOK_BATCH_WINDOW = float(os.getenv("WEBHOOK_BATCH_WINDOW", "2"))
+    WEBHOOK_MAX_BATCH = int(os.getenv("WEBHOOK_MAX_BATCH", "500"))
+    WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "4"))
+    WEBHOOK_MAX_PENDING = int(os.getenv("WEBHOOK_MAX_PENDING", "100"))
+    WEBHOOK_MAX_RETRIES = int(os.getenv("WEBHOOK_MAX_RETRIES", "5"))
+    WEBHOOK_BACKOFF = float(os.getenv("WEBHOOK_BACKOFF", "0.5"))
+    WEBHOOK_MAX_BACKOFF = float(os.getenv("WEBHOOK_MAX_BACKOFF", "30"))
+    WEBHOOK_TIMEOUT = float(os.getenv("WEBHOOK_TIMEOUT", "5"))
+    # WEBHOOK_ROLE: auto (only the shared store's writer delivers), sender
+    # (this process always delivers) or off
+    WEBHOOK_ROLE = os.getenv("WEBHOOK_ROLE", "auto")
+
+    # Server-Sent Events stream of health changes
+    STREAM_HEARTBEAT_INTERVAL = float(
+        os.getenv("STREAM_HEARTBEAT_INTERVAL", "15")
+    )
+    STREAM_REFRESH_INTERVAL = float(os.getenv("STREAM_REFRESH_INTERVAL", "10"))
+    STREAM_EVENT_BUFFER = int(os.getenv("STREAM_EVENT_BUFFER", "10000"))
+    # Open streams per process (each holds a gthread worker thread); more
+    # are refused with 503 and Retry-After. 0 disables the limit
+    STREAM_MAX_CONNECTIONS = int(os.getenv("STREAM_MAX_CONNECTIONS", "8"))
+    STREAM_RETRY_AFTER = int(os.getenv("STREAM_RETRY_AFTER", "5"))
+
 
 class DevelopmentConfig(Config):
     """Development configuration."""
@@ -26,9 +186,40 @@ class TestingConfig(Config):
 
     TESTING = True
     VALID_API_KEYS = ["test-key-1", "test-key-2"]
+    FLEET_POLLER_ENABLED = False
+    # Keep request logs from test runs out of the working tree
+    LOG_FILE = os.path.join(tempfile.gettempdir(), "health-api-test.log")
 
 
 class ProductionConfig(Config):
     """Production configuration."""
 
     DEBUG = False
+    EC2_MAX_POOL_CONNECTIONS = int(os.getenv("EC2_MAX_POOL_CONNECTIONS", "50"))
+
+
+CONFIG_CLASSES = {
+    "development": DevelopmentConfig,
+    "testing": TestingConfig,
+    "production": ProductionConfig,
+}
+
+
+def get_config_class(default="development"):
+    """Return the config class named by the APP_ENV environment variable.
+
+    Args:
+        default (str): Name used when APP_ENV is not set
+
+    Returns:
+        type: DevelopmentConfig, TestingConfig or ProductionConfig
+
+    Raises:
+        ValueError: If APP_ENV names an unknown configuration
+    """
+    name = (os.getenv("APP_ENV") or default).strip().lower()
+    if name not in CONFIG_CLASSES:
+        raise ValueError(
+            f"APP_ENV must be one of {', '.join(CONFIG_CLASSES)}"
+        )
+    return CONFIG_CLASSES[name]
@@ -0,0 +1,153 @@
+"""Pluggable cloud backend interface.
+
+The health service talks to EC2 through a small, EC2-shaped client API:
+``describe_instances``, ``describe_instance_status`` and ``get_paginator``
+with boto3's request and response shapes. A backend decides where those
+calls go. The real backend hands out pooled boto3 clients; the fake
+backend serves a deterministic in-memory fleet for tests and load tests.
+"""
+import abc
+import threading
+import time
+
+from app.infrastructure.cloud import ec2_client, resilience
+
+
+BACKEND_BOTO3 = "boto3"
+BACKEND_FAKE = "fake"
+BACKENDS = (BACKEND_BOTO3, BACKEND_FAKE)
+
+
+class CloudBackend(abc.ABC):
+    """Source of EC2-compatible clients, one per region."""
+
+    name = None
+
+    @abc.abstractmethod
+    def get_client(self, region):
+        """Return an EC2-compatible client for a region.
+
+        Args:
+            region (str): AWS region name
+
+        Returns:
+            Object implementing describe_instances, describe_instance_status
+            and get_paginator with boto3 request and response shapes
+        """
+
+    def warm_up(self, region, connections=1):
+        """Prepare a region's client before the first request needs it.
+
+        Args:
+            region (str): AWS region name
+            connections (int): Pooled connections to open, where the
+                               backend has any
+
+        Returns:
+            dict: 'seconds' taken and 'error' (None on success)
+        """
+        started = time.perf_counter()
+        self.get_client(region)
+        return {
+            "seconds": round(time.perf_counter() - started, 4),
+            "error": None,
+        }
+
+
+class Boto3Backend(CloudBackend):
+    """Real AWS backend using the pooled boto3 client registry."""
+
+    name = BACKEND_BOTO3
+
+    def get_client(self, region):
+        """Return the shared boto3 EC2 client for a region."""
+        return ec2_client.get_ec2_client(region)
+
+    def warm_up(self, region, connections=1):
+        """Import boto3, build the client and open pooled connections."""
+        return ec2_client.warm_up(region, connections)
+
+
+_backend = Boto3Backend()
+_lock = threading.Lock()
+
+
+def get_backend():
+    """Return the active cloud backend."""
+    return _backend
+
+
+def set_backend(backend):
+    """Replace the active cloud backend.
+
+    Args:
+        backend (CloudBackend): Backend used for every subsequent call
+
+    Returns:
+        CloudBackend: The previously active backend
+    """
+    global _backend
+
+    with _lock:
+        previous = _backend
+        _backend = backend
+    return previous
+
+
+def get_client(region):
+    """Return an EC2-compatible client for a region from the backend.
+
+    The client is wrapped with the shared rate limiter and circuit
+    breaker when either is enabled.
+    """
+    return resilience.wrap(_backend.get_client(region))
+
+
+def warm_up(regions, connections=1):
+    """Warm the active backend's clients for several regions.
+
+    Calls go straight to the backend, bypassing the outbound rate limit
+    and circuit breaker, so warming up never spends request quota.
+
+    Args:
+        regions (list): AWS region names
+        connections (int): Pooled connections to open per region
+
+    Returns:
+        dict: Maps each region to its 'seconds' and 'error'
+    """
+    return {
+        region: _backend.warm_up(region, connections) for region in regions
+    }
+
+
+def configure(config):
+    """Select the backend named by ``CLOUD_BACKEND`` in app config.
+
+    Args:
+        config (Mapping): Application config (e.g. ``app.config``)
+
+    Raises:
+        ValueError: If CLOUD_BACKEND names an unknown backend
+    """
+    name = config.get("CLOUD_BACKEND", BACKEND_BOTO3)
+    if name not in BACKENDS:
+        raise ValueError(
+            f"CLOUD_BACKEND must be one of {', '.join(BACKENDS)}"
+        )
+
+    if name == BACKEND_BOTO3:
+        if not isinstance(_backend, Boto3Backend):
+            set_backend(Boto3Backend())
+        return
+
+    # Imported lazily: the fake fleet is only needed for load testing
+    from app.infrastructure.cloud.fake_ec2 import FakeEC2Backend
+
+    set_backend(FakeEC2Backend(
+        size=config.get("FAKE_FLEET_SIZE", 1000),
+        seed=config.get("FAKE_FLEET_SEED", 42),
+        latency=config.get("FAKE_EC2_LATENCY_MS", 0) / 1000,
+        error_rate=config.get("FAKE_EC2_ERROR_RATE", 0.0),
+        max_calls_per_sec=config.get("FAKE_EC2_MAX_CALLS_PER_SEC", 0),
+    ))
@@ -0,0 +1,192 @@
+"""Process-wide registry of pooled EC2 clients.
+
+Building a boto3 client is expensive: it creates a session, resolves
+credentials and endpoints, and opens a fresh connection pool. Clients are
+thread-safe once built, so a single client per region is shared by every
+request in the process.
+
+boto3 itself takes hundreds of milliseconds to import, so it is imported
+on first use rather than when this module loads. ``ec2_client.boto3``
+still works (and can be patched) thanks to the module ``__getattr__``.
+"""
+import importlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+
+DEFAULT_SETTINGS = {
+    "max_pool_connections": 10,
+    "tcp_keepalive": True,
+    "connect_timeout": 5.0,
+    "read_timeout": 10.0,
+    "retry_mode": "standard",
+    "max_attempts": 3,
+}
+
+# Maps Flask config keys to botocore client settings
+CONFIG_KEYS = {
+    "EC2_MAX_POOL_CONNECTIONS": "max_pool_connections",
+    "EC2_TCP_KEEPALIVE": "tcp_keepalive",
+    "EC2_CONNECT_TIMEOUT": "connect_timeout",
+    "EC2_READ_TIMEOUT": "read_timeout",
+    "EC2_RETRY_MODE": "retry_mode",
+    "EC2_MAX_ATTEMPTS": "max_attempts",
+}
+
+# Heavy SDK modules imported on first attribute access
+_LAZY_MODULES = {
+    "boto3": "boto3",
+    "botocore_config": "botocore.config",
+}
+
+_settings = dict(DEFAULT_SETTINGS)
+_clients = {}
+_lock = threading.Lock()
+
+
+def __getattr__(name):
+    """Import the AWS SDK modules on first use (PEP 562)."""
+    if name in _LAZY_MODULES:
+        module = importlib.import_module(_LAZY_MODULES[name])
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _sdk(name):
+    """Return a lazily imported SDK module from inside this module."""
+    module = globals().get(name)
+    return module if module is not None else __getattr__(name)
+
+
+def _reset_after_fork():
+    """Forget clients inherited from the parent process.
+
+    Their pooled connections are shared with the parent, so a forked
+    worker must open its own.
+    """
+    global _lock
+
+    _lock = threading.Lock()
+    _clients.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def configure(config):
+    """Apply client settings from an application config mapping.
+
+    Any key missing from ``config`` keeps its default value. Existing
+    clients are discarded when the settings change so that new clients
+    pick up the new pool and timeout values.
+
+    Args:
+        config (Mapping): Application config (e.g. ``app.config``)
+    """
+    settings = dict(DEFAULT_SETTINGS)
+    for config_key, setting in CONFIG_KEYS.items():
+        if config_key in config:
+            settings[setting] = config[config_key]
+
+    with _lock:
+        if settings != _settings:
+            _settings.clear()
+            _settings.update(settings)
+            _clients.clear()
+
+
+def build_botocore_config():
+    """Build the botocore client config from the current settings.
+
+    Returns:
+        botocore.config.Config: Connection pool, timeout and retry settings
+    """
+    return _sdk("botocore_config").Config(
+        max_pool_connections=_settings["max_pool_connections"],
+        tcp_keepalive=_settings["tcp_keepalive"],
+        connect_timeout=_settings["connect_timeout"],
+        read_timeout=_settings["read_timeout"],
+        retries={
+            "mode": _settings["retry_mode"],
+            "max_attempts": _settings["max_attempts"],
+        },
+    )
+
+
+def get_ec2_client(region):
+    """Return the shared EC2 client for a region, creating it on first use.
+
+    Args:
+        region (str): AWS region name (e.g. us-east-1)
+
+    Returns:
+        botocore.client.EC2: Pooled EC2 client for the region
+    """
+    client = _clients.get(region)
+    if client is not None:
+        return client
+
+    with _lock:
+        # Another thread may have built the client while we waited
+        client = _clients.get(region)
+        if client is None:
+            client = _sdk("boto3").client(
+                "ec2",
+                region_name=region,
+                config=build_botocore_config(),
+            )
+            _clients[region] = client
+        return client
+
+
+def reset_clients():
+    """Drop all cached clients.
+
+    Tests call this so that a patched ``boto3.client`` is picked up on the
+    next lookup instead of a client cached by an earlier test.
+    """
+    with _lock:
+        _clients.clear()
+
+
+def warm_up(region, connections=1):
+    """Build a region's client and open pooled connections ahead of use.
+
+    Building the client imports boto3 and resolves credentials and the
+    regional endpoint. ``connections`` concurrent ``DescribeRegions``
+    calls then complete TLS handshakes that stay in the pool. Any AWS
+    response, even an error such as missing permission, leaves an open
+    connection behind, so only failures to connect are reported.
+
+    Args:
+        region (str): AWS region name
+        connections (int): Pooled connections to open
+
+    Returns:
+        dict: 'seconds' taken and 'error' (None on success)
+    """
+    started = time.perf_counter()
+    error = None
+    try:
+        client = get_ec2_client(region)
+
+        def touch(_):
+            try:
+                client.describe_regions(RegionNames=[region])
+            except ClientError:
+                pass
+
+        with ThreadPoolExecutor(max_workers=max(1, connections)) as pool:
+            list(pool.map(touch, range(max(1, connections))))
+    except BotoCoreError as e:
+        error = str(e)
+    return {
+        "seconds": round(time.perf_counter() - started, 4),
+        "error": error,
+    }
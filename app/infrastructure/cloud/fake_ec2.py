@@ -0,0 +1,292 @@
+"""Deterministic in-memory EC2 fleet for tests and load testing."""
+import random
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+from app.infrastructure.cloud.backend import BACKEND_FAKE, CloudBackend
+
+
+# (state, status, weight) combinations the fleet is generated from
+FLEET_PROFILE = (
+    ("running", "ok", 80),
+    ("running", "initializing", 4),
+    ("running", "insufficient-data", 2),
+    ("running", "impaired", 3),
+    ("pending", "not-applicable", 2),
+    ("stopping", "not-applicable", 1),
+    ("stopped", "not-applicable", 6),
+    ("terminated", "not-applicable", 2),
+)
+AVAILABILITY_ZONE_SUFFIXES = ("a", "b", "c")
+SERVICES = ("checkout", "search", "payments", "catalog", "auth")
+ENVIRONMENTS = ("prod", "staging")
+
+# Matches EC2's page size limits for the describe calls
+MAX_RESULTS = 1000
+
+
+class FakeInstance:
+    """One instance in the fake fleet."""
+
+    __slots__ = ("instance_id", "state", "status", "availability_zone",
+                 "tags")
+
+    def __init__(self, instance_id, state, status, availability_zone, tags):
+        self.instance_id = instance_id
+        self.state = state
+        self.status = status
+        self.availability_zone = availability_zone
+        self.tags = tags
+
+
+def _client_error(code, message, operation):
+    """Build a botocore ClientError like the real EC2 API raises."""
+    return ClientError({"Error": {"Code": code, "Message": message}},
+                       operation)
+
+
+class FakeFleet:
+    """A seeded, reproducible fleet of instances in one region.
+
+    Args:
+        region (str): Region the fleet lives in
+        size (int): Number of instances to generate
+        seed (int): Random seed; the same seed yields the same fleet
+    """
+
+    def __init__(self, region, size=1000, seed=42):
+        self.region = region
+        rng = random.Random(f"{seed}:{region}")
+        population = [(state, status) for state, status, _ in FLEET_PROFILE]
+        weights = [weight for _, _, weight in FLEET_PROFILE]
+        self.instances = {}
+        for n in range(size):
+            instance_id = f"i-{rng.getrandbits(68):017x}"
+            state, status = rng.choices(population, weights)[0]
+            self.instances[instance_id] = FakeInstance(
+                instance_id=instance_id,
+                state=state,
+                status=status,
+                availability_zone=region + rng.choice(
+                    AVAILABILITY_ZONE_SUFFIXES
+                ),
+                tags={
+                    "service": rng.choice(SERVICES),
+                    "env": rng.choice(ENVIRONMENTS),
+                    "Name": f"fake-{n}",
+                },
+            )
+        self.ordered_ids = list(self.instances)
+
+    def set_state(self, instance_id, state, status):
+        """Change an instance's state and status, e.g. to inject failures."""
+        instance = self.instances[instance_id]
+        instance.state = state
+        instance.status = status
+
+
+class FakeEC2Client:
+    """EC2-compatible client over a FakeFleet.
+
+    Every call sleeps for ``latency`` seconds, may fail at random with one
+    of ``error_codes`` at ``error_rate``, and raises
+    ``RequestLimitExceeded`` once calls exceed ``max_calls_per_sec``
+    (token bucket, burst equal to one second of calls).
+
+    Args:
+        fleet (FakeFleet): Instances served by this client
+        latency (float): Seconds each call takes
+        error_rate (float): Probability (0-1) that a call fails
+        error_codes (tuple): Error codes used for injected failures
+        max_calls_per_sec (float): Throttle limit (0 disables throttling)
+        seed (int): Seed for the error injection random source
+    """
+
+    def __init__(self, fleet, latency=0.0, error_rate=0.0,
+                 error_codes=("InternalError",), max_calls_per_sec=0,
+                 seed=42):
+        self.fleet = fleet
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_codes = tuple(error_codes)
+        self.max_calls_per_sec = max_calls_per_sec
+        self.calls = 0
+        self.throttled = 0
+        self._rng = random.Random(seed)
+        self._tokens = float(max_calls_per_sec)
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _round_trip(self, operation):
+        """Apply throttling, error injection and latency to one call."""
+        with self._lock:
+            self.calls += 1
+            if self.max_calls_per_sec:
+                now = time.monotonic()
+                self._tokens = min(
+                    float(self.max_calls_per_sec),
+                    self._tokens
+                    + (now - self._refilled_at) * self.max_calls_per_sec,
+                )
+                self._refilled_at = now
+                if self._tokens < 1:
+                    self.throttled += 1
+                    raise _client_error(
+                        "RequestLimitExceeded", "Request limit exceeded.",
+                        operation,
+                    )
+                self._tokens -= 1
+            fail = self.error_rate and self._rng.random() < self.error_rate
+            code = self._rng.choice(self.error_codes) if fail else None
+
+        if self.latency:
+            time.sleep(self.latency)
+        if code is not None:
+            raise _client_error(code, "Injected failure.", operation)
+
+    def _select(self, instance_ids, filters, operation):
+        """Return the instances a call refers to, like EC2 would."""
+        instances = self.fleet.instances
+        if instance_ids:
+            missing = [i for i in instance_ids if i not in instances]
+            if missing:
+                raise _client_error(
+                    "InvalidInstanceID.NotFound",
+                    f"The instance IDs '{', '.join(missing)}' do not exist",
+                    operation,
+                )
+            return [instances[i] for i in instance_ids]
+        if filters:
+            selected = None
+            for f in filters:
+                if f["Name"] != "instance-id":
+                    continue
+                wanted = [i for i in f["Values"] if i in instances]
+                selected = [instances[i] for i in wanted]
+            if selected is not None:
+                return selected
+        return [instances[i] for i in self.fleet.ordered_ids]
+
+    @staticmethod
+    def _page(items, max_results, next_token):
+        """Slice ``items`` into one page and compute the next token."""
+        start = int(next_token) if next_token else 0
+        size = min(max_results or MAX_RESULTS, MAX_RESULTS)
+        end = start + size
+        token = str(end) if end < len(items) else None
+        return items[start:end], token
+
+    def describe_instances(self, InstanceIds=None, Filters=None,
+                           MaxResults=None, NextToken=None):
+        """Return instances in the shape of DescribeInstances."""
+        self._round_trip("DescribeInstances")
+        selected = self._select(InstanceIds, Filters, "DescribeInstances")
+        page, token = self._page(selected, MaxResults, NextToken)
+        response = {"Reservations": [{"Instances": [
+            {
+                "InstanceId": instance.instance_id,
+                "State": {"Name": instance.state},
+                "Placement": {
+                    "AvailabilityZone": instance.availability_zone
+                },
+                "Tags": [
+                    {"Key": key, "Value": value}
+                    for key, value in instance.tags.items()
+                ],
+            }
+            for instance in page
+        ]}] if page else []}
+        if token:
+            response["NextToken"] = token
+        return response
+
+    def describe_instance_status(self, InstanceIds=None, Filters=None,
+                                 IncludeAllInstances=False,
+                                 MaxResults=None, NextToken=None):
+        """Return status checks in the shape of DescribeInstanceStatus."""
+        self._round_trip("DescribeInstanceStatus")
+        selected = self._select(InstanceIds, None, "DescribeInstanceStatus")
+        if not IncludeAllInstances:
+            selected = [i for i in selected if i.state == "running"]
+        page, token = self._page(selected, MaxResults, NextToken)
+        response = {"InstanceStatuses": [
+            {
+                "InstanceId": instance.instance_id,
+                "AvailabilityZone": instance.availability_zone,
+                "InstanceState": {"Name": instance.state},
+                "InstanceStatus": {"Status": instance.status},
+                "SystemStatus": {"Status": instance.status},
+            }
+            for instance in page
+        ]}
+        if token:
+            response["NextToken"] = token
+        return response
+
+    def get_paginator(self, operation):
+        """Return a paginator for a describe operation."""
+        return FakePaginator(getattr(self, operation))
+
+
+class FakePaginator:
+    """Paginator following NextToken, like boto3's paginators."""
+
+    def __init__(self, method):
+        self._method = method
+
+    def paginate(self, PaginationConfig=None, **kwargs):
+        """Yield pages until the fake API stops returning a NextToken."""
+        page_size = (PaginationConfig or {}).get("PageSize")
+        token = None
+        while True:
+            page = self._method(
+                MaxResults=page_size, NextToken=token, **kwargs
+            )
+            yield page
+            token = page.get("NextToken")
+            if not token:
+                return
+
+
+class FakeEC2Backend(CloudBackend):
+    """Backend serving one seeded fake fleet per region.
+
+    Args:
+        size (int): Instances generated per region
+        seed (int): Seed making fleets reproducible
+        latency (float): Seconds each API call takes
+        error_rate (float): Probability (0-1) that a call fails
+        max_calls_per_sec (float): Throttle limit per region (0 = none)
+    """
+
+    name = BACKEND_FAKE
+
+    def __init__(self, size=1000, seed=42, latency=0.0, error_rate=0.0,
+                 max_calls_per_sec=0):
+        self.size = size
+        self.seed = seed
+        self.latency = latency
+        self.error_rate = error_rate
+        self.max_calls_per_sec = max_calls_per_sec
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def get_client(self, region):
+        """Return the fake client for a region, generating its fleet once."""
+        client = self._clients.get(region)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(region)
+            if client is None:
+                client = FakeEC2Client(
+                    FakeFleet(region, size=self.size, seed=self.seed),
+                    latency=self.latency,
+                    error_rate=self.error_rate,
+                    max_calls_per_sec=self.max_calls_per_sec,
+                    seed=self.seed,
+                )
+                self._clients[region] = client
+            return client
@@ -0,0 +1,383 @@
+"""Outbound rate limiting and circuit breaking for EC2 calls.
+
+Every EC2 call made through the cloud backend first takes a token from a
+shared, adaptive token bucket and is then checked against a circuit
+breaker. Throttling responses halve the bucket's rate (recovering slowly
+on success), and repeated upstream failures open the circuit so requests
+fail fast instead of queueing on AWS.
+
+Every EC2 client handed out by the backend is wrapped, even with both
+features disabled, so that AWS error codes are counted in one place for
+single lookups, batches and fleet polls alike.
+"""
+import threading
+import time
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from app.infrastructure.metrics.prometheus import AWS_ERRORS
+from app.infrastructure.rate_limit import TokenBucket
+
+
+THROTTLING_ERROR_CODES = frozenset({
+    "RequestLimitExceeded",
+    "Throttling",
+    "ThrottlingException",
+})
+SERVER_ERROR_CODES = frozenset({
+    "InternalError",
+    "InternalFailure",
+    "ServiceUnavailable",
+    "Unavailable",
+})
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half-open"
+
+
+class UpstreamUnavailableError(Exception):
+    """Raised instead of calling EC2 when it should not be called now.
+
+    Attributes:
+        retry_after (float): Seconds until a retry may succeed
+    """
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    """The circuit breaker is open, so the call was not attempted."""
+
+
+class RateLimitedError(UpstreamUnavailableError):
+    """No rate limiter token became available within the wait budget."""
+
+
+def error_code(error):
+    """Return the AWS error code of an exception, or None."""
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code")
+    return None
+
+
+def is_throttling_error(error):
+    """Return True if an exception is an EC2 throttling response."""
+    return error_code(error) in THROTTLING_ERROR_CODES
+
+
+def is_upstream_failure(error):
+    """Return True if an exception means EC2 itself is struggling.
+
+    Throttling, server-side errors and connection/timeouts count; client
+    errors such as an unknown instance ID or missing permissions do not.
+    """
+    if isinstance(error, BotoCoreError):
+        return True
+    code = error_code(error)
+    return code in THROTTLING_ERROR_CODES or code in SERVER_ERROR_CODES
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """Token bucket whose rate backs off on throttling (AIMD).
+
+    Each throttling response halves the current rate, down to
+    ``min_rate``; each successful call adds ``increase`` calls/sec back,
+    up to the configured ``rate``.
+
+    Args:
+        rate (float): Target calls per second
+        burst (int): Maximum tokens accumulated while idle
+        max_wait (float): Longest a caller will wait for a token
+        min_rate (float): Floor for the backed-off rate
+        increase (float): Calls/sec restored per successful call
+        clock (callable): Monotonic time source, overridable in tests
+        sleep (callable): Sleep function, overridable in tests
+    """
+
+    def __init__(self, rate, burst, max_wait=0.5, min_rate=1.0,
+                 increase=0.5, clock=time.monotonic, sleep=time.sleep):
+        super().__init__(rate, burst, max_wait, clock=clock, sleep=sleep)
+        self.configured_rate = float(rate)
+        self.min_rate = min(float(min_rate), self.configured_rate)
+        self.increase = increase
+        self.throttled = 0
+
+    def on_success(self):
+        """Additively restore the rate after a successful call."""
+        if self.rate < self.configured_rate:
+            with self._lock:
+                self.rate = min(
+                    self.configured_rate, self.rate + self.increase
+                )
+
+    def on_throttled(self):
+        """Halve the rate after a throttling response."""
+        with self._lock:
+            self._refill(self._clock())
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def state(self):
+        """Return the limiter state for the API."""
+        with self._lock:
+            self._refill(self._clock())
+            return {
+                "configured_rate": self.configured_rate,
+                "rate": round(self.rate, 3),
+                "burst": self.burst,
+                "tokens": round(max(0.0, self._tokens), 3),
+                "throttled": self.throttled,
+                "rejected": self.rejected,
+            }
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open probe.
+
+    After ``failure_threshold`` consecutive upstream failures the circuit
+    opens and calls fail fast for ``reset_timeout`` seconds. One probe
+    call is then let through; its success closes the circuit and its
+    failure re-opens it.
+
+    Args:
+        failure_threshold (int): Consecutive failures that open the circuit
+        reset_timeout (float): Seconds to stay open before probing
+        clock (callable): Monotonic time source, overridable in tests
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0,
+                 clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.opened_count = 0
+        self._opened_at = None
+        self._probing = False
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Check whether a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a
+                              probe already in flight
+        """
+        with self._lock:
+            if self.state == CIRCUIT_CLOSED:
+                return
+            remaining = self._opened_at + self.reset_timeout - self._clock()
+            if self.state == CIRCUIT_OPEN and remaining <= 0:
+                self.state = CIRCUIT_HALF_OPEN
+            if self.state == CIRCUIT_HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            raise CircuitOpenError(
+                "EC2 circuit breaker is open", max(1.0, remaining)
+            )
+
+    def on_success(self):
+        """Record a successful call, closing the circuit."""
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self.state = CIRCUIT_CLOSED
+            self._opened_at = None
+
+    def on_failure(self):
+        """Record an upstream failure, opening the circuit if needed."""
+        with self._lock:
+            self.failures += 1
+            was_probe = self._probing
+            self._probing = False
+            if was_probe or self.failures >= self.failure_threshold:
+                if self.state != CIRCUIT_OPEN:
+                    self.opened_count += 1
+                self.state = CIRCUIT_OPEN
+                self._opened_at = self._clock()
+
+    def on_other_outcome(self):
+        """Release a probe slot after a call that proved nothing."""
+        with self._lock:
+            self._probing = False
+
+    def snapshot(self):
+        """Return the breaker state for the API."""
+        with self._lock:
+            retry_after = 0.0
+            if self.state == CIRCUIT_OPEN:
+                retry_after = max(
+                    0.0,
+                    self._opened_at + self.reset_timeout - self._clock()
+                )
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "failure_threshold": self.failure_threshold,
+                "times_opened": self.opened_count,
+                "retry_after": round(retry_after, 3),
+            }
+
+
+class Guard:
+    """Rate limiter and circuit breaker applied around one EC2 call.
+
+    The error code of every failed call is counted in ``AWS_ERRORS``.
+
+    Args:
+        limiter (AdaptiveTokenBucket): Shared limiter, or None
+        breaker (CircuitBreaker): Shared breaker, or None
+    """
+
+    def __init__(self, limiter=None, breaker=None):
+        self.limiter = limiter
+        self.breaker = breaker
+
+    def call(self, fn, *args, **kwargs):
+        """Run one EC2 call under the limiter and breaker.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            RateLimitedError: If no token is available within max_wait
+        """
+        if self.breaker is not None:
+            self.breaker.before_call()
+        if self.limiter is not None and not self.limiter.acquire():
+            if self.breaker is not None:
+                self.breaker.on_other_outcome()
+            raise RateLimitedError(
+                "EC2 rate limit reached", self.limiter.retry_after()
+            )
+
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            code = error_code(e)
+            if code is not None:
+                AWS_ERRORS.inc(code=code)
+            if self.limiter is not None and is_throttling_error(e):
+                self.limiter.on_throttled()
+            if self.breaker is not None:
+                if is_upstream_failure(e):
+                    self.breaker.on_failure()
+                else:
+                    self.breaker.on_other_outcome()
+            raise
+
+        if self.limiter is not None:
+            self.limiter.on_success()
+        if self.breaker is not None:
+            self.breaker.on_success()
+        return result
+
+    def state(self):
+        """Return limiter and breaker state for the API."""
+        return {
+            "circuit": (
+                self.breaker.snapshot() if self.breaker is not None
+                else None
+            ),
+            "rate_limiter": (
+                self.limiter.state() if self.limiter is not None else None
+            ),
+        }
+
+
+class GuardedPaginator:
+    """Paginator whose every page fetch goes through the guard."""
+
+    def __init__(self, paginator, guard):
+        self._paginator = paginator
+        self._guard = guard
+
+    def paginate(self, **kwargs):
+        """Yield pages, guarding each underlying API call."""
+        pages = iter(self._paginator.paginate(**kwargs))
+        while True:
+            try:
+                page = self._guard.call(next, pages)
+            except StopIteration:
+                return
+            yield page
+
+
+class GuardedEC2Client:
+    """EC2-compatible client that routes calls through a Guard.
+
+    Attributes other than the describe calls and paginators pass through
+    to the wrapped client unchanged.
+    """
+
+    def __init__(self, client, guard):
+        self._client = client
+        self._guard = guard
+
+    def describe_instances(self, **kwargs):
+        """Guarded DescribeInstances."""
+        return self._guard.call(self._client.describe_instances, **kwargs)
+
+    def describe_instance_status(self, **kwargs):
+        """Guarded DescribeInstanceStatus."""
+        return self._guard.call(
+            self._client.describe_instance_status, **kwargs
+        )
+
+    def get_paginator(self, operation):
+        """Return a paginator whose page fetches are guarded."""
+        return GuardedPaginator(
+            self._client.get_paginator(operation), self._guard
+        )
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+_guard = None
+_lock = threading.Lock()
+
+# Used by wrap() when neither feature is enabled; only counts errors
+_unguarded = Guard()
+
+
+def configure(config):
+    """Create the shared guard from app config.
+
+    Args:
+        config (Mapping): Application config (e.g. ``app.config``)
+    """
+    global _guard
+
+    limiter = None
+    if config.get("EC2_RATE_LIMIT_ENABLED", False):
+        limiter = AdaptiveTokenBucket(
+            rate=config.get("EC2_RATE_LIMIT", 20),
+            burst=config.get("EC2_RATE_BURST", 100),
+            max_wait=config.get("EC2_RATE_MAX_WAIT", 0.5),
+            min_rate=config.get("EC2_RATE_MIN", 1),
+        )
+    breaker = None
+    if config.get("CIRCUIT_BREAKER_ENABLED", False):
+        breaker = CircuitBreaker(
+            failure_threshold=config.get("CIRCUIT_FAILURE_THRESHOLD", 5),
+            reset_timeout=config.get("CIRCUIT_RESET_TIMEOUT", 30),
+        )
+
+    with _lock:
+        _guard = Guard(limiter, breaker) if limiter or breaker else None
+
+
+def get_guard():
+    """Return the shared guard, or None if neither feature is enabled."""
+    return _guard
+
+
+def wrap(client):
+    """Wrap an EC2 client with the shared guard, if one is configured.
+
+    Without one, the client is still wrapped so its errors are counted.
+    """
+    return GuardedEC2Client(client, _guard or _unguarded)
@@ -1,18 +1,276 @@
 """Logging utility module."""
+import atexit
 import os
+import queue
+import threading
+import time
 from datetime import datetime
 
+from app.infrastructure.logging.rotation import (
+    LINE_TIMESTAMP_FORMAT,
+    RotatingLogFile,
+)
+from app.infrastructure.metrics.prometheus import STAGE_LATENCY
 
+
+# Default log path, used until configure() applies Config.LOG_FILE
 LOG_FILE = "logs/api.log"
 
+OVERFLOW_DROP = "drop"
+OVERFLOW_BLOCK = "block"
+OVERFLOW_POLICIES = (OVERFLOW_DROP, OVERFLOW_BLOCK)
+
+# Queue markers telling the writer thread to flush now, or flush and exit
+_FLUSH = object()
+_STOP = object()
+
 
 def ensure_log_directory():
     """Ensure the logs directory exists."""
     os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
 
 
-def log_request(method, path, api_key, status_code, result):
-    """Log an API request with timestamp and details.
+class AsyncLogWriter:
+    """Queue-backed log writer that keeps the log file open.
+
+    Request threads only enqueue formatted lines. A single writer thread
+    owns the file handle and writes lines in batches, flushing once
+    ``batch_size`` lines are buffered or ``flush_interval`` seconds after
+    the first buffered line, whichever comes first. Rotation happens on
+    the writer thread too, so it never delays a response.
+
+    Args:
+        log_file (RotatingLogFile or str): Log file, or a path to append
+                                           to without rotation
+        queue_size (int): Maximum number of lines waiting to be written
+        batch_size (int): Lines buffered before a forced flush
+        flush_interval (float): Maximum seconds a line stays buffered
+        overflow (str): 'drop' to discard lines when the queue is full
+                        (counted in ``dropped``), or 'block' to wait
+
+    A batch that fails to write (e.g. disk full) is discarded and counted
+    in ``write_errors``; the writer thread keeps running so ``flush()`` and
+    ``close()`` still return.
+    """
+
+    def __init__(self, log_file, queue_size=10000, batch_size=100,
+                 flush_interval=0.5, overflow=OVERFLOW_DROP):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"overflow must be one of {', '.join(OVERFLOW_POLICIES)}"
+            )
+        if isinstance(log_file, str):
+            log_file = RotatingLogFile(log_file)
+        self.log_file = log_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.dropped = 0
+        self.write_errors = 0
+        self._counter_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+
+    def start(self):
+        """Start the writer thread."""
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, line):
+        """Enqueue a formatted log line.
+
+        Args:
+            line (str): Log line including the trailing newline
+
+        Returns:
+            bool: False if the line was dropped because the queue was full
+        """
+        if self.overflow == OVERFLOW_BLOCK:
+            self._queue.put(line)
+            return True
+        try:
+            self._queue.put_nowait(line)
+            return True
+        except queue.Full:
+            with self._counter_lock:
+                self.dropped += 1
+            return False
+
+    def flush(self):
+        """Block until every queued line has been written to disk."""
+        self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self, timeout=5.0):
+        """Drain the queue, close the file and stop the writer thread.
+
+        Args:
+            timeout (float): Maximum seconds to wait for the drain
+        """
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            # Writer is wedged; give up rather than hang shutdown
+            self._thread = None
+            return
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        """Write queued lines in batches until the stop marker arrives."""
+        log_file = self.log_file
+        try:
+            buffer = []
+            deadline = None
+            while True:
+                timeout = None
+                if deadline is not None:
+                    timeout = max(0.0, deadline - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                stopping = item is _STOP
+                forced = stopping or item is _FLUSH
+                if item is not None and not forced:
+                    buffer.append(item)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+
+                due = deadline is not None and time.monotonic() >= deadline
+                if buffer and (
+                    forced or due or len(buffer) >= self.batch_size
+                ):
+                    try:
+                        log_file.write("".join(buffer))
+                        log_file.flush()
+                    except Exception:
+                        with self._counter_lock:
+                            self.write_errors += 1
+                    for _ in buffer:
+                        self._queue.task_done()
+                    buffer = []
+                    deadline = None
+
+                if forced:
+                    self._queue.task_done()
+                if stopping:
+                    return
+        finally:
+            try:
+                log_file.close()
+            except Exception:
+                with self._counter_lock:
+                    self.write_errors += 1
+
+
+_writer = None
+_log_file = None
+_settings = None
+_lock = threading.Lock()
+
+
+def configure(config):
+    """Set up the log file, rotation and background writer from app config.
+
+    Args:
+        config (Mapping): Application config (e.g. ``app.config``)
+    """
+    global _writer, _log_file, _settings
+
+    settings = {
+        "path": config.get("LOG_FILE", LOG_FILE),
+        "max_bytes": config.get("LOG_MAX_BYTES", 0),
+        "max_age": config.get("LOG_MAX_AGE", 0),
+        "backup_count": config.get("LOG_BACKUP_COUNT", 5),
+        "compress": config.get("LOG_COMPRESS", False),
+        "async": config.get("LOG_ASYNC_ENABLED", False),
+        "queue_size": config.get("LOG_QUEUE_SIZE", 10000),
+        "batch_size": config.get("LOG_BATCH_SIZE", 100),
+        "flush_interval": config.get("LOG_FLUSH_INTERVAL", 0.5),
+        "overflow": config.get("LOG_OVERFLOW_POLICY", OVERFLOW_DROP),
+    }
+
+    with _lock:
+        if settings == _settings:
+            return
+        _close_locked()
+
+        log_file = RotatingLogFile(
+            settings["path"],
+            max_bytes=settings["max_bytes"],
+            max_age=settings["max_age"],
+            backup_count=settings["backup_count"],
+            compress=settings["compress"],
+        )
+        if settings["async"]:
+            writer = AsyncLogWriter(
+                log_file,
+                queue_size=settings["queue_size"],
+                batch_size=settings["batch_size"],
+                flush_interval=settings["flush_interval"],
+                overflow=settings["overflow"],
+            )
+            writer.start()
+            _writer = writer
+        else:
+            _log_file = log_file
+        _settings = settings
+
+
+def shutdown(timeout=5.0):
+    """Drain the background writer and close the log file.
+
+    Args:
+        timeout (float): Maximum seconds to wait for queued lines
+    """
+    with _lock:
+        _close_locked(timeout)
+
+
+def _close_locked(timeout=5.0):
+    """Close the writer and log file. Caller holds the lock."""
+    global _writer, _log_file, _settings
+
+    if _writer is not None:
+        _writer.close(timeout)
+        _writer = None
+    if _log_file is not None:
+        _log_file.close()
+        _log_file = None
+    _settings = None
+
+
+atexit.register(shutdown)
+
+
+def dropped_lines():
+    """Return how many lines the background writer has dropped.
+
+    Returns:
+        int: Dropped line count, or None when no writer is running
+    """
+    writer = _writer
+    return writer.dropped if writer is not None else None
+
+
+def write_errors():
+    """Return how many batches the background writer failed to write.
+
+    Returns:
+        int: Failed batch count, or None when no writer is running
+    """
+    writer = _writer
+    return writer.write_errors if writer is not None else None
+
+
+def format_log_entry(method, path, api_key, status_code, result):
+    """Format a request log line.
 
     Args:
         method (str): HTTP method (GET, POST, etc.)
@@ -20,17 +278,50 @@ def log_request(method, path, api_key, status_code, result):
         api_key (str): API key used (will be truncated in log)
         status_code (int): HTTP status code
         result (str): Result or error message
-    """
-    ensure_log_directory()
 
+    Returns:
+        str: Log line including the trailing newline
+    """
     # Truncate API key to first 10 characters for security
     api_key_display = api_key[:10] if api_key else "N/A"
-    timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = datetime.utcnow().strftime(LINE_TIMESTAMP_FORMAT)
 
-    log_entry = (
+    return (
         f"{timestamp} | {method} {path} | Key: {api_key_display} | "
         f"Status: {status_code} | Result: {result}\n"
     )
 
-    with open(LOG_FILE, "a") as f:
-        f.write(log_entry)
+
+def log_request(method, path, api_key, status_code, result):
+    """Log an API request with timestamp and details.
+
+    The line is handed to the background writer when one is configured,
+    and written synchronously to the configured log file otherwise.
+
+    Args:
+        method (str): HTTP method (GET, POST, etc.)
+        path (str): Request path
+        api_key (str): API key used (will be truncated in log)
+        status_code (int): HTTP status code
+        result (str): Result or error message
+    """
+    with STAGE_LATENCY.time(stage="log_write"):
+        log_entry = format_log_entry(
+            method, path, api_key, status_code, result
+        )
+
+        writer = _writer
+        if writer is not None:
+            writer.write(log_entry)
+            return
+
+        if _log_file is not None:
+            with _lock:
+                if _log_file is not None:
+                    _log_file.write(log_entry)
+                    _log_file.flush()
+                    return
+
+        ensure_log_directory()
+        with open(LOG_FILE, "a") as f:
+            f.write(log_entry)
@@ -0,0 +1,254 @@
+"""Size- and time-based rotation for the request log file."""
+import gzip
+import os
+import shutil
+import time
+from calendar import timegm
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+# Rotated segments are named <path>.<timestamp>, which sorts oldest first
+SEGMENT_TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S-%f"
+
+# Request log lines start with a UTC timestamp in this format
+LINE_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Seconds a rotated segment is left alone before it is compressed, so that
+# other processes still holding it open have moved to the new file
+REOPEN_GRACE = 1.0
+
+
+class RotatingLogFile:
+    """Append-only log file that rotates on size or age.
+
+    On rotation the active file is renamed to ``<path>.<timestamp>`` and a
+    new file is opened in its place. Renaming is the only work done on the
+    writing thread; gzip compression of the rotated segment and pruning of
+    old segments run on a dedicated background thread.
+
+    The age of an existing file is taken from the timestamp on its first
+    line (its modification time if that line has none), so restarting the
+    process does not reset the age clock. Sizes are counted in bytes.
+
+    Several processes (e.g. gunicorn workers) may share one path. Before
+    each write the path is checked, as ``logging.WatchedFileHandler``
+    does, and the file is reopened if another process has rotated it.
+    Rotation itself holds an exclusive lock on ``<path>.lock``, and a
+    process that finds the file already rotated under the lock only
+    reopens it, so each file is rotated exactly once. Sizes are read from
+    the file, so they include what the other processes wrote.
+
+    This class is not thread-safe; callers serialize writes (the async log
+    writer owns it from a single thread).
+
+    Args:
+        path (str): Active log file path
+        max_bytes (int): Rotate once the file would exceed this size
+                         (0 disables size-based rotation)
+        max_age (float): Rotate once the file's first line is this many
+                         seconds old (0 disables age-based rotation)
+        backup_count (int): Number of rotated segments to keep
+        compress (bool): Gzip rotated segments in the background
+    """
+
+    def __init__(self, path, max_bytes=0, max_age=0, backup_count=5,
+                 compress=False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backup_count = backup_count
+        self.compress = compress
+        self._file = None
+        self._identity = None
+        self._size = 0
+        self._started_at = 0.0
+        self._compressor = None
+
+    def write(self, data):
+        """Append data, rotating first if a threshold would be crossed.
+
+        Args:
+            data (str): Text to append
+        """
+        encoded = data.encode("utf-8")
+        if self._file is None or self._replaced():
+            self._reopen()
+        if self._should_rotate(len(encoded)):
+            self.rotate()
+        self._file.write(encoded)
+        self._size += len(encoded)
+
+    def flush(self):
+        """Flush buffered data to the operating system."""
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        """Close the active file and wait for pending compression."""
+        self._close_file()
+        if self._compressor is not None:
+            self._compressor.shutdown(wait=True)
+            self._compressor = None
+
+    def rotate(self):
+        """Rename the active file to a timestamped segment and reopen.
+
+        If another process rotated the file since this one opened it, the
+        new file is only reopened.
+        """
+        with self._rotation_lock():
+            if self._file is not None and self._replaced():
+                self._reopen()
+                return
+            self._close_file()
+
+            if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+                stamp = datetime.utcnow().strftime(SEGMENT_TIMESTAMP_FORMAT)
+                segment = f"{self.path}.{stamp}"
+                suffix = 0
+                while (os.path.exists(segment)
+                       or os.path.exists(segment + ".gz")):
+                    suffix += 1
+                    segment = f"{self.path}.{stamp}-{suffix}"
+                os.replace(self.path, segment)
+                if self.compress:
+                    if self._compressor is None:
+                        self._compressor = ThreadPoolExecutor(
+                            max_workers=1, thread_name_prefix="log-compress"
+                        )
+                    self._compressor.submit(
+                        self._compress_and_prune, segment,
+                        time.monotonic() + REOPEN_GRACE,
+                    )
+                else:
+                    self.prune()
+
+            self._open()
+
+    def segments(self):
+        """Return rotated segment paths, oldest first."""
+        directory = os.path.dirname(self.path) or "."
+        prefix = os.path.basename(self.path) + "."
+        # Segment suffixes start with the timestamp; this skips the lock
+        # file and compression temp files
+        names = [
+            name for name in os.listdir(directory)
+            if name.startswith(prefix)
+            and name[len(prefix):][:1].isdigit()
+            and not name.endswith(".tmp")
+        ]
+        names.sort(key=lambda name: name[len(prefix):].split(".")[0])
+        return [os.path.join(directory, name) for name in names]
+
+    def prune(self):
+        """Delete the oldest segments beyond ``backup_count``."""
+        segments = self.segments()
+        excess = len(segments) - self.backup_count
+        for segment in segments[:max(0, excess)]:
+            try:
+                os.remove(segment)
+            except FileNotFoundError:
+                pass
+
+    def _open(self):
+        """Open the active file for appending."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "ab")
+        stat = os.fstat(self._file.fileno())
+        self._identity = (stat.st_dev, stat.st_ino)
+        self._size = stat.st_size
+        self._started_at = (
+            self._first_line_time() if self._size else time.time()
+        )
+
+    def _reopen(self):
+        """Close the active file, if any, and open the current path."""
+        self._close_file()
+        self._open()
+
+    def _close_file(self):
+        """Close the active file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._identity = None
+
+    def _replaced(self):
+        """Return True if the path no longer names the open file."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return True
+        return (stat.st_dev, stat.st_ino) != self._identity
+
+    @contextmanager
+    def _rotation_lock(self):
+        """Hold the lock that serializes rotation across processes."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _first_line_time(self):
+        """Return when the active file was started, as a Unix timestamp.
+
+        Read from the timestamp that starts the first line, falling back
+        to the file's modification time.
+        """
+        with open(self.path, "rb") as existing:
+            head = existing.read(len("YYYY-mm-dd HH:MM:SS"))
+        try:
+            started = datetime.strptime(
+                head.decode("ascii"), LINE_TIMESTAMP_FORMAT
+            )
+        except (UnicodeDecodeError, ValueError):
+            return os.path.getmtime(self.path)
+        return float(timegm(started.timetuple()))
+
+    def _should_rotate(self, incoming):
+        """Return True if writing ``incoming`` bytes crosses a threshold."""
+        self._size = max(self._size, os.fstat(self._file.fileno()).st_size)
+        if self._size == 0:
+            return False
+        if self.max_bytes and self._size + incoming > self.max_bytes:
+            return True
+        if self.max_age and time.time() - self._started_at >= self.max_age:
+            return True
+        return False
+
+    def _compress_and_prune(self, segment, not_before):
+        """Gzip a rotated segment, remove the original and prune.
+
+        Args:
+            segment (str): Rotated segment path
+            not_before (float): ``time.monotonic()`` value to wait for, so
+                                late writes from other processes still
+                                land in the segment before it is read
+        """
+        time.sleep(max(0.0, not_before - time.monotonic()))
+        pending = f"{segment}.gz.tmp"
+        try:
+            with open(segment, "rb") as source:
+                with gzip.open(pending, "wb") as target:
+                    shutil.copyfileobj(source, target)
+        except FileNotFoundError:
+            # Pruned by another process in the meantime
+            return
+        os.replace(pending, segment + ".gz")
+        try:
+            os.remove(segment)
+        except FileNotFoundError:
+            pass
+        self.prune()
@@ -0,0 +1,289 @@
+"""Lock-light Prometheus-compatible metrics.
+
+Recording never contends on a single global lock: each metric keeps a
+fixed number of shards, every thread is pinned to one shard, and only
+that shard's lock is taken on update. Shards are merged when the metrics
+are scraped, which is rare compared to recording.
+"""
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+
+SHARDS = 16
+
+# Latency buckets in seconds, from sub-millisecond cache hits to slow AWS
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+_shard_counter = itertools.count()
+_local = threading.local()
+
+
+def _shard_index():
+    """Return the shard assigned to the calling thread."""
+    try:
+        return _local.index
+    except AttributeError:
+        _local.index = next(_shard_counter) % SHARDS
+        return _local.index
+
+
+def _format_labels(labelnames, values, extra=()):
+    """Render a Prometheus label set such as {stage="api_key_check"}."""
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    rendered = ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace("\\", "\\\\").replace('"', '\\"')
+        )
+        for name, value in pairs
+    )
+    return "{" + rendered + "}"
+
+
+def _format_value(value):
+    """Render a sample value, using integers where possible."""
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class holding the sharded storage for one metric family."""
+
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._locks = [threading.Lock() for _ in range(SHARDS)]
+        self._shards = [{} for _ in range(SHARDS)]
+
+    def _label_values(self, labels):
+        """Return label values ordered by ``labelnames``."""
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self):
+        """Return the HELP and TYPE lines."""
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+    def reset(self):
+        """Clear all recorded values."""
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                shard.clear()
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter with optional labels."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        """Add ``amount`` to the counter for the given labels."""
+        key = self._label_values(labels)
+        index = _shard_index()
+        with self._locks[index]:
+            shard = self._shards[index]
+            shard[key] = shard.get(key, 0) + amount
+
+    def values(self):
+        """Return merged counter values keyed by label values."""
+        merged = {}
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                for key, value in shard.items():
+                    merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def render(self):
+        """Return the metric in Prometheus text format."""
+        lines = self._header()
+        for key, value in sorted(self.values().items()):
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Histogram of observed values with cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(),
+                 buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """Record one observation for the given labels."""
+        key = self._label_values(labels)
+        index = _shard_index()
+        # Find the first bucket the value fits in (len(buckets) = +Inf)
+        position = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                position = i
+                break
+        with self._locks[index]:
+            shard = self._shards[index]
+            state = shard.get(key)
+            if state is None:
+                state = shard[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][position] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the ``with`` block in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def values(self):
+        """Return merged (bucket counts, sum) keyed by label values."""
+        merged = {}
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                for key, (counts, total) in shard.items():
+                    if key not in merged:
+                        merged[key] = [[0] * len(counts), 0.0]
+                    target = merged[key]
+                    for i, count in enumerate(counts):
+                        target[0][i] += count
+                    target[1] += total
+        return merged
+
+    def render(self):
+        """Return the metric in Prometheus text format."""
+        lines = self._header()
+        bounds = [repr(float(b)) for b in self.buckets] + ["+Inf"]
+        for key, (counts, total) in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = _format_labels(
+                    self.labelnames, key, extra=[("le", bound)]
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def _render_samples(kind, name, documentation, samples, labelname):
+    """Render one scrape-time metric family of the given type."""
+    lines = [
+        f"# HELP {name} {documentation}",
+        f"# TYPE {name} {kind}",
+    ]
+    if not isinstance(samples, dict):
+        lines.append(f"{name} {_format_value(samples)}")
+        return lines
+    for key, value in sorted(samples.items()):
+        labels = _format_labels((labelname,), (key,))
+        lines.append(f"{name}{labels} {_format_value(value)}")
+    return lines
+
+
+def render_gauge(name, documentation, samples, labelname=None):
+    """Render a gauge computed at scrape time.
+
+    Args:
+        name (str): Metric name
+        documentation (str): HELP text
+        samples (dict or number): Values keyed by label value, or a single
+                                  unlabelled value
+        labelname (str): Label name used for dict keys
+
+    Returns:
+        list: Lines in Prometheus text format
+    """
+    return _render_samples("gauge", name, documentation, samples, labelname)
+
+
+def render_counter(name, documentation, samples, labelname=None):
+    """Render a counter kept by another component, read at scrape time.
+
+    For running totals such as cache hits, which only ever grow, so that
+    ``rate()`` and ``increase()`` work on them.
+
+    Args:
+        name (str): Metric name, ending in ``_total``
+        documentation (str): HELP text
+        samples (dict or number): Values keyed by label value, or a single
+                                  unlabelled value
+        labelname (str): Label name used for dict keys
+
+    Returns:
+        list: Lines in Prometheus text format
+    """
+    return _render_samples(
+        "counter", name, documentation, samples, labelname
+    )
+
+
+REQUEST_LATENCY = Histogram(
+    "health_api_request_duration_seconds",
+    "Total request latency by endpoint.",
+    labelnames=("endpoint",),
+)
+STAGE_LATENCY = Histogram(
+    "health_api_stage_duration_seconds",
+    "Latency of individual request stages.",
+    labelnames=("stage",),
+)
+RESPONSES = Counter(
+    "health_api_responses_total",
+    "Responses by HTTP status code.",
+    labelnames=("status",),
+)
+HEALTH_RESULTS = Counter(
+    "health_api_health_results_total",
+    "Resolved instance health values.",
+    labelnames=("health",),
+)
+AWS_ERRORS = Counter(
+    "health_api_aws_errors_total",
+    "AWS API errors by error code.",
+    labelnames=("code",),
+)
+
+METRICS = (REQUEST_LATENCY, STAGE_LATENCY, RESPONSES, HEALTH_RESULTS,
+           AWS_ERRORS)
+
+
+def render_metrics(extra_lines=()):
+    """Render every registered metric in Prometheus text format.
+
+    Args:
+        extra_lines (iterable): Additional pre-rendered lines (gauges
+                                and component counters)
+
+    Returns:
+        str: Exposition text ending with a newline
+    """
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    lines.extend(extra_lines)
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics():
+    """Clear every registered metric (used by tests)."""
+    for metric in METRICS:
+        metric.reset()
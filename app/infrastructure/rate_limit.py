@@ -0,0 +1,61 @@
+"""Thread-safe token bucket shared by outbound and per-key rate limits."""
+import threading
+import time
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a fixed rate.
+
+    Args:
+        rate (float): Tokens added per second
+        burst (int): Maximum tokens accumulated while idle
+        max_wait (float): Longest a caller will wait for a token (0 never
+                          waits)
+        clock (callable): Monotonic time source, overridable in tests
+        sleep (callable): Sleep function, overridable in tests
+    """
+
+    def __init__(self, rate, burst, max_wait=0.0, clock=time.monotonic,
+                 sleep=time.sleep):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_wait = max_wait
+        self.rejected = 0
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(burst)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        """Add tokens for the time elapsed. Caller holds the lock."""
+        elapsed = now - self._updated_at
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    def acquire(self):
+        """Take a token, waiting up to ``max_wait`` for one.
+
+        Returns:
+            bool: False if no token would be available within max_wait
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            wait = (1 - self._tokens) / self.rate
+            if wait > self.max_wait:
+                self.rejected += 1
+                return False
+            # Reserve the token now and sleep outside the lock
+            self._tokens -= 1
+        self._sleep(wait)
+        return True
+
+    def retry_after(self):
+        """Return seconds until the next token is available."""
+        with self._lock:
+            self._refill(self._clock())
+            return max(0.0, (1 - self._tokens) / self.rate)
@@ -1,7 +1,26 @@
 """Flask application factory module."""
 from flask import Flask
-from app.config import DevelopmentConfig
+from app.config import DevelopmentConfig, get_config_class
 from app.api.routes import health_bp
+from app.infrastructure.cloud import backend, ec2_client, resilience
+from app.infrastructure.logging import logger
+from app.services.api_keys import KeyRing, parse_quotas
+from app.services.cache import HealthCache
+from app.services.coalescing import SingleFlight
+from app.services.events import HealthEventBus, HealthWatcher, StreamLimiter
+from app.services.health_check import RESOLUTION_MODES
+from app.services.history import HealthHistory
+from app.services.poller import FleetPoller
+from app.services.regions import RegionIndex, RegionResolver
+from app.services.shared_store import SharedHealthStore
+from app.services.summary import FleetSummary
+from app.services.tag_index import InstanceIndex
+from app.services.webhooks import (
+    ROLE_AUTO as WEBHOOK_ROLE_AUTO,
+    ROLE_OFF as WEBHOOK_ROLE_OFF,
+    ROLES as WEBHOOK_ROLES,
+    WebhookDispatcher,
+)
 
 
 def create_app(config_class=DevelopmentConfig):
@@ -16,12 +35,207 @@ def create_app(config_class=DevelopmentConfig):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    if app.config["HEALTH_RESOLUTION_MODE"] not in RESOLUTION_MODES:
+        raise ValueError(
+            "HEALTH_RESOLUTION_MODE must be one of "
+            f"{', '.join(RESOLUTION_MODES)}"
+        )
+
+    # Hash API keys once and give each its own request quota
+    app.extensions["api_keys"] = KeyRing(
+        app.config["VALID_API_KEYS"],
+        rate=app.config["API_KEY_RATE_LIMIT"],
+        burst=app.config["API_KEY_RATE_BURST"],
+        quotas=parse_quotas(app.config["API_KEY_QUOTAS"]),
+    )
+
+    # Apply connection pool, timeout and retry settings to EC2 clients
+    ec2_client.configure(app.config)
+
+    # Choose between real AWS and the in-memory fake fleet
+    backend.configure(app.config)
+
+    # Rate limit outbound EC2 calls and fail fast while EC2 is struggling
+    resilience.configure(app.config)
+
+    # Write request logs from a background thread
+    logger.configure(app.config)
+
+    # Search several regions and remember where each instance lives
+    if len(app.config["AWS_REGIONS"]) > 1:
+        resolver = RegionResolver(
+            regions=app.config["AWS_REGIONS"],
+            index=RegionIndex(app.config["REGION_INDEX_MAX_ENTRIES"]),
+            max_workers=app.config["REGION_FANOUT_WORKERS"],
+            index_path=app.config["REGION_INDEX_PATH"] or None,
+        )
+        # Saved by shutdown_app in each process that serves requests
+        app.extensions["region_resolver"] = resolver
+
+    # Deduplicate concurrent AWS lookups of the same instance
+    if app.config["COALESCE_ENABLED"]:
+        app.extensions["single_flight"] = SingleFlight()
+
+    # Serve repeated lookups of the same instance from memory
+    if app.config["HEALTH_CACHE_ENABLED"]:
+        app.extensions["health_cache"] = HealthCache(
+            max_entries=app.config["HEALTH_CACHE_MAX_ENTRIES"],
+            ttl=app.config["HEALTH_CACHE_TTL"],
+            stale_ttl=app.config["HEALTH_CACHE_STALE_TTL"],
+            negative_ttl=app.config["HEALTH_CACHE_NEGATIVE_TTL"],
+        )
+
+    # Health change events for streams and the fleet summary
+    bus = HealthEventBus(max_events=app.config["STREAM_EVENT_BUFFER"])
+    app.extensions["health_events"] = bus
+
+    # Bound the request threads held open by event streams
+    app.extensions["stream_limiter"] = StreamLimiter(
+        app.config["STREAM_MAX_CONNECTIONS"]
+    )
+
+    # Fleet-wide counts, kept up to date from every result the bus sees
+    summary = FleetSummary()
+    bus.add_listener(summary.update)
+    app.extensions["fleet_summary"] = summary
+
+    # Tag, health, state and zone index for fleet queries
+    index = InstanceIndex()
+    bus.add_listener(index.update)
+    app.extensions["instance_index"] = index
+
+    # Bounded per-instance transition history; sees every result so that
+    # instances still being checked are never evicted as idle
+    history = HealthHistory(
+        capacity=app.config["HISTORY_CAPACITY"],
+        max_instances=app.config["HISTORY_MAX_INSTANCES"],
+        idle_ttl=app.config["HISTORY_IDLE_TTL"],
+    )
+    bus.add_listener(history.record, every_result=True)
+    app.extensions["health_history"] = history
+
+    # Answer lookups from a snapshot of every configured region, refreshed
+    # in the background
+    store = None
+    if app.config["FLEET_POLLER_ENABLED"]:
+        if app.config["SHARED_STORE_PATH"]:
+            # One worker polls AWS; the rest read what it stored
+            store = SharedHealthStore(
+                app.config["SHARED_STORE_PATH"],
+                role=app.config["SHARED_STORE_ROLE"],
+            )
+        poller = FleetPoller(
+            regions=app.config["AWS_REGIONS"],
+            interval=app.config["FLEET_POLL_INTERVAL"],
+            store=store,
+        )
+        poller.add_listener(
+            lambda snapshot: bus.publish(snapshot.instances, complete=True)
+        )
+        app.extensions["fleet_poller"] = poller
+    else:
+        # Without the poller, streams share one on-demand refresh loop
+        app.extensions["health_watcher"] = HealthWatcher(
+            bus,
+            interval=app.config["STREAM_REFRESH_INTERVAL"],
+            regions=app.config["AWS_REGIONS"],
+            resolver=app.extensions.get("region_resolver"),
+        )
+
+    # POST batches of health changes to webhooks, off the request path.
+    # Workers sharing a store all see its snapshots, so in 'auto' only the
+    # writer delivers
+    webhook_role = app.config["WEBHOOK_ROLE"]
+    if webhook_role not in WEBHOOK_ROLES:
+        raise ValueError(
+            f"WEBHOOK_ROLE must be one of {', '.join(WEBHOOK_ROLES)}"
+        )
+    if app.config["WEBHOOK_URLS"] and webhook_role != WEBHOOK_ROLE_OFF:
+        leader = None
+        if webhook_role == WEBHOOK_ROLE_AUTO and store is not None:
+            leader = store.is_writer
+        app.extensions["webhooks"] = WebhookDispatcher(
+            bus,
+            app.config["WEBHOOK_URLS"],
+            window=app.config["WEBHOOK_BATCH_WINDOW"],
+            max_batch=app.config["WEBHOOK_MAX_BATCH"],
+            workers=app.config["WEBHOOK_WORKERS"],
+            max_pending=app.config["WEBHOOK_MAX_PENDING"],
+            max_retries=app.config["WEBHOOK_MAX_RETRIES"],
+            backoff=app.config["WEBHOOK_BACKOFF"],
+            max_backoff=app.config["WEBHOOK_MAX_BACKOFF"],
+            timeout=app.config["WEBHOOK_TIMEOUT"],
+            secret=app.config["WEBHOOK_SECRET"] or None,
+            leader=leader,
+        )
+
     # Register blueprints
     app.register_blueprint(health_bp)
 
+    start_background_tasks(app)
+
     return app
 
 
+def start_background_tasks(app):
+    """Start the app's background threads, if not already running.
+
+    Threads do not survive ``fork()``, so servers that load the app once
+    and then fork workers (gunicorn with ``preload_app``) call this again
+    in each worker. Pooled EC2 clients do not survive it either, which is
+    why the optional warm-up runs here too.
+
+    Args:
+        app (Flask): Application created by create_app
+    """
+    logger.configure(app.config)
+    if app.config["EC2_WARMUP_ENABLED"]:
+        app.extensions["warmup"] = backend.warm_up(
+            app.config["AWS_REGIONS"], app.config["EC2_WARMUP_CONNECTIONS"]
+        )
+    poller = app.extensions.get("fleet_poller")
+    if poller is not None:
+        poller.start()
+    webhooks = app.extensions.get("webhooks")
+    if webhooks is not None:
+        webhooks.start()
+
+
+def stop_background_tasks(app, timeout=5.0):
+    """Stop background threads, draining the log queue and cache refreshes.
+
+    Args:
+        app (Flask): Application created by create_app
+        timeout (float): Maximum seconds to wait for each component
+    """
+    poller = app.extensions.get("fleet_poller")
+    if poller is not None:
+        poller.stop(timeout)
+    webhooks = app.extensions.get("webhooks")
+    if webhooks is not None:
+        webhooks.stop(timeout)
+    cache = app.extensions.get("health_cache")
+    if cache is not None:
+        cache.shutdown()
+    logger.shutdown(timeout)
+
+
+def shutdown_app(app, timeout=5.0):
+    """Drain and release everything the app holds, before process exit.
+
+    Args:
+        app (Flask): Application created by create_app
+        timeout (float): Maximum seconds to wait for each component
+    """
+    stop_background_tasks(app, timeout)
+    resolver = app.extensions.get("region_resolver")
+    if resolver is not None:
+        resolver.close()
+
+
 if __name__ == "__main__":
-    app = create_app()
-    app.run(debug=True, host="0.0.0.0", port=5000)
+    app = create_app(get_config_class())
+    try:
+        app.run(debug=app.config["DEBUG"], host="0.0.0.0", port=5000)
+    finally:
+        shutdown_app(app)
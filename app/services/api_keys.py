@@ -0,0 +1,102 @@
+"""API key validation and per-key request quotas."""
+import hashlib
+import hmac
+
+from app.infrastructure.rate_limit import TokenBucket
+
+
+def hash_key(api_key):
+    """Return the SHA-256 digest of an API key."""
+    return hashlib.sha256(api_key.encode("utf-8")).digest()
+
+
+def parse_quotas(spec):
+    """Parse per-key quota overrides.
+
+    Args:
+        spec (str): Comma-separated ``key=rate[:burst]`` entries, e.g.
+                    ``"ci-key=1:5,dashboard-key=50"``
+
+    Returns:
+        dict: Maps API key to a ``(rate, burst)`` tuple; burst is None
+              when not given
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    quotas = {}
+    for entry in (spec or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        key, sep, limits = entry.rpartition("=")
+        if not sep or not key:
+            raise ValueError(f"Invalid API key quota entry: {entry!r}")
+        rate, _, burst = limits.partition(":")
+        quotas[key] = (float(rate), int(burst) if burst else None)
+    return quotas
+
+
+class KeyRing:
+    """Valid API keys, stored as hashes, each with its own token bucket.
+
+    Keys are hashed once at startup, and a presented key is hashed before
+    it is looked up among the stored digests. A caller cannot choose
+    digest bytes, so the lookup's timing tells them nothing about how much
+    of a real key they guessed; the matched digest is then confirmed with
+    :func:`hmac.compare_digest`. The cost does not depend on how many keys
+    exist.
+
+    Args:
+        keys (list): Valid API keys
+        rate (float): Default requests per second per key (0 disables
+                      quotas)
+        burst (int): Default burst size per key
+        quotas (dict): Per-key ``(rate, burst)`` overrides, see
+                       :func:`parse_quotas`
+    """
+
+    def __init__(self, keys, rate=0, burst=1, quotas=None):
+        quotas = quotas or {}
+        digests = {}
+        self._buckets = {}
+        for key in keys:
+            key = key.strip()
+            if not key:
+                continue
+            digest = hash_key(key)
+            digests[digest] = digest
+            key_rate, key_burst = quotas.get(key, (rate, None))
+            if key_rate:
+                self._buckets[digest] = TokenBucket(
+                    rate=key_rate, burst=key_burst or burst
+                )
+        self._digests = digests
+
+    def __len__(self):
+        return len(self._digests)
+
+    def verify(self, api_key):
+        """Return the key's digest if it is valid, else None."""
+        if not api_key:
+            return None
+        digest = hash_key(api_key)
+        stored = self._digests.get(digest)
+        if stored is None or not hmac.compare_digest(stored, digest):
+            return None
+        return digest
+
+    def consume(self, digest):
+        """Take one request from a key's quota.
+
+        Args:
+            digest (bytes): Digest returned by :meth:`verify`
+
+        Returns:
+            float: 0 if the request is allowed, otherwise the seconds
+                   until the key has quota again
+        """
+        bucket = self._buckets.get(digest)
+        if bucket is None or bucket.acquire():
+            return 0.0
+        return max(bucket.retry_after(), 0.001)
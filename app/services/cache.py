@@ -0,0 +1,180 @@
+"""In-process result cache for instance health lookups."""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+# max_age: whole seconds the value stays fresh, for Cache-Control headers
+CachedResult = namedtuple(
+    "CachedResult", ["value", "cached_at", "age_ms", "stale", "max_age"],
+    defaults=[0],
+)
+
+
+class _Entry:
+    """A cached value with the time it was stored."""
+
+    __slots__ = ("value", "stored_at", "cached_at")
+
+    def __init__(self, value, stored_at, cached_at):
+        self.value = value
+        self.stored_at = stored_at
+        self.cached_at = cached_at
+
+
+class HealthCache:
+    """TTL + LRU cache with stale-while-revalidate.
+
+    Entries younger than ``ttl`` are served as fresh. Entries older than
+    ``ttl`` but within ``stale_ttl`` more are served as-is while a single
+    background refresh replaces them. Anything older is reloaded inline.
+    ``None`` results (instance not found) are kept for ``negative_ttl``
+    only and are never served stale, so newly launched instances show up
+    quickly. Exceptions raised by the loader are never cached.
+
+    Args:
+        max_entries (int): Maximum number of cached instance IDs
+        ttl (float): Seconds an entry is considered fresh
+        stale_ttl (float): Extra seconds a stale entry may still be served
+        negative_ttl (float): Seconds a not-found result is cached
+        refresh_workers (int): Threads used for background refreshes
+        clock (callable): Monotonic time source, overridable in tests
+    """
+
+    def __init__(self, max_entries=10000, ttl=5.0, stale_ttl=60.0,
+                 negative_ttl=1.0, refresh_workers=4, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.refresh_workers = refresh_workers
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._executor = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, loader):
+        """Return the cached result for ``key``, loading it if needed.
+
+        Args:
+            key: Cache key (e.g. the instance ID)
+            loader (callable): Zero-argument function that fetches the
+                               value from AWS
+
+        Returns:
+            CachedResult: The value with its cache time, age and whether
+                          it was served stale
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.stored_at
+                if entry.value is None:
+                    fresh_for, stale_for = self.negative_ttl, 0
+                else:
+                    fresh_for, stale_for = self.ttl, self.stale_ttl
+
+                if age < fresh_for:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._result(entry, age, fresh_for, stale=False)
+
+                if age < fresh_for + stale_for:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    self._schedule_refresh(key, loader)
+                    return self._result(entry, age, fresh_for, stale=True)
+
+            self.misses += 1
+
+        entry = self._store(key, loader())
+        fresh_for = self.ttl if entry.value is not None else self.negative_ttl
+        return self._result(entry, 0.0, fresh_for, stale=False)
+
+    def peek(self, key):
+        """Return the last value stored for ``key``, however old.
+
+        Used to serve the last known result while AWS is unavailable.
+        Does not load, refresh or count as a lookup.
+
+        Returns:
+            CachedResult: The entry (marked stale once past ``ttl``), or
+                          None if nothing is cached for ``key``
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        age = now - entry.stored_at
+        return self._result(entry, age, self.ttl, stale=age >= self.ttl)
+
+    def invalidate(self, key):
+        """Drop a single entry from the cache."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def shutdown(self):
+        """Wait for in-flight background refreshes to finish."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _store(self, key, value):
+        """Insert a value, evicting the least recently used entries."""
+        entry = _Entry(value, self._clock(), datetime.utcnow())
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def _schedule_refresh(self, key, loader):
+        """Start one background refresh for ``key``. Caller holds the lock."""
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.refresh_workers,
+                thread_name_prefix="health-cache-refresh",
+            )
+        self._executor.submit(self._refresh, key, loader)
+
+    def _refresh(self, key, loader):
+        """Reload ``key`` in the background, keeping stale data on error."""
+        try:
+            self._store(key, loader())
+        except Exception:
+            # The stale entry stays in place until it ages out
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    @staticmethod
+    def _result(entry, age, fresh_for, stale):
+        """Wrap an entry as a CachedResult."""
+        return CachedResult(
+            value=entry.value,
+            cached_at=entry.cached_at,
+            age_ms=int(age * 1000),
+            stale=stale,
+            max_age=0 if stale else max(0, int(fresh_for - age)),
+        )
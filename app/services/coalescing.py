@@ -0,0 +1,83 @@
+"""Single-flight deduplication of concurrent health lookups."""
+import threading
+
+
+class _Call:
+    """An in-flight lookup shared by every caller for the same key."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Share one in-flight call among concurrent callers for the same key.
+
+    The first caller for a key runs the function; callers that arrive
+    while it is running wait for it and receive the same result, or have
+    the same exception raised. Nothing is remembered once the call
+    finishes, so this complements rather than replaces the result cache.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """Run ``fn`` for ``key``, or wait for the call already running.
+
+        Args:
+            key: Hashable lookup key (e.g. ``(region, instance_id)``)
+            fn (callable): Zero-argument function performing the lookup
+
+        Returns:
+            The value returned by the shared call
+
+        Raises:
+            Exception: Whatever the shared call raised
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        """Return executed and coalesced call counters.
+
+        Returns:
+            dict: 'executed', 'coalesced' and 'in_flight' counts
+        """
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
@@ -0,0 +1,333 @@
+"""Health change events shared by every Server-Sent Events subscriber."""
+import itertools
+import os
+import threading
+from collections import deque
+from datetime import datetime
+
+from app.services.fleet_records import InstanceHealth
+from app.services.health_check import get_instances_health
+from app.services.poller import fetch_regions_health
+
+
+class HealthEvent:
+    """A change in one instance's mapped health.
+
+    Attributes:
+        event_id (int): Position in the bus's event sequence
+        instance_id (str): Instance whose health changed
+        status (dict): New health status dict, or None if the instance
+                       no longer exists
+        previous_health (str): Health before the change, or None if the
+                               instance was not known before
+        timestamp (str): ISO 8601 UTC time the change was seen
+    """
+
+    __slots__ = ("event_id", "instance_id", "status", "previous_health",
+                 "timestamp")
+
+    def __init__(self, event_id, instance_id, status, previous_health):
+        self.event_id = event_id
+        self.instance_id = instance_id
+        self.status = status
+        self.previous_health = previous_health
+        self.timestamp = datetime.utcnow().isoformat() + "Z"
+
+    def to_dict(self):
+        """Return the event payload sent to subscribers."""
+        status = self.status or {}
+        return {
+            "instance_id": self.instance_id,
+            "state": status.get("state"),
+            "status_code": status.get("status_code"),
+            "health": status.get("health"),
+            "previous_health": self.previous_health,
+            "timestamp": self.timestamp,
+        }
+
+
+class HealthEventBus:
+    """Latest known health per instance plus a bounded log of changes.
+
+    Publishers hand over fresh health results; only instances whose
+    mapped health changed produce an event. Subscribers block in
+    :meth:`wait` for events after the last ID they saw, which is also how
+    ``Last-Event-ID`` resume works while that ID is still buffered. The
+    latest result per instance is kept as a compact
+    :class:`InstanceHealth` record.
+
+    Args:
+        max_events (int): Number of recent events kept for resume
+    """
+
+    def __init__(self, max_events=10000):
+        self._current = {}
+        self._events = deque(maxlen=max_events)
+        self._ids = itertools.count(1)
+        self._last_id = 0
+        self._listeners = []
+        self._observers = []
+        self._condition = threading.Condition()
+
+    def add_listener(self, listener, every_result=False):
+        """Call ``listener(instance_id, status)`` whenever a result changes.
+
+        Unlike events, listeners also hear about changes that leave the
+        mapped health alone (e.g. a new state or tags). ``status`` is None
+        when the instance was removed.
+
+        Args:
+            listener (callable): Function taking (instance_id, status)
+            every_result (bool): Also call it for unchanged results, e.g.
+                                 to track when instances were last seen
+        """
+        if every_result:
+            self._observers.append(listener)
+        else:
+            self._listeners.append(listener)
+
+    @property
+    def last_event_id(self):
+        """ID of the most recent event, or 0 if there has been none."""
+        return self._last_id
+
+    def publish(self, instances, complete=False):
+        """Record fresh health results and emit events for changes.
+
+        Args:
+            instances (dict): Maps instance ID to a health status dict, or
+                              to None if the instance was not found
+            complete (bool): True if ``instances`` is the whole fleet, so
+                             known instances missing from it were removed
+
+        Returns:
+            int: Number of events emitted
+        """
+        with self._condition:
+            emitted = 0
+            for instance_id, status in instances.items():
+                emitted += self._apply(instance_id, status)
+            if complete:
+                for instance_id in set(self._current) - set(instances):
+                    emitted += self._apply(instance_id, None)
+            if emitted:
+                self._condition.notify_all()
+            return emitted
+
+    def _apply(self, instance_id, status):
+        """Update one instance. Caller holds the condition's lock."""
+        previous = self._current.get(instance_id)
+        if status is None:
+            if previous is None:
+                return 0
+            record = None
+            del self._current[instance_id]
+        else:
+            record = InstanceHealth.from_status(status)
+            self._current[instance_id] = record
+        if previous != record:
+            for listener in self._listeners:
+                listener(instance_id, status)
+        for observer in self._observers:
+            observer(instance_id, status)
+        if record is not None and previous is not None and (
+            previous.health == record.health
+        ):
+            return 0
+
+        self._last_id = next(self._ids)
+        self._events.append(HealthEvent(
+            self._last_id,
+            instance_id,
+            status,
+            previous.health if previous is not None else None,
+        ))
+        return 1
+
+    def current(self, instance_ids=None):
+        """Return the latest known status of some or all instances.
+
+        Args:
+            instance_ids (set): IDs to include, or None for every instance
+
+        Returns:
+            tuple: (event ID the state is current as of, dict of statuses)
+        """
+        with self._condition:
+            if instance_ids is None:
+                instance_ids = self._current
+            return self._last_id, {
+                instance_id: self._current[instance_id].to_dict()
+                for instance_id in instance_ids
+                if instance_id in self._current
+            }
+
+    def wait(self, after_id, timeout):
+        """Block until there are events after ``after_id``, or time out.
+
+        Args:
+            after_id (int): Last event ID the subscriber has seen
+            timeout (float): Longest time to wait, in seconds
+
+        Returns:
+            list: Events with IDs greater than ``after_id`` (empty on
+                  timeout), or None if some of them are no longer
+                  buffered and the subscriber must resynchronise
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._last_id > after_id, timeout
+            )
+            if self._last_id <= after_id:
+                return []
+            if self._events[0].event_id > after_id + 1:
+                return None
+            return [e for e in self._events if e.event_id > after_id]
+
+
+class HealthWatcher:
+    """One refresh loop feeding the bus on behalf of every subscriber.
+
+    While anyone is subscribed, polls AWS every ``interval`` seconds:
+    every region's fleet if any subscriber wants the fleet, otherwise
+    just the union of subscribed instance IDs in one batch lookup, routed
+    to their regions by the resolver when there is one. The loop stops
+    when the last subscriber leaves.
+
+    Args:
+        bus (HealthEventBus): Bus that receives the results
+        interval (float): Seconds between refreshes
+        regions (list): AWS regions to poll (default: AWS_REGION env var)
+        resolver (RegionResolver): Finds the region of each watched
+                                   instance when there are several
+    """
+
+    def __init__(self, bus, interval=10.0, regions=None, resolver=None):
+        self.bus = bus
+        self.interval = interval
+        self.regions = list(regions or [os.getenv("AWS_REGION", "us-east-1")])
+        self.resolver = resolver
+        self.last_error = None
+        self._subscriptions = {}
+        self._tokens = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def subscribe(self, instance_ids=None):
+        """Register interest in some instances, or the fleet if None.
+
+        Returns:
+            int: Token to pass to :meth:`unsubscribe`
+        """
+        with self._lock:
+            token = next(self._tokens)
+            self._subscriptions[token] = (
+                frozenset(instance_ids) if instance_ids is not None
+                else None
+            )
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="health-watcher", daemon=True
+                )
+                self._thread.start()
+            else:
+                # Fetch newly watched instances without waiting a tick
+                self._wakeup.set()
+        return token
+
+    def unsubscribe(self, token):
+        """Drop a subscription; the loop exits after the last one."""
+        with self._lock:
+            self._subscriptions.pop(token, None)
+            if not self._subscriptions:
+                self._wakeup.set()
+
+    def refresh_once(self):
+        """Refresh everything currently subscribed to, once.
+
+        Returns:
+            bool: False if there was nothing to refresh
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions.values())
+        if not subscriptions:
+            return False
+
+        if any(ids is None for ids in subscriptions):
+            self.bus.publish(
+                fetch_regions_health(self.regions), complete=True
+            )
+        else:
+            instance_ids = sorted(set().union(*subscriptions))
+            if self.resolver is None:
+                results = get_instances_health(
+                    instance_ids, region=self.regions[0]
+                )
+            else:
+                results = self.resolver.resolve_many(
+                    instance_ids,
+                    lambda region, ids: get_instances_health(
+                        ids, region=region
+                    ),
+                )
+            self.bus.publish(results)
+        return True
+
+    def _run(self):
+        """Refresh until nobody is subscribed, keeping going on errors."""
+        while True:
+            self._wakeup.clear()
+            try:
+                self.refresh_once()
+                self.last_error = None
+            except Exception as e:
+                # Subscribers keep the last known state until AWS recovers
+                self.last_error = e
+            self._wakeup.wait(self.interval)
+            with self._lock:
+                if not self._subscriptions:
+                    self._thread = None
+                    return
+
+
+class StreamLimiter:
+    """Cap on concurrently open event streams in this process.
+
+    Under gunicorn's threaded workers each open stream holds a request
+    thread for as long as the client stays connected, so without a cap
+    enough streams would leave no thread for ordinary lookups.
+
+    Args:
+        max_streams (int): Most open streams, or 0 for no limit
+    """
+
+    def __init__(self, max_streams):
+        self.max_streams = max_streams
+        self.rejected = 0
+        self._open = 0
+        self._lock = threading.Lock()
+
+    @property
+    def open_streams(self):
+        """Number of streams currently open."""
+        return self._open
+
+    def acquire(self):
+        """Take a slot for a new stream.
+
+        Returns:
+            bool: False if the limit is reached and the stream should be
+                  refused
+        """
+        with self._lock:
+            if self.max_streams and self._open >= self.max_streams:
+                self.rejected += 1
+                return False
+            self._open += 1
+            return True
+
+    def release(self):
+        """Give back the slot of a closed stream."""
+        with self._lock:
+            self._open -= 1
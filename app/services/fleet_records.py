@@ -0,0 +1,403 @@
+"""Compact in-memory representations of instance health.
+
+A health status dict with its keys, tag dict and strings costs several
+hundred bytes per instance, which adds up once snapshots, the event bus
+and the tag index each hold 100k+ instances. Here, the state, status
+check, health and availability zone strings are stored as small integer
+codes from shared codebooks, and tags as tuples of interned strings.
+
+:class:`InstanceHealth` is a slotted record for one instance;
+:class:`FleetColumns` holds a whole fleet as byte columns, so health for
+every instance is derived from the state and status columns with a
+single table lookup (:func:`map_health_codes`).
+"""
+import bisect
+import sys
+import threading
+from array import array
+from collections.abc import Mapping
+from operator import itemgetter
+
+from app.services.health_check import HEALTH_VALUES, map_health_status
+
+
+class Codebook:
+    """Interning table of the distinct values seen for one field.
+
+    Code 0 always stands for None. Unknown values get the next free
+    code, so the codes stay small no matter how many instances use them.
+
+    Args:
+        name (str): Field name, used in error messages
+        values (iterable): Values registered up front
+        limit (int): Maximum number of codes, including None
+    """
+
+    def __init__(self, name, values=(), limit=256):
+        self.name = name
+        self.limit = limit
+        self._values = [None]
+        self._codes = {None: 0}
+        self._lock = threading.Lock()
+        for value in values:
+            self.code(value)
+
+    def __len__(self):
+        return len(self._values)
+
+    def code(self, value):
+        """Return the code for ``value``, registering it if new.
+
+        Raises:
+            ValueError: If the codebook is full
+        """
+        code = self._codes.get(value)
+        if code is not None:
+            return code
+        with self._lock:
+            code = self._codes.get(value)
+            if code is None:
+                if len(self._values) >= self.limit:
+                    raise ValueError(
+                        f"More than {self.limit - 1} distinct {self.name} "
+                        "values"
+                    )
+                code = len(self._values)
+                self._values.append(sys.intern(value))
+                self._codes[value] = code
+            return code
+
+    def value(self, code):
+        """Return the value a code stands for."""
+        return self._values[code]
+
+
+# State and status check codes share one byte (four bits each), which is
+# what lets map_health_codes translate a whole column at once
+STATES = Codebook("state", (
+    "pending", "running", "shutting-down", "terminated", "stopping",
+    "stopped",
+), limit=16)
+STATUS_CODES = Codebook("status check", (
+    "ok", "impaired", "insufficient-data", "not-applicable",
+    "initializing", "failed", "unknown",
+), limit=16)
+HEALTH = Codebook("health", HEALTH_VALUES, limit=16)
+AVAILABILITY_ZONES = Codebook("availability zone")
+
+_EMPTY_TAGS = ()
+_health_table = (0, 0, b"")
+
+
+def pack_checks(state, status_code):
+    """Encode a state and status check result into one byte value."""
+    return STATES.code(state) << 4 | STATUS_CODES.code(status_code)
+
+
+def _checks_table():
+    """Return the 256-byte table mapping packed checks to health codes.
+
+    Rebuilt only when a new state or status check value has been seen.
+    """
+    global _health_table
+
+    sizes = (len(STATES), len(STATUS_CODES))
+    if _health_table[:2] != sizes:
+        table = bytearray(256)
+        for state_code in range(sizes[0]):
+            for status_code in range(sizes[1]):
+                table[state_code << 4 | status_code] = HEALTH.code(
+                    map_health_status(
+                        STATES.value(state_code),
+                        STATUS_CODES.value(status_code),
+                    )
+                )
+        _health_table = (*sizes, bytes(table))
+    return _health_table[2]
+
+
+def map_health_codes(checks):
+    """Map a column of packed checks to a column of health codes.
+
+    Applies :func:`~app.services.health_check.map_health_status` to every
+    instance with one ``bytes.translate`` call instead of a Python-level
+    comparison per instance.
+
+    Args:
+        checks (bytes-like): Values from :func:`pack_checks`
+
+    Returns:
+        bytes: Health codes from the ``HEALTH`` codebook
+    """
+    return bytes(checks).translate(_checks_table())
+
+
+def pack_tags(tags):
+    """Encode a tag dict as a flat tuple of interned keys and values."""
+    if not tags:
+        return _EMPTY_TAGS
+    packed = []
+    for key, value in sorted(tags.items()):
+        packed.append(sys.intern(key))
+        packed.append(sys.intern(value))
+    return tuple(packed)
+
+
+def unpack_tags(packed):
+    """Decode a tuple from :func:`pack_tags` back into a dict."""
+    return dict(zip(packed[::2], packed[1::2]))
+
+
+class InstanceHealth:
+    """Compact, immutable record of one instance's health status.
+
+    ``availability_zone`` and ``tags`` are only part of the record when
+    the status it was built from had them (fleet polls do, single
+    lookups do not), so :meth:`to_dict` returns the same keys it was
+    given.
+    """
+
+    __slots__ = ("_checks", "_health", "_zone", "_tags")
+
+    def __init__(self, checks, health, zone, tags):
+        self._checks = checks
+        self._health = health
+        self._zone = zone
+        self._tags = tags
+
+    @classmethod
+    def from_status(cls, status):
+        """Build a record from a health status dict.
+
+        The dict's 'health' is kept as given; it is derived from the
+        state and status check only if missing.
+        """
+        state = status.get("state")
+        status_code = status.get("status_code")
+        health = status.get("health")
+        if health is None:
+            health = map_health_status(state, status_code)
+        has_placement = "tags" in status
+        return cls(
+            pack_checks(state, status_code),
+            HEALTH.code(health),
+            AVAILABILITY_ZONES.code(status.get("availability_zone")),
+            pack_tags(status["tags"]) if has_placement else None,
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, InstanceHealth):
+            return NotImplemented
+        return (
+            self._checks == other._checks
+            and self._health == other._health
+            and self._zone == other._zone
+            and self._tags == other._tags
+        )
+
+    def __hash__(self):
+        return hash((self._checks, self._health, self._zone, self._tags))
+
+    @property
+    def state(self):
+        """EC2 instance state."""
+        return STATES.value(self._checks >> 4)
+
+    @property
+    def status_code(self):
+        """Instance status check result."""
+        return STATUS_CODES.value(self._checks & 0x0F)
+
+    @property
+    def health(self):
+        """Mapped health status."""
+        return HEALTH.value(self._health)
+
+    @property
+    def availability_zone(self):
+        """Availability zone, or None if unknown."""
+        return AVAILABILITY_ZONES.value(self._zone)
+
+    @property
+    def tags(self):
+        """Tag dict, or None if the record has no placement."""
+        return unpack_tags(self._tags) if self._tags is not None else None
+
+    @property
+    def has_placement(self):
+        """True if the record carries availability zone and tags."""
+        return self._tags is not None
+
+    def to_dict(self):
+        """Return the record as a health status dict."""
+        status = {
+            "state": self.state,
+            "status_code": self.status_code,
+            "health": self.health,
+        }
+        if self._tags is not None:
+            status["availability_zone"] = self.availability_zone
+            status["tags"] = unpack_tags(self._tags)
+        return status
+
+
+class FleetColumns(Mapping):
+    """Read-only mapping of instance ID to status, stored by column.
+
+    Instance IDs are kept sorted, and each other field is one column
+    indexed by position: packed checks, health and availability zone
+    codes are one byte per instance, tags one shared-string tuple.
+    Looking up an instance is a binary search; its status dict is only
+    built when asked for.
+
+    Use :meth:`build` for raw fleet data (health is derived for the whole
+    fleet at once) and :meth:`from_statuses` for existing status dicts.
+    """
+
+    __slots__ = ("_ids", "_checks", "_health", "_zones", "_tags")
+
+    def __init__(self, instance_ids, checks, health, zones, tags):
+        self._ids = instance_ids
+        self._checks = checks
+        self._health = health
+        self._zones = zones
+        self._tags = tags
+
+    @classmethod
+    def build(cls, rows):
+        """Encode raw fleet data, mapping health over the whole column.
+
+        Args:
+            rows (iterable): (instance ID, state, status check,
+                             availability zone, tag dict) tuples
+
+        Returns:
+            FleetColumns: The encoded fleet
+        """
+        ids = []
+        checks = array("B")
+        zones = array("B")
+        tags = []
+        for instance_id, state, status_code, zone, tag_dict in sorted(
+            rows, key=itemgetter(0)
+        ):
+            ids.append(instance_id)
+            checks.append(pack_checks(state, status_code))
+            zones.append(AVAILABILITY_ZONES.code(zone))
+            tags.append(pack_tags(tag_dict))
+        health = array("B", map_health_codes(checks))
+        return cls(ids, checks, health, zones, tags)
+
+    @classmethod
+    def from_statuses(cls, instances):
+        """Encode a mapping of instance ID to health status dict.
+
+        Each status keeps its own 'health' value.
+        """
+        if isinstance(instances, FleetColumns):
+            return instances
+        ids = []
+        checks = array("B")
+        health = array("B")
+        zones = array("B")
+        tags = []
+        for instance_id in sorted(instances):
+            record = InstanceHealth.from_status(instances[instance_id])
+            ids.append(instance_id)
+            checks.append(record._checks)
+            health.append(record._health)
+            zones.append(record._zone)
+            tags.append(record._tags or _EMPTY_TAGS)
+        return cls(ids, checks, health, zones, tags)
+
+    @classmethod
+    def merge(cls, parts):
+        """Combine fleets with disjoint instance IDs, e.g. one per region.
+
+        Rows are copied column by column, without building status dicts.
+
+        Args:
+            parts (list): FleetColumns (or status dict mappings)
+
+        Returns:
+            FleetColumns: Every instance from every part
+        """
+        parts = [cls.from_statuses(part) for part in parts]
+        if len(parts) == 1:
+            return parts[0]
+        rows = sorted(
+            (
+                (part._ids[i], part._checks[i], part._health[i],
+                 part._zones[i], part._tags[i])
+                for part in parts
+                for i in range(len(part._ids))
+            ),
+            key=itemgetter(0),
+        )
+        return cls(
+            [row[0] for row in rows],
+            array("B", [row[1] for row in rows]),
+            array("B", [row[2] for row in rows]),
+            array("B", [row[3] for row in rows]),
+            [row[4] for row in rows],
+        )
+
+    def _position(self, instance_id):
+        """Return the row of an instance, or -1 if absent."""
+        position = bisect.bisect_left(self._ids, instance_id)
+        if position < len(self._ids) and self._ids[position] == instance_id:
+            return position
+        return -1
+
+    def _status(self, position):
+        """Build the status dict for one row."""
+        checks = self._checks[position]
+        return {
+            "state": STATES.value(checks >> 4),
+            "status_code": STATUS_CODES.value(checks & 0x0F),
+            "health": HEALTH.value(self._health[position]),
+            "availability_zone": AVAILABILITY_ZONES.value(
+                self._zones[position]
+            ),
+            "tags": unpack_tags(self._tags[position]),
+        }
+
+    def __getitem__(self, instance_id):
+        position = self._position(instance_id)
+        if position < 0:
+            raise KeyError(instance_id)
+        return self._status(position)
+
+    def __contains__(self, instance_id):
+        return self._position(instance_id) >= 0
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def items(self):
+        """Yield (instance ID, status dict) pairs in instance ID order."""
+        for position, instance_id in enumerate(self._ids):
+            yield instance_id, self._status(position)
+
+    def record(self, instance_id):
+        """Return one instance as an InstanceHealth record, or None."""
+        position = self._position(instance_id)
+        if position < 0:
+            return None
+        return InstanceHealth(
+            self._checks[position],
+            self._health[position],
+            self._zones[position],
+            self._tags[position],
+        )
+
+    def health_counts(self):
+        """Count instances per health value straight from the column."""
+        column = self._health.tobytes()
+        return {
+            value: column.count(HEALTH.code(value))
+            for value in HEALTH_VALUES
+        }
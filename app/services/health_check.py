@@ -1,18 +1,57 @@
 """Health check service module."""
 import os
-import boto3
+from concurrent.futures import ThreadPoolExecutor
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
+from app.infrastructure.cloud.backend import get_client
+from app.infrastructure.metrics.prometheus import STAGE_LATENCY
 
 # Load environment variables
 load_dotenv()
 
+# EC2 accepts at most 200 values per filter, which bounds each chunk
+MAX_IDS_PER_CALL = 200
+
+# Health resolution modes for get_instance_health
+RESOLUTION_TWO_CALL = 'two-call'
+RESOLUTION_SINGLE_CALL = 'single-call'
+RESOLUTION_MODES = (RESOLUTION_TWO_CALL, RESOLUTION_SINGLE_CALL)
+
+
+# Every value map_health_status can return
+HEALTH_VALUES = (
+    'healthy',
+    'initializing',
+    'unhealthy',
+    'stopped',
+    'terminated',
+    'unknown',
+)
+
+# Health of a running instance by status check result; anything else
+# (initializing, insufficient-data, impaired, unknown) is 'initializing'
+_RUNNING_HEALTH = {
+    'ok': 'healthy',
+    'failed': 'unhealthy',
+}
+
+# Health of every other state, whatever its status checks say
+_STATE_HEALTH = {
+    'stopped': 'stopped',
+    'terminated': 'terminated',
+    'stopping': 'initializing',
+    'pending': 'initializing',
+}
+
 
 def map_health_status(state, status_code):
     """Map EC2 instance state and status checks to human-readable health status.
 
     User Story 2 implementation: Map raw AWS state and status codes to
-    a simple, human-readable health status.
+    a simple, human-readable health status. The rules are lookup tables
+    rather than a chain of comparisons; for whole fleets,
+    :func:`app.services.fleet_records.map_health_codes` applies them to
+    encoded columns in one pass.
 
     Args:
         state (str): EC2 instance state (running, stopped, terminated, stopping, pending, etc.)
@@ -27,35 +66,12 @@ def map_health_status(state, status_code):
             - "terminated": Instance is terminated
             - "unknown": Unknown or transitional state
     """
-    # Handle stopped and terminated states
-    if state == 'stopped':
-        return 'stopped'
-    elif state == 'terminated':
-        return 'terminated'
-
-    # Handle running state with status checks
-    elif state == 'running':
-        if status_code == 'ok':
-            return 'healthy'
-        elif status_code == 'initializing':
-            return 'initializing'
-        elif status_code == 'insufficient-data':
-            return 'initializing'
-        elif status_code == 'failed':
-            return 'unhealthy'
-        else:  # unknown, or other values
-            return 'initializing'
-
-    # Handle transitional states
-    elif state in ['stopping', 'pending']:
-        return 'initializing'
-
-    # Default for unknown states
-    else:
-        return 'unknown'
+    if state == 'running':
+        return _RUNNING_HEALTH.get(status_code, 'initializing')
+    return _STATE_HEALTH.get(state, 'unknown')
 
 
-def get_instance_health(instance_id):
+def get_instance_health(instance_id, mode=RESOLUTION_TWO_CALL, region=None):
     """Get health status of an EC2 instance.
 
     Queries AWS EC2 API to get instance state and status checks.
@@ -64,8 +80,14 @@ def get_instance_health(instance_id):
     User Story 2 implementation: Uses boto3 to query real AWS EC2 instance data
     and derives health status from state + status checks.
 
+    In 'single-call' mode the state is read from the ``InstanceState`` that
+    ``describe_instance_status(IncludeAllInstances=True)`` already returns,
+    and ``describe_instances`` is only called when that response is empty.
+
     Args:
         instance_id (str): AWS EC2 instance ID (e.g., i-0123456789abcdef0)
+        mode (str): 'two-call' (default) or 'single-call'
+        region (str): AWS region to query (default: AWS_REGION env var)
 
     Returns:
         dict: Health status with 'state', 'status_code', and 'health' keys,
@@ -75,16 +97,37 @@ def get_instance_health(instance_id):
         ClientError: If AWS API call fails (invalid credentials, no permissions, etc.)
     """
     try:
-        # Get region from environment
-        region = os.getenv('AWS_REGION', 'us-east-1')
+        # Get region from environment unless the caller picked one
+        if region is None:
+            region = os.getenv('AWS_REGION', 'us-east-1')
+
+        # Reuse the pooled EC2 client for this region
+        ec2_client = get_client(region)
 
-        # Initialize EC2 client with correct region
-        ec2_client = boto3.client('ec2', region_name=region)
+        status_response = None
+        if mode == RESOLUTION_SINGLE_CALL:
+            with STAGE_LATENCY.time(stage='ec2_describe_instance_status'):
+                status_response = ec2_client.describe_instance_status(
+                    InstanceIds=[instance_id],
+                    IncludeAllInstances=True
+                )
+            if status_response['InstanceStatuses']:
+                status = status_response['InstanceStatuses'][0]
+                instance_state = status['InstanceState']['Name']
+                instance_status = status.get('InstanceStatus', {})
+                status_code = instance_status.get('Status', 'unknown')
+                return {
+                    'state': instance_state,
+                    'status_code': status_code,
+                    'health': map_health_status(instance_state, status_code)
+                }
+            # No status data: fall back to describe_instances for the state
 
         # Get instance state
-        instances_response = ec2_client.describe_instances(
-            InstanceIds=[instance_id]
-        )
+        with STAGE_LATENCY.time(stage='ec2_describe_instances'):
+            instances_response = ec2_client.describe_instances(
+                InstanceIds=[instance_id]
+            )
 
         # Check if instance exists
         if not instances_response['Reservations']:
@@ -93,11 +136,13 @@ def get_instance_health(instance_id):
         instance = instances_response['Reservations'][0]['Instances'][0]
         instance_state = instance['State']['Name']
 
-        # Get instance status checks
-        status_response = ec2_client.describe_instance_status(
-            InstanceIds=[instance_id],
-            IncludeAllInstances=True
-        )
+        # Get instance status checks (already fetched in single-call mode)
+        if status_response is None:
+            with STAGE_LATENCY.time(stage='ec2_describe_instance_status'):
+                status_response = ec2_client.describe_instance_status(
+                    InstanceIds=[instance_id],
+                    IncludeAllInstances=True
+                )
 
         # Extract status checks (if instance has status info)
         status_code = 'unknown'
@@ -127,3 +172,109 @@ def get_instance_health(instance_id):
     except Exception as e:
         # Unexpected errors
         raise e
+
+
+def _describe_chunk(ec2_client, instance_ids):
+    """Resolve health for one chunk of instance IDs.
+
+    Instances are looked up with an ``instance-id`` filter rather than
+    ``InstanceIds`` so that unknown or malformed IDs are simply absent
+    from the response instead of failing the whole call with
+    ``InvalidInstanceID.NotFound``.
+
+    Args:
+        ec2_client: EC2 client for the region
+        instance_ids (list): At most MAX_IDS_PER_CALL instance IDs
+
+    Returns:
+        dict: Maps each found instance ID to its health status dict
+    """
+    states = {}
+    paginator = ec2_client.get_paginator('describe_instances')
+    pages = paginator.paginate(
+        Filters=[{'Name': 'instance-id', 'Values': instance_ids}]
+    )
+    with STAGE_LATENCY.time(stage='ec2_describe_instances'):
+        for page in pages:
+            for reservation in page['Reservations']:
+                for instance in reservation['Instances']:
+                    states[instance['InstanceId']] = (
+                        instance['State']['Name']
+                    )
+
+    if not states:
+        return {}
+
+    # Only IDs that exist are passed on, so this call cannot hit NotFound
+    status_codes = {}
+    paginator = ec2_client.get_paginator('describe_instance_status')
+    pages = paginator.paginate(
+        InstanceIds=list(states),
+        IncludeAllInstances=True
+    )
+    with STAGE_LATENCY.time(stage='ec2_describe_instance_status'):
+        for page in pages:
+            for status in page['InstanceStatuses']:
+                instance_status = status.get('InstanceStatus', {})
+                status_codes[status['InstanceId']] = instance_status.get(
+                    'Status', 'unknown'
+                )
+
+    results = {}
+    for instance_id, instance_state in states.items():
+        status_code = status_codes.get(instance_id, 'unknown')
+        results[instance_id] = {
+            'state': instance_state,
+            'status_code': status_code,
+            'health': map_health_status(instance_state, status_code)
+        }
+    return results
+
+
+def get_instances_health(instance_ids, max_workers=4, region=None):
+    """Get health status of many EC2 instances in a few API calls.
+
+    IDs are de-duplicated and split into chunks of MAX_IDS_PER_CALL. Each
+    chunk costs one ``describe_instances`` and one
+    ``describe_instance_status`` call, and chunks run concurrently.
+
+    Args:
+        instance_ids (list): AWS EC2 instance IDs
+        max_workers (int): Maximum number of chunks queried in parallel
+        region (str): AWS region to query (default: AWS_REGION env var)
+
+    Returns:
+        dict: Maps every requested instance ID to a health status dict
+              (same shape as get_instance_health), or None if not found
+
+    Raises:
+        ClientError: If an AWS API call fails for a reason other than an
+                     unknown instance ID
+    """
+    unique_ids = list(dict.fromkeys(instance_ids))
+    if not unique_ids:
+        return {}
+
+    if region is None:
+        region = os.getenv('AWS_REGION', 'us-east-1')
+    ec2_client = get_client(region)
+
+    chunks = [
+        unique_ids[i:i + MAX_IDS_PER_CALL]
+        for i in range(0, len(unique_ids), MAX_IDS_PER_CALL)
+    ]
+
+    found = {}
+    if len(chunks) == 1:
+        found.update(_describe_chunk(ec2_client, chunks[0]))
+    else:
+        workers = max(1, min(max_workers, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_describe_chunk, ec2_client, chunk)
+                for chunk in chunks
+            ]
+            for future in futures:
+                found.update(future.result())
+
+    return {instance_id: found.get(instance_id) for instance_id in unique_ids}
@@ -0,0 +1,171 @@
+"""Bounded per-instance history of health transitions."""
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+from app.services.fleet_records import HEALTH
+
+
+class _Ring:
+    """Fixed-size ring buffer of (timestamp, health code) transitions.
+
+    Two preallocated arrays hold the entries, so an instance costs the
+    same whether it changed twice or two thousand times.
+    """
+
+    __slots__ = ("times", "codes", "start", "count", "total", "last_seen")
+
+    def __init__(self, capacity):
+        self.times = array("d", bytes(8 * capacity))
+        self.codes = array("B", bytes(capacity))
+        self.start = 0
+        self.count = 0
+        # Transitions ever appended, including overwritten ones
+        self.total = 0
+        self.last_seen = 0.0
+
+    def last_code(self):
+        """Return the newest health code, or None if empty."""
+        if not self.count:
+            return None
+        capacity = len(self.codes)
+        return self.codes[(self.start + self.count - 1) % capacity]
+
+    def append(self, timestamp, code):
+        """Add an entry, overwriting the oldest once full."""
+        capacity = len(self.codes)
+        if self.count < capacity:
+            position = (self.start + self.count) % capacity
+            self.count += 1
+        else:
+            position = self.start
+            self.start = (self.start + 1) % capacity
+        self.times[position] = timestamp
+        self.codes[position] = code
+        self.total += 1
+
+    def entries(self):
+        """Return entries oldest first as (timestamp, code, is_change).
+
+        ``is_change`` is False for the first health ever recorded, which
+        has nothing to change from.
+        """
+        capacity = len(self.codes)
+        first_index = self.total - self.count
+        return [
+            (
+                self.times[(self.start + i) % capacity],
+                self.codes[(self.start + i) % capacity],
+                first_index + i > 0,
+            )
+            for i in range(self.count)
+        ]
+
+
+class HealthHistory:
+    """Recent health transitions per instance, with flap detection.
+
+    Only changes of mapped health are stored, in a ring buffer of
+    ``capacity`` entries per instance. At most ``max_instances``
+    instances are tracked; the least recently seen are evicted first,
+    as is any instance not seen for ``idle_ttl`` seconds.
+
+    Args:
+        capacity (int): Transitions kept per instance
+        max_instances (int): Instances tracked at once
+        idle_ttl (float): Seconds after which an unseen instance is
+                          dropped
+        clock (callable): Wall-clock time source, overridable in tests
+    """
+
+    def __init__(self, capacity=32, max_instances=100000, idle_ttl=86400.0,
+                 clock=time.time):
+        self.capacity = capacity
+        self.max_instances = max_instances
+        self.idle_ttl = idle_ttl
+        self._clock = clock
+        self._rings = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rings)
+
+    def record(self, instance_id, status):
+        """Note an instance's latest health status.
+
+        Args:
+            instance_id (str): Instance the result is for
+            status (dict): Health status dict, or None if the instance no
+                           longer exists (its history is kept until it
+                           ages out)
+        """
+        if status is None:
+            return
+        now = self._clock()
+        code = HEALTH.code(status.get("health"))
+        with self._lock:
+            ring = self._rings.get(instance_id)
+            if ring is None:
+                ring = _Ring(self.capacity)
+                self._rings[instance_id] = ring
+            else:
+                self._rings.move_to_end(instance_id)
+            ring.last_seen = now
+            if ring.last_code() != code:
+                ring.append(now, code)
+            self._evict(now)
+
+    def _evict(self, now):
+        """Drop idle and excess instances. Caller holds the lock."""
+        while len(self._rings) > self.max_instances:
+            self._rings.popitem(last=False)
+        while self._rings:
+            oldest = next(iter(self._rings.values()))
+            if now - oldest.last_seen < self.idle_ttl:
+                break
+            self._rings.popitem(last=False)
+
+    def history(self, instance_id, window=600.0, flap_threshold=4):
+        """Return an instance's transitions and flap statistics.
+
+        Args:
+            instance_id (str): Instance to report on
+            window (float): Seconds back to count transitions over
+            flap_threshold (int): Transitions within ``window`` at which
+                                  the instance counts as flapping
+
+        Returns:
+            dict: 'transitions' oldest first, each with 'timestamp'
+                  (epoch seconds), 'health' and 'previous_health';
+                  'flap_count', 'flapping' and 'truncated' (True if
+                  older transitions were overwritten), or None if the
+                  instance has no history
+        """
+        with self._lock:
+            ring = self._rings.get(instance_id)
+            if ring is None:
+                return None
+            entries = ring.entries()
+            truncated = ring.total > ring.count
+        since = self._clock() - window
+
+        transitions = []
+        previous = None
+        flap_count = 0
+        for timestamp, code, is_change in entries:
+            health = HEALTH.value(code)
+            transitions.append({
+                "timestamp": timestamp,
+                "health": health,
+                "previous_health": previous,
+            })
+            if is_change and timestamp >= since:
+                flap_count += 1
+            previous = health
+        return {
+            "transitions": transitions,
+            "flap_count": flap_count,
+            "flapping": flap_count >= flap_threshold,
+            "truncated": truncated,
+        }
@@ -0,0 +1,272 @@
+"""Background poller that keeps a fleet-wide health snapshot in memory."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from app.infrastructure.cloud.backend import get_client
+from app.services.fleet_records import FleetColumns
+
+
+# Largest page size EC2 accepts for both describe calls
+PAGE_SIZE = 1000
+
+# Seconds between checks for a new snapshot in the shared store
+STORE_CHECK_INTERVAL = 1.0
+
+
+class FleetSnapshot:
+    """Immutable view of every instance's health in a region.
+
+    Instances are held as :class:`FleetColumns`, a few bytes per instance
+    plus its ID, with status dicts built only when looked up.
+
+    Args:
+        instances (Mapping): Maps instance ID to a health status dict with
+                             'state', 'status_code' and 'health' keys
+        taken_at (datetime): UTC time the snapshot was completed
+        taken_at_monotonic (float): Monotonic time, used to compute age
+        generation (int): Shared store generation it was saved as, if any
+    """
+
+    __slots__ = ("instances", "taken_at", "generation",
+                 "_taken_at_monotonic")
+
+    def __init__(self, instances, taken_at, taken_at_monotonic,
+                 generation=None):
+        self.instances = FleetColumns.from_statuses(instances)
+        self.taken_at = taken_at
+        self.generation = generation
+        self._taken_at_monotonic = taken_at_monotonic
+
+    def __len__(self):
+        return len(self.instances)
+
+    def get(self, instance_id):
+        """Return the health status dict for an instance, or None."""
+        return self.instances.get(instance_id)
+
+    def age_seconds(self):
+        """Return how long ago the snapshot was taken, in seconds."""
+        return time.monotonic() - self._taken_at_monotonic
+
+
+def fetch_fleet_health(ec2_client):
+    """Page through every instance in the region and classify its health.
+
+    Costs ceil(N / PAGE_SIZE) calls to each of ``describe_instances`` and
+    ``describe_instance_status``, independent of API request rate. The
+    availability zone and tags that ``describe_instances`` already returns
+    are kept alongside each instance's health.
+
+    Args:
+        ec2_client: EC2 client for the region
+
+    Returns:
+        FleetColumns: Read-only mapping of instance ID to a health status
+                      dict, with 'availability_zone' and 'tags' in
+                      addition to the usual keys
+    """
+    states = {}
+    placements = {}
+    paginator = ec2_client.get_paginator('describe_instances')
+    for page in paginator.paginate(PaginationConfig={'PageSize': PAGE_SIZE}):
+        for reservation in page['Reservations']:
+            for instance in reservation['Instances']:
+                instance_id = instance['InstanceId']
+                states[instance_id] = instance['State']['Name']
+                placements[instance_id] = (
+                    instance.get('Placement', {}).get('AvailabilityZone'),
+                    {
+                        tag['Key']: tag['Value']
+                        for tag in instance.get('Tags', [])
+                    },
+                )
+
+    status_codes = {}
+    paginator = ec2_client.get_paginator('describe_instance_status')
+    pages = paginator.paginate(
+        IncludeAllInstances=True,
+        PaginationConfig={'PageSize': PAGE_SIZE}
+    )
+    for page in pages:
+        for status in page['InstanceStatuses']:
+            instance_status = status.get('InstanceStatus', {})
+            status_codes[status['InstanceId']] = instance_status.get(
+                'Status', 'unknown'
+            )
+
+    # Health is mapped for the whole fleet at once, column by column
+    return FleetColumns.build(
+        (
+            instance_id,
+            instance_state,
+            status_codes.get(instance_id, 'unknown'),
+            *placements[instance_id],
+        )
+        for instance_id, instance_state in states.items()
+    )
+
+
+def fetch_regions_health(regions):
+    """Fetch the fleet of every region, in parallel, as one mapping.
+
+    Instance IDs are unique across regions, so the regional fleets are
+    simply combined. A failure in any region fails the whole fetch.
+
+    Args:
+        regions (list): AWS regions to fetch
+
+    Returns:
+        FleetColumns: Every instance in every region
+    """
+    def fetch(region):
+        return fetch_fleet_health(get_client(region))
+
+    if len(regions) == 1:
+        return fetch(regions[0])
+    with ThreadPoolExecutor(
+        max_workers=len(regions), thread_name_prefix="fleet-fetch"
+    ) as executor:
+        return FleetColumns.merge(list(executor.map(fetch, regions)))
+
+
+class FleetPoller:
+    """Refresh a FleetSnapshot of one or more regions on a fixed interval.
+
+    Each poll builds a brand new snapshot and swaps it in with a single
+    reference assignment, so readers never see a half-built fleet and
+    never need a lock.
+
+    With a shared store, only the process holding the writer role polls
+    AWS and writes each snapshot to the store; every other process picks
+    up new snapshots from the store instead. A snapshot already in the
+    store (e.g. from before a restart) is served straight away, and the
+    writer only polls AWS once it is a full interval old, so sharing the
+    store never adds AWS calls.
+
+    Args:
+        regions (list): AWS regions to poll; a single region name is also
+                        accepted
+        interval (float): Seconds between the start of successive polls
+        store (SharedHealthStore): Optional snapshot store shared between
+                                   processes
+    """
+
+    def __init__(self, regions, interval=30.0, store=None):
+        if isinstance(regions, str):
+            regions = [regions]
+        self.regions = list(regions)
+        self.interval = interval
+        self.store = store
+        self.snapshot = None
+        self.last_error = None
+        self._listeners = []
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def poll_once(self):
+        """Fetch the fleet and publish a new snapshot.
+
+        With a shared store, adopts the stored snapshot instead when this
+        process is not the writer or the stored one is less than an
+        interval old.
+
+        Returns:
+            FleetSnapshot: The snapshot now being served, or None if a
+                           reader has nothing to serve yet
+        """
+        if self.store is not None:
+            stored = self.store.load_snapshot()
+            writer = self.store.claim_writer()
+            if stored is not None and (
+                not writer or stored.age_seconds() < self.interval
+            ):
+                return self._adopt(stored)
+            if not writer:
+                return None
+
+        taken_at = datetime.utcnow()
+        instances = fetch_regions_health(self.regions)
+        generation = None
+        if self.store is not None:
+            generation = self.store.write(instances, taken_at)
+        snapshot = FleetSnapshot(
+            instances, taken_at, time.monotonic(), generation
+        )
+        self._swap(snapshot)
+        return snapshot
+
+    def _adopt(self, stored):
+        """Serve a snapshot from the store, if it is a new one."""
+        current = self.snapshot
+        if current is None or (
+            current.generation != stored.generation
+            and current.taken_at <= stored.taken_at
+        ):
+            self._swap(stored)
+        return self.snapshot
+
+    def _swap(self, snapshot):
+        """Serve ``snapshot`` and notify listeners."""
+        self.snapshot = snapshot
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception:
+                # A failing listener must not stop snapshots being served
+                pass
+
+    def add_listener(self, listener):
+        """Call ``listener(snapshot)`` after every successful poll."""
+        self._listeners.append(listener)
+
+    def start(self):
+        """Start polling in a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="fleet-poller", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop polling and wait for the current poll to finish.
+
+        Also gives up the shared store's writer role, so another process
+        can take over.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self.store is not None:
+            self.store.release_writer()
+
+    def _run(self):
+        """Poll until stopped, keeping the last snapshot on errors."""
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self.poll_once()
+                self.last_error = None
+            except Exception as e:
+                # Keep serving the previous snapshot until AWS recovers
+                self.last_error = e
+            self._stop_event.wait(self._next_wait(started))
+
+    def _next_wait(self, started):
+        """Return seconds until the next poll or shared store check."""
+        if self.store is None or self.last_error is not None:
+            return max(0.0, self.interval - (time.monotonic() - started))
+        # Readers, and writers serving a stored snapshot, look for a newer
+        # one every STORE_CHECK_INTERVAL, and check again just as the
+        # served snapshot becomes an interval old
+        wait = STORE_CHECK_INTERVAL
+        snapshot = self.snapshot
+        if snapshot is not None:
+            remaining = self.interval - snapshot.age_seconds()
+            if 0 < remaining < wait:
+                wait = remaining
+        return wait
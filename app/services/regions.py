@@ -0,0 +1,325 @@
+"""Multi-region instance lookup with a learned instance-to-region index."""
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+class RegionIndex:
+    """Bounded, thread-safe LRU map of instance ID to region.
+
+    Entries learned or forgotten since the last load or save are tracked
+    separately, so that :meth:`save` only writes what this process found
+    out and merges it into the file other processes may have written.
+
+    Args:
+        max_entries (int): Maximum number of remembered instances
+    """
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._regions = OrderedDict()
+        self._learned = {}
+        self._forgotten = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._regions)
+
+    @property
+    def changed(self):
+        """True if entries were learned or forgotten since the last save."""
+        return bool(self._learned or self._forgotten)
+
+    def get(self, instance_id):
+        """Return the remembered region for an instance, or None."""
+        with self._lock:
+            region = self._regions.get(instance_id)
+            if region is not None:
+                self._regions.move_to_end(instance_id)
+            return region
+
+    def remember(self, instance_id, region):
+        """Record the region an instance was found in."""
+        with self._lock:
+            self._remember(instance_id, region)
+            self._learned[instance_id] = region
+            self._forgotten.discard(instance_id)
+
+    def _remember(self, instance_id, region):
+        """Add or refresh an entry. Caller holds the lock."""
+        self._regions[instance_id] = region
+        self._regions.move_to_end(instance_id)
+        while len(self._regions) > self.max_entries:
+            evicted, _ = self._regions.popitem(last=False)
+            self._learned.pop(evicted, None)
+
+    def forget(self, instance_id):
+        """Drop an instance, e.g. after it was not found in its region."""
+        with self._lock:
+            if self._regions.pop(instance_id, None) is not None:
+                self._forgotten.add(instance_id)
+            self._learned.pop(instance_id, None)
+
+    def save(self, path):
+        """Merge what this process learned into a JSON file.
+
+        Nothing is written if no entries were learned or forgotten since
+        the last load or save, so a process that never served a lookup
+        (e.g. a preforking server's master) cannot overwrite what its
+        workers saved. Otherwise the file is re-read under an exclusive
+        lock, updated with this process's changes and replaced through a
+        unique temporary file, so concurrent savers never clobber or
+        truncate each other's work.
+
+        Args:
+            path (str): Destination file path
+
+        Returns:
+            bool: True if the file was written
+        """
+        with self._lock:
+            learned = dict(self._learned)
+            forgotten = set(self._forgotten)
+        if not learned and not forgotten:
+            return False
+
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        with open(f"{path}.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            data = _read_index(path)
+            for instance_id in forgotten:
+                data.pop(instance_id, None)
+            for instance_id, region in learned.items():
+                # Re-insert so the newest entries survive trimming
+                data.pop(instance_id, None)
+                data[instance_id] = region
+            excess = len(data) - self.max_entries
+            if excess > 0:
+                data = dict(list(data.items())[excess:])
+
+            fd, tmp_path = tempfile.mkstemp(
+                dir=directory, prefix=os.path.basename(path) + ".",
+                suffix=".tmp",
+            )
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+        with self._lock:
+            for instance_id, region in learned.items():
+                if self._learned.get(instance_id) == region:
+                    del self._learned[instance_id]
+            self._forgotten -= forgotten
+        return True
+
+    def load(self, path):
+        """Load entries saved by ``save``; a missing file is ignored.
+
+        Loaded entries do not count as changes to save.
+
+        Args:
+            path (str): Source file path
+        """
+        data = _read_index(path)
+        with self._lock:
+            for instance_id, region in data.items():
+                self._remember(instance_id, region)
+
+
+def _read_index(path):
+    """Return the index saved at ``path``, or {} if missing or corrupt."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+class RegionResolver:
+    """Find which configured region an instance lives in.
+
+    Known instances are looked up directly in their remembered region.
+    Unknown instances are looked up in every region in parallel; the
+    first region that finds the instance wins, lookups that have not
+    started yet are cancelled, and the mapping is remembered.
+
+    Args:
+        regions (list): AWS regions to search
+        index (RegionIndex): Learned instance-to-region index
+        max_workers (int): Threads used for parallel fan-out
+        index_path (str): Optional file the index is persisted to
+    """
+
+    def __init__(self, regions, index=None, max_workers=8, index_path=None):
+        self.regions = list(regions)
+        self.index = index if index is not None else RegionIndex()
+        self.index_path = index_path
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(self.regions))),
+            thread_name_prefix="region-fanout",
+        )
+        if index_path:
+            self.index.load(index_path)
+
+    def resolve(self, instance_id, lookup):
+        """Look up an instance across the configured regions.
+
+        Args:
+            instance_id (str): AWS EC2 instance ID
+            lookup (callable): ``lookup(region)`` returning a health status
+                               dict, or None if not found in that region
+
+        Returns:
+            dict: Health status from the region that found the instance,
+                  or None if no region knows it
+
+        Raises:
+            Exception: The first lookup error, if no region found the
+                       instance and at least one lookup failed
+        """
+        region = self.index.get(instance_id)
+        if region is not None:
+            result = lookup(region)
+            if result is not None:
+                return result
+            # Remembered region no longer knows it; search everywhere else
+            self.index.forget(instance_id)
+            others = [r for r in self.regions if r != region]
+        else:
+            others = self.regions
+
+        return self._fan_out(instance_id, others, lookup)
+
+    def resolve_many(self, instance_ids, lookup):
+        """Look up many instances across the configured regions.
+
+        Instances with a remembered region are looked up there, one call
+        per region. The rest, and any no longer in their remembered
+        region, are looked up in every other region. Each stage queries
+        its regions in parallel.
+
+        Args:
+            instance_ids (list): AWS EC2 instance IDs
+            lookup (callable): ``lookup(region, instance_ids)`` returning
+                               a dict of instance ID to health status
+                               dict, or None if not found in that region
+
+        Returns:
+            dict: Maps every requested instance ID to its health status
+                  dict, or None if no region knows it
+
+        Raises:
+            Exception: The first lookup error, if some instance was not
+                       found and at least one lookup failed
+        """
+        unique_ids = list(dict.fromkeys(instance_ids))
+        remembered = {}
+        by_region = {}
+        for instance_id in unique_ids:
+            region = self.index.get(instance_id)
+            if region is not None:
+                remembered[instance_id] = region
+                by_region.setdefault(region, []).append(instance_id)
+
+        found = {}
+        failed = self._gather(by_region, lookup, found)
+        missing = [i for i in unique_ids if i not in found]
+        for instance_id in missing:
+            region = remembered.get(instance_id)
+            if region is not None and region not in failed:
+                # Remembered region no longer knows it
+                self.index.forget(instance_id)
+
+        searches = {}
+        for region in self.regions:
+            ids = [i for i in missing if remembered.get(i) != region]
+            if ids:
+                searches[region] = ids
+        for region, error in self._gather(searches, lookup, found).items():
+            failed.setdefault(region, error)
+
+        if failed and len(found) < len(unique_ids):
+            raise next(iter(failed.values()))
+        return {instance_id: found.get(instance_id)
+                for instance_id in unique_ids}
+
+    def _gather(self, by_region, lookup, found):
+        """Run batch lookups in parallel and remember where IDs were found.
+
+        Args:
+            by_region (dict): Maps region to the instance IDs to look up
+            lookup (callable): See :meth:`resolve_many`
+            found (dict): Updated with every instance found
+
+        Returns:
+            dict: Maps each region whose lookup failed to its error
+        """
+        futures = {
+            region: self._executor.submit(lookup, region, ids)
+            for region, ids in by_region.items()
+        }
+        failed = {}
+        for region, future in futures.items():
+            try:
+                results = future.result()
+            except Exception as e:
+                failed[region] = e
+                continue
+            for instance_id, status in results.items():
+                if status is not None and instance_id not in found:
+                    found[instance_id] = status
+                    self.index.remember(instance_id, region)
+        return failed
+
+    def _fan_out(self, instance_id, regions, lookup):
+        """Query regions in parallel and return the first hit."""
+        if not regions:
+            return None
+
+        pending = {
+            self._executor.submit(lookup, region): region
+            for region in regions
+        }
+        first_error = None
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    region = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        if first_error is None:
+                            first_error = e
+                        continue
+                    if result is not None:
+                        self.index.remember(instance_id, region)
+                        return result
+        finally:
+            for future in pending:
+                future.cancel()
+
+        if first_error is not None:
+            raise first_error
+        return None
+
+    def close(self):
+        """Persist the index, if configured, and stop the fan-out pool."""
+        if self.index_path:
+            self.index.save(self.index_path)
+        self._executor.shutdown(wait=False)
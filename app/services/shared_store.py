@@ -0,0 +1,311 @@
+"""Fleet snapshot shared by every worker process through SQLite.
+
+With several gunicorn workers, each running its own fleet poller would
+multiply AWS calls by the worker count. Instead, one process (the
+writer) polls AWS and stores each snapshot in a local SQLite database in
+WAL mode; every other worker reads from it. WAL lets readers keep
+answering from the previous snapshot while a new one is written, and
+lookups are indexed point queries, so no worker copies the whole fleet
+to answer a request. The file outlives the processes, so a restarted
+deploy serves the last snapshot straight away instead of stampeding EC2.
+"""
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Mapping
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+ROLE_AUTO = "auto"
+ROLE_WRITER = "writer"
+ROLE_READER = "reader"
+ROLES = (ROLE_AUTO, ROLE_WRITER, ROLE_READER)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS instances (
+    instance_id TEXT PRIMARY KEY,
+    state TEXT,
+    status_code TEXT,
+    health TEXT,
+    availability_zone TEXT,
+    tags TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+_COLUMNS = "instance_id, state, status_code, health, availability_zone, tags"
+
+
+def _row_to_status(row):
+    """Convert an ``instances`` row to a health status dict."""
+    return {
+        "state": row[1],
+        "status_code": row[2],
+        "health": row[3],
+        "availability_zone": row[4],
+        "tags": json.loads(row[5]) if row[5] else {},
+    }
+
+
+class StoredInstances(Mapping):
+    """Read-only mapping of instance ID to status, backed by the store.
+
+    Looking up one instance is a single indexed query; iterating streams
+    rows from the database without building a dict of the fleet.
+    """
+
+    def __init__(self, store, count):
+        self._store = store
+        self._count = count
+
+    def __getitem__(self, instance_id):
+        status = self._store.get(instance_id)
+        if status is None:
+            raise KeyError(instance_id)
+        return status
+
+    def __iter__(self):
+        for row in self._store.rows():
+            yield row[0]
+
+    def __len__(self):
+        return self._count
+
+    def items(self):
+        """Yield (instance ID, status dict) pairs in one pass."""
+        for row in self._store.rows():
+            yield row[0], _row_to_status(row)
+
+
+class StoredSnapshot:
+    """A fleet snapshot that lives in the shared store.
+
+    Has the same interface as :class:`app.services.poller.FleetSnapshot`.
+    Age is measured with the wall clock, since the snapshot may have been
+    written by another process or before a restart. Lookups always see
+    the latest committed snapshot, which may be slightly newer than
+    ``taken_at`` until the reader notices the new generation.
+
+    Args:
+        store (SharedHealthStore): Store holding the instances
+        generation (int): Write counter identifying the snapshot
+        taken_at (datetime): UTC time the snapshot was completed
+        count (int): Number of instances in the snapshot
+    """
+
+    __slots__ = ("instances", "taken_at", "generation", "_store")
+
+    def __init__(self, store, generation, taken_at, count):
+        self.instances = StoredInstances(store, count)
+        self.taken_at = taken_at
+        self.generation = generation
+        self._store = store
+
+    def __len__(self):
+        return len(self.instances)
+
+    def get(self, instance_id):
+        """Return the health status dict for an instance, or None."""
+        return self._store.get(instance_id)
+
+    def age_seconds(self):
+        """Return how long ago the snapshot was taken, in seconds."""
+        return max(0.0, (datetime.utcnow() - self.taken_at).total_seconds())
+
+
+class SharedHealthStore:
+    """SQLite-backed fleet snapshot with a single elected writer.
+
+    Each thread gets its own connection, reopened after ``fork()``. The
+    writer is whichever process holds an exclusive ``flock`` on
+    ``<path>.lock``; the lock is dropped when the process exits, so
+    another worker takes over if the writer dies.
+
+    Args:
+        path (str): Database file path, created if missing
+        role (str): 'auto' to elect a writer through the lock file,
+                    'writer' to always write, or 'reader' to never write
+        busy_timeout (float): Seconds to wait for a locked database
+    """
+
+    def __init__(self, path, role=ROLE_AUTO, busy_timeout=5.0):
+        if role not in ROLES:
+            raise ValueError(f"role must be one of {', '.join(ROLES)}")
+        self.path = path
+        self.role = role
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._lock_file = None
+        self._lock_pid = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _connection(self):
+        """Return this thread's connection, opening it if needed."""
+        pid = os.getpid()
+        if getattr(self._local, "pid", None) != pid:
+            # A connection inherited through fork() must not be used
+            connection = sqlite3.connect(
+                self.path, timeout=self.busy_timeout,
+                isolation_level=None, check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._local.connection = connection
+            self._local.pid = pid
+        return self._local.connection
+
+    def claim_writer(self):
+        """Return True if this process may write snapshots.
+
+        With role 'auto', tries to take the writer lock without blocking
+        and keeps it until :meth:`release_writer` or process exit.
+        """
+        if self.role != ROLE_AUTO:
+            return self.role == ROLE_WRITER
+        if fcntl is None:
+            return True
+        if self._lock_file is not None and self._lock_pid != os.getpid():
+            # Inherited through fork(): the parent still owns the lock.
+            # Closing our copy leaves the parent's lock in place.
+            self._lock_file.close()
+            self._lock_file = None
+        if self._lock_file is not None:
+            return True
+
+        lock_file = open(f"{self.path}.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        self._lock_pid = os.getpid()
+        return True
+
+    def is_writer(self):
+        """Return True if this process writes snapshots, without claiming.
+
+        With role 'auto', only the process currently holding the writer
+        lock (taken by the poller through :meth:`claim_writer`) counts.
+        """
+        if self.role != ROLE_AUTO:
+            return self.role == ROLE_WRITER
+        if fcntl is None:
+            return True
+        return self._lock_file is not None and self._lock_pid == os.getpid()
+
+    def release_writer(self):
+        """Give up the writer lock so another process can take over."""
+        if self._lock_file is None:
+            return
+        if self._lock_pid == os.getpid():
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+        self._lock_file.close()
+        self._lock_file = None
+
+    def write(self, instances, taken_at):
+        """Replace the stored snapshot in a single transaction.
+
+        Args:
+            instances (dict): Maps instance ID to a health status dict
+            taken_at (datetime): UTC time the snapshot was completed
+
+        Returns:
+            int: Generation number of the new snapshot
+        """
+        connection = self._connection()
+        rows = (
+            (
+                instance_id,
+                status.get("state"),
+                status.get("status_code"),
+                status.get("health"),
+                status.get("availability_zone"),
+                json.dumps(status.get("tags") or {}, sort_keys=True),
+            )
+            for instance_id, status in instances.items()
+        )
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("DELETE FROM instances")
+            connection.executemany(
+                f"INSERT INTO instances ({_COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            generation = self._meta(connection).get("generation", 0) + 1
+            connection.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [
+                    ("generation", str(generation)),
+                    ("taken_at", taken_at.isoformat()),
+                    ("count", str(len(instances))),
+                ],
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return generation
+
+    @staticmethod
+    def _meta(connection):
+        """Read the snapshot metadata as a dict."""
+        meta = dict(connection.execute("SELECT key, value FROM meta"))
+        return {
+            "generation": int(meta.get("generation", 0)),
+            "taken_at": meta.get("taken_at"),
+            "count": int(meta.get("count", 0)),
+        }
+
+    def generation(self):
+        """Return the latest snapshot's generation, or 0 if none."""
+        return self._meta(self._connection())["generation"]
+
+    def load_snapshot(self):
+        """Return the latest stored snapshot, or None if there is none.
+
+        Only reads the metadata; instances are queried on demand.
+        """
+        meta = self._meta(self._connection())
+        if not meta["generation"]:
+            return None
+        return StoredSnapshot(
+            self,
+            meta["generation"],
+            datetime.fromisoformat(meta["taken_at"]),
+            meta["count"],
+        )
+
+    def get(self, instance_id):
+        """Return one instance's stored health status dict, or None."""
+        row = self._connection().execute(
+            f"SELECT {_COLUMNS} FROM instances WHERE instance_id = ?",
+            (instance_id,),
+        ).fetchone()
+        return _row_to_status(row) if row is not None else None
+
+    def rows(self):
+        """Yield every stored instance row in instance ID order."""
+        yield from self._connection().execute(
+            f"SELECT {_COLUMNS} FROM instances ORDER BY instance_id"
+        )
+
+    def close(self):
+        """Release the writer lock and this thread's connection."""
+        self.release_writer()
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and self._local.pid == os.getpid():
+            connection.close()
+        self._local = threading.local()
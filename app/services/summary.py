@@ -0,0 +1,154 @@
+"""Fleet-wide health counts maintained incrementally."""
+import threading
+
+from app.services.health_check import HEALTH_VALUES
+
+
+DIMENSION_AZ = "availability_zone"
+TAG_DIMENSION_PREFIX = "tag:"
+
+
+class _Record:
+    """What one instance currently contributes to the counts."""
+
+    __slots__ = ("health", "state", "availability_zone", "tags")
+
+    def __init__(self, health, state, availability_zone, tags):
+        self.health = health
+        self.state = state
+        self.availability_zone = availability_zone
+        self.tags = tags
+
+    def __eq__(self, other):
+        return (
+            self.health == other.health
+            and self.state == other.state
+            and self.availability_zone == other.availability_zone
+            and self.tags == other.tags
+        )
+
+    def groups(self):
+        """Yield the (dimension, value) groups this instance belongs to."""
+        if self.availability_zone is not None:
+            yield DIMENSION_AZ, self.availability_zone
+        for key, value in self.tags.items():
+            yield TAG_DIMENSION_PREFIX + key, value
+
+
+def _adjust(counts, key, delta):
+    """Add ``delta`` to ``counts[key]``, dropping keys that reach zero."""
+    value = counts.get(key, 0) + delta
+    if value:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
+
+
+class FleetSummary:
+    """Counts of instances by health, state, availability zone and tag.
+
+    Each :meth:`update` moves a single instance between buckets, so
+    reading the summary costs the same for ten instances or fifty
+    thousand: nothing is ever recomputed by scanning the fleet.
+
+    Results without 'availability_zone' or 'tags' (single-instance
+    lookups) keep whatever placement was last seen for the instance.
+    """
+
+    def __init__(self):
+        self._records = {}
+        self._by_health = {}
+        self._by_state = {}
+        # dimension -> group value -> health -> count
+        self._groups = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._records)
+
+    def update(self, instance_id, status):
+        """Record an instance's latest health status.
+
+        Args:
+            instance_id (str): Instance the result is for
+            status (dict): Health status dict, or None if the instance no
+                           longer exists
+        """
+        with self._lock:
+            previous = self._records.get(instance_id)
+            if status is None:
+                if previous is not None:
+                    self._apply(previous, -1)
+                    del self._records[instance_id]
+                return
+
+            record = _Record(
+                status.get("health"),
+                status.get("state"),
+                status.get(
+                    "availability_zone",
+                    previous.availability_zone if previous else None,
+                ),
+                status.get("tags", previous.tags if previous else {}),
+            )
+            if previous is not None:
+                if record == previous:
+                    return
+                self._apply(previous, -1)
+            self._apply(record, 1)
+            self._records[instance_id] = record
+
+    def _apply(self, record, delta):
+        """Add or remove one record's counts. Caller holds the lock."""
+        _adjust(self._by_health, record.health, delta)
+        _adjust(self._by_state, record.state, delta)
+        for dimension, value in record.groups():
+            groups = self._groups.setdefault(dimension, {})
+            counts = groups.setdefault(value, {})
+            _adjust(counts, record.health, delta)
+            if not counts:
+                del groups[value]
+                if not groups:
+                    del self._groups[dimension]
+
+    def dimensions(self):
+        """Return the dimensions a summary can be broken down by."""
+        with self._lock:
+            return sorted(self._groups)
+
+    def summary(self, dimension=None):
+        """Return the current counts.
+
+        Args:
+            dimension (str): Optional breakdown, 'availability_zone' or
+                             'tag:<key>'
+
+        Returns:
+            dict: 'total', 'by_health' and 'by_state' counts, plus
+                  'breakdown' mapping each group value to its total and
+                  health counts when a dimension is given
+        """
+        with self._lock:
+            result = {
+                "total": len(self._records),
+                "by_health": _with_all_health_values(self._by_health),
+                "by_state": dict(self._by_state),
+            }
+            if dimension is not None:
+                result["breakdown"] = {
+                    value: {
+                        "total": sum(counts.values()),
+                        "by_health": _with_all_health_values(counts),
+                    }
+                    for value, counts in self._groups.get(
+                        dimension, {}
+                    ).items()
+                }
+            return result
+
+
+def _with_all_health_values(counts):
+    """Return health counts including zeros for absent health values."""
+    result = dict.fromkeys(HEALTH_VALUES, 0)
+    result.update(counts)
+    return result
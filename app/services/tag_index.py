@@ -0,0 +1,182 @@
+"""Inverted index from tags, health, state and zone to instance IDs."""
+import bisect
+import threading
+
+from app.services.fleet_records import InstanceHealth
+
+
+FIELD_HEALTH = "health"
+FIELD_STATE = "state"
+FIELD_AZ = "availability_zone"
+FIELD_TAG = "tag"
+
+
+def _terms(record):
+    """Return the index terms an instance's record is filed under."""
+    terms = {
+        (FIELD_HEALTH, record.health),
+        (FIELD_STATE, record.state),
+    }
+    if record.availability_zone is not None:
+        terms.add((FIELD_AZ, record.availability_zone))
+    for key, value in (record.tags or {}).items():
+        terms.add((FIELD_TAG, key, value))
+    return terms
+
+
+class InstanceIndex:
+    """Latest status per instance with posting sets for fast filtering.
+
+    Every term (a health value, state, availability zone, or tag
+    key/value pair) maps to the set of instance IDs that currently have
+    it. :meth:`update` only touches the terms that changed for one
+    instance, and :meth:`query` intersects posting sets starting from the
+    smallest, so neither ever walks the whole fleet. Instance IDs are
+    also kept sorted, so :meth:`page` can resume after any ID in
+    logarithmic time.
+
+    Results without 'availability_zone' or 'tags' (single-instance
+    lookups) keep whatever placement was last seen for the instance.
+    Statuses are stored as compact :class:`InstanceHealth` records.
+    """
+
+    def __init__(self):
+        self._records = {}
+        self._postings = {}
+        self._sorted_ids = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._records)
+
+    def update(self, instance_id, status):
+        """Re-file one instance under its latest status.
+
+        Args:
+            instance_id (str): Instance the result is for
+            status (dict): Health status dict, or None if the instance no
+                           longer exists
+        """
+        with self._lock:
+            previous = self._records.get(instance_id)
+            old_terms = _terms(previous) if previous is not None else set()
+
+            if status is None:
+                if previous is None:
+                    return
+                new_terms = set()
+                del self._records[instance_id]
+                position = bisect.bisect_left(self._sorted_ids, instance_id)
+                del self._sorted_ids[position]
+            else:
+                if previous is None:
+                    bisect.insort(self._sorted_ids, instance_id)
+                if "tags" not in status and previous is not None and (
+                    previous.has_placement
+                ):
+                    status = dict(
+                        status,
+                        availability_zone=previous.availability_zone,
+                        tags=previous.tags,
+                    )
+                record = InstanceHealth.from_status(status)
+                new_terms = _terms(record)
+                self._records[instance_id] = record
+
+            for term in old_terms - new_terms:
+                ids = self._postings[term]
+                ids.discard(instance_id)
+                if not ids:
+                    del self._postings[term]
+            for term in new_terms - old_terms:
+                self._postings.setdefault(term, set()).add(instance_id)
+
+    def query(self, filters):
+        """Return instances matching every filter.
+
+        Args:
+            filters (list): One list of terms per filter. An instance
+                            matches a filter if it has any of its terms,
+                            and must match all filters. Terms are tuples
+                            such as ``("health", "unhealthy")`` or
+                            ``("tag", "service", "checkout")``.
+
+        Returns:
+            dict: Maps matching instance IDs, in sorted order, to their
+                  latest status dicts
+        """
+        with self._lock:
+            candidates = []
+            for terms in filters:
+                postings = [self._postings.get(term, ()) for term in terms]
+                if len(postings) == 1:
+                    candidates.append(postings[0])
+                else:
+                    candidates.append(set().union(*postings))
+            if not candidates:
+                return {}
+
+            candidates.sort(key=len)
+            matches = set(candidates[0])
+            for ids in candidates[1:]:
+                if not matches:
+                    break
+                matches.intersection_update(ids)
+            return {
+                instance_id: self._records[instance_id].to_dict()
+                for instance_id in sorted(matches)
+            }
+
+    def page(self, after=None, limit=100):
+        """Return instances in instance ID order, after a given ID.
+
+        Args:
+            after (str): Return only IDs sorting after this one (None
+                         starts from the beginning)
+            limit (int): Maximum number of instances to return
+
+        Returns:
+            tuple: (list of (instance ID, status dict) pairs, bool that is
+                   True if more instances follow)
+        """
+        with self._lock:
+            start = 0
+            if after is not None:
+                start = bisect.bisect_right(self._sorted_ids, after)
+            ids = self._sorted_ids[start:start + limit]
+            more = start + limit < len(self._sorted_ids)
+            return [(i, self._records[i].to_dict()) for i in ids], more
+
+    def iter_instances(self, after=None, chunk_size=1000):
+        """Yield (instance ID, status) pairs in ID order.
+
+        The lock is held for one chunk at a time, never while the caller
+        consumes rows, so a slow reader does not block updates.
+        """
+        while True:
+            rows, more = self.page(after, chunk_size)
+            yield from rows
+            if not more or not rows:
+                return
+            after = rows[-1][0]
+
+
+def parse_tag_filter(value):
+    """Parse a tag filter into a ``(key, value)`` pair.
+
+    Accepts ``key=value`` or ``key:value``. With a colon, the last colon
+    separates key and value, so keys such as ``aws:cloudformation:
+    stack-name`` work; use ``=`` for values that contain colons.
+
+    Raises:
+        ValueError: If the filter has no separator or an empty key
+    """
+    if "=" in value:
+        key, _, tag_value = value.partition("=")
+    else:
+        key, sep, tag_value = value.rpartition(":")
+        if not sep:
+            key = ""
+    if not key:
+        raise ValueError(f"Invalid tag filter: {value!r}")
+    return key, tag_value
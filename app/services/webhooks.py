@@ -0,0 +1,287 @@
+"""Batched webhook notifications of instance health transitions.
+
+The dispatcher follows the health event bus like a stream subscriber.
+The bus already diffs successive results, so only instances whose
+mapped health changed arrive here. Instances seen for the first time
+(including everything on the first poll after startup) and instances
+that disappear are not transitions and are not sent. Changes are
+collected for a short window, collapsed to one net change per instance,
+and POSTed in batches by a bounded pool of delivery threads. Requests
+only ever publish to the bus, so a slow or failing receiver can never
+hold up a response.
+
+Every worker process has its own bus, and with a shared fleet store they
+all see the same poll results. Only one of them should deliver, so the
+dispatcher can be given a ``leader`` check (the shared store's writer);
+the others follow the bus but send nothing. Each batch carries a random
+``batch_id``, repeated in the ``Idempotency-Key`` header on every retry,
+so receivers can drop duplicates whichever process sent them.
+"""
+import hashlib
+import hmac
+import json
+import random
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+# Status codes worth retrying; any other 4xx means the batch is rejected
+RETRY_STATUS_CODES = frozenset((408, 425, 429, 500, 502, 503, 504))
+SIGNATURE_HEADER = "X-Webhook-Signature"
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# Which processes deliver: the shared store's writer (or every process
+# when there is no shared store), every process, or none
+ROLE_AUTO = "auto"
+ROLE_SENDER = "sender"
+ROLE_OFF = "off"
+ROLES = (ROLE_AUTO, ROLE_SENDER, ROLE_OFF)
+
+
+def coalesce(events):
+    """Collapse health events into one net change per instance.
+
+    Args:
+        events (list): HealthEvent objects, oldest first
+
+    Returns:
+        list: Change dicts in order of each instance's last event, with
+              'previous_health' from its first event in the batch and
+              the latest status. Instances that ended up back where they
+              started are left out.
+    """
+    changes = {}
+    for event in events:
+        if event.status is None or event.previous_health is None:
+            continue
+        change = changes.pop(event.instance_id, None)
+        payload = event.to_dict()
+        if change is not None:
+            payload["previous_health"] = change["previous_health"]
+            payload["transitions"] = change["transitions"] + 1
+        else:
+            payload["transitions"] = 1
+        changes[event.instance_id] = payload
+    return [
+        change for change in changes.values()
+        if change["health"] != change["previous_health"]
+    ]
+
+
+def sign(body, secret):
+    """Return the HMAC-SHA256 signature header value for a body."""
+    digest = hmac.new(secret.encode("utf-8"), body, hashlib.sha256)
+    return "sha256=" + digest.hexdigest()
+
+
+class WebhookDispatcher:
+    """Coalesce health changes and deliver them to webhook URLs.
+
+    Args:
+        bus (HealthEventBus): Bus to follow
+        urls (list): Receiver URLs; every batch goes to each of them
+        window (float): Seconds changes are collected before sending
+        max_batch (int): Most changes in one POST
+        workers (int): Concurrent deliveries
+        max_pending (int): Deliveries queued or running before new
+                           batches are dropped
+        max_retries (int): Extra attempts after a failed delivery
+        backoff (float): Delay before the first retry, doubled (with
+                         jitter) for each further one
+        max_backoff (float): Longest delay between attempts
+        timeout (float): Seconds to wait for a receiver to respond
+        secret (str): Optional key for signing bodies with HMAC-SHA256
+        leader (callable): Optional check returning True while this
+                           process should deliver; changes seen while it
+                           returns False are counted as skipped
+
+    Raises:
+        ValueError: If a URL is not http:// or https://
+    """
+
+    def __init__(self, bus, urls, window=2.0, max_batch=500, workers=4,
+                 max_pending=100, max_retries=5, backoff=0.5,
+                 max_backoff=30.0, timeout=5.0, secret=None, leader=None):
+        for url in urls:
+            if urllib.parse.urlsplit(url).scheme not in ("http", "https"):
+                raise ValueError(f"Webhook URL must be http(s): {url!r}")
+        self.bus = bus
+        self.urls = list(urls)
+        self.window = window
+        self.max_batch = max_batch
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.secret = secret
+        self.leader = leader
+        self.delivered = 0
+        self.failed = 0
+        self.retried = 0
+        self.dropped = 0
+        self.missed_events = 0
+        self.skipped = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._executor = None
+        self._thread = None
+
+    def start(self):
+        """Follow the bus from its latest event in a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="webhook-delivery"
+        )
+        self._thread = threading.Thread(
+            target=self._run, args=(self.bus.last_event_id,),
+            name="webhook-dispatcher", daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Send what has been collected and wait for deliveries to end.
+
+        Retries still waiting for their backoff are abandoned.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self):
+        """Return delivery counters and the number of pending deliveries."""
+        with self._lock:
+            return {
+                "delivered": self.delivered,
+                "failed": self.failed,
+                "retried": self.retried,
+                "dropped": self.dropped,
+                "missed_events": self.missed_events,
+                "skipped": self.skipped,
+                "pending": self._pending,
+            }
+
+    def _run(self, last_id):
+        """Collect events for a window at a time and dispatch them."""
+        while True:
+            stopping = self._stop_event.is_set()
+            events = self.bus.wait(last_id, 0 if stopping else self.window)
+            if events and not stopping:
+                # Let the rest of the window's changes arrive
+                self._stop_event.wait(self.window)
+                events = self.bus.wait(last_id, 0)
+            if events is None:
+                # Fell behind the bus buffer; skip to the present
+                resume = self.bus.last_event_id
+                with self._lock:
+                    self.missed_events += resume - last_id
+                last_id = resume
+            elif events:
+                last_id = events[-1].event_id
+                changes = coalesce(events)
+                if self.leader is None or self.leader():
+                    self.dispatch(changes)
+                else:
+                    with self._lock:
+                        self.skipped += len(changes)
+            if stopping:
+                return
+
+    def dispatch(self, changes):
+        """Queue batches of changes for delivery to every URL.
+
+        Never blocks: batches beyond ``max_pending`` are dropped.
+
+        Returns:
+            int: Deliveries queued
+        """
+        queued = 0
+        for start in range(0, len(changes), self.max_batch):
+            batch_id = uuid.uuid4().hex
+            body = json.dumps({
+                "batch_id": batch_id,
+                "sent_at": datetime.utcnow().isoformat() + "Z",
+                "changes": changes[start:start + self.max_batch],
+            }).encode("utf-8")
+            for url in self.urls:
+                with self._lock:
+                    if self._pending >= self.max_pending:
+                        self.dropped += 1
+                        continue
+                    self._pending += 1
+                self._executor.submit(self._deliver, url, body, batch_id)
+                queued += 1
+        return queued
+
+    def _deliver(self, url, body, batch_id):
+        """POST one batch, retrying with exponential backoff."""
+        try:
+            delay = self.backoff
+            for attempt in range(self.max_retries + 1):
+                delivered, retryable, retry_after = self._post(
+                    url, body, batch_id
+                )
+                if delivered:
+                    with self._lock:
+                        self.delivered += 1
+                    return
+                if not retryable or attempt == self.max_retries:
+                    break
+                with self._lock:
+                    self.retried += 1
+                wait = min(
+                    self.max_backoff,
+                    max(retry_after, delay * random.uniform(0.5, 1.5)),
+                )
+                if self._stop_event.wait(wait):
+                    break
+                delay *= 2
+            with self._lock:
+                self.failed += 1
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _post(self, url, body, batch_id):
+        """Send one attempt.
+
+        Returns:
+            tuple: (True if delivered, True if worth retrying, seconds the
+                   receiver asked to wait before retrying, or 0)
+        """
+        headers = {
+            "Content-Type": "application/json",
+            IDEMPOTENCY_HEADER: batch_id,
+        }
+        if self.secret:
+            headers[SIGNATURE_HEADER] = sign(body, self.secret)
+        request = urllib.request.Request(
+            url, data=body, headers=headers, method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout):
+                return True, False, 0.0
+        except urllib.error.HTTPError as e:
+            if e.code not in RETRY_STATUS_CODES:
+                return False, False, 0.0
+            try:
+                retry_after = float(e.headers.get("Retry-After") or 0)
+            except ValueError:
+                retry_after = 0.0
+            return False, True, retry_after
+        except (urllib.error.URLError, OSError):
+            # Connection refused, timed out, DNS failure and the like
+            return False, True, 0.0
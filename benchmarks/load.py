@@ -0,0 +1,341 @@
+"""Throughput and latency benchmarks for the Health Check API.
+
+Drives the app from ``create_app`` through the Flask test client and
+through a real threaded WSGI server, against the in-memory fake EC2
+backend with configurable latency. Results are written as JSON and can
+be compared with a previous run to fail on regressions.
+
+Usage:
+    python -m benchmarks.load --output bench.json
+    python -m benchmarks.load --baseline bench.json --max-regression 0.2
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from app.config import TestingConfig
+from app.infrastructure.cloud import backend
+from app.infrastructure.logging import logger
+from app.main import create_app
+
+
+VALID_KEY = "test-key-1"
+INVALID_KEY = "invalid-key"
+
+
+def percentile(sorted_values, fraction):
+    """Return the value at ``fraction`` (0-1) of a sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def measure(operation, requests, concurrency, setup=None):
+    """Run ``operation`` ``requests`` times across ``concurrency`` threads.
+
+    Args:
+        operation (callable): ``operation(state)`` performing one request
+                              and returning True on success
+        requests (int): Total number of operations
+        concurrency (int): Number of worker threads
+        setup (callable): Optional per-thread factory for ``state``
+
+    Returns:
+        dict: requests, errors, requests_per_sec and p50/p95/p99 in ms
+    """
+    remaining = [requests]
+    lock = threading.Lock()
+    latencies = []
+    errors = [0]
+
+    def worker():
+        state = setup() if setup else None
+        local = []
+        local_errors = 0
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= 1
+            started = time.perf_counter()
+            ok = operation(state)
+            local.append(time.perf_counter() - started)
+            if not ok:
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def build_app(log_dir, cache_enabled, async_logging, latency, fleet_size):
+    """Create the app on the fake EC2 backend with chosen features."""
+    config_class = type("BenchmarkConfig", (TestingConfig,), {
+        "LOG_FILE": os.path.join(log_dir, "api.log"),
+        "HEALTH_CACHE_ENABLED": cache_enabled,
+        "LOG_ASYNC_ENABLED": async_logging,
+        "CLOUD_BACKEND": "fake",
+        "FAKE_FLEET_SIZE": fleet_size,
+        "FAKE_EC2_LATENCY_MS": latency * 1000,
+        # Measure the service, not the per-key and outbound quotas
+        "API_KEY_RATE_LIMIT": 0,
+        "EC2_RATE_LIMIT_ENABLED": False,
+    })
+    return create_app(config_class)
+
+
+def pick_instance():
+    """Return the ID of the first instance in the fake fleet."""
+    client = backend.get_client(os.getenv("AWS_REGION", "us-east-1"))
+    return client, client.fleet.ordered_ids[0]
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """Request handler that skips per-request access logging."""
+
+    def log_request(self, *args, **kwargs):
+        """Do not print an access log line for every request."""
+
+
+def flask_client_scenarios(app, instance_id, requests, concurrency):
+    """Benchmark endpoints through the Flask test client."""
+    def get(path, key):
+        def operation(client):
+            response = client.get(path, headers={"X-API-Key": key})
+            return response.status_code < 500
+        return operation
+
+    path = f"/api/health/{instance_id}"
+    return {
+        "test_client.single_instance": measure(
+            get(path, VALID_KEY), requests, concurrency, app.test_client
+        ),
+        "test_client.auth_failure": measure(
+            get(path, INVALID_KEY), requests, concurrency, app.test_client
+        ),
+    }
+
+
+def wsgi_scenarios(app, instance_id, requests, concurrency):
+    """Benchmark endpoints through a real threaded WSGI server."""
+    server = make_server(
+        "127.0.0.1", 0, app, threaded=True,
+        request_handler=QuietRequestHandler,
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.server_port
+
+    def get(path, key):
+        def operation(_):
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+            try:
+                conn.request("GET", path, headers={"X-API-Key": key})
+                response = conn.getresponse()
+                response.read()
+                return response.status < 500
+            except OSError:
+                return False
+            finally:
+                conn.close()
+        return operation
+
+    path = f"/api/health/{instance_id}"
+    try:
+        return {
+            "wsgi.single_instance": measure(
+                get(path, VALID_KEY), requests, concurrency
+            ),
+            "wsgi.auth_failure": measure(
+                get(path, INVALID_KEY), requests, concurrency
+            ),
+        }
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def logging_scenarios(requests, concurrency):
+    """Benchmark log_request directly, synchronous and queued."""
+    def operation(_):
+        logger.log_request(
+            method="GET",
+            path="/api/health/i-0123456789abcdef0",
+            api_key=VALID_KEY,
+            status_code=200,
+            result="ok",
+        )
+        return True
+
+    results = {}
+    with tempfile.TemporaryDirectory() as log_dir:
+        for name, async_logging in (("sync", False), ("async", True)):
+            logger.configure({
+                "LOG_FILE": os.path.join(log_dir, f"{name}.log"),
+                "LOG_ASYNC_ENABLED": async_logging,
+            })
+            results[f"logging.{name}"] = measure(
+                operation, requests, concurrency
+            )
+            logger.shutdown()
+    return results
+
+
+def run(requests=2000, concurrency=8, latency=0.005, cache_enabled=False,
+        async_logging=True, fleet_size=1000):
+    """Run every scenario and return the results document.
+
+    Args:
+        requests (int): Requests per scenario
+        concurrency (int): Concurrent client threads
+        latency (float): Simulated EC2 latency per call, in seconds
+        cache_enabled (bool): Enable the result cache in the app
+        async_logging (bool): Use the background log writer in the app
+        fleet_size (int): Instances in the fake fleet
+
+    Returns:
+        dict: 'meta' describing the run and 'results' per scenario
+    """
+    results = {}
+    previous_backend = backend.get_backend()
+    try:
+        with tempfile.TemporaryDirectory() as log_dir:
+            app = build_app(
+                log_dir, cache_enabled, async_logging, latency, fleet_size
+            )
+            client, instance_id = pick_instance()
+            results.update(flask_client_scenarios(
+                app, instance_id, requests, concurrency
+            ))
+            results.update(wsgi_scenarios(
+                app, instance_id, requests, concurrency
+            ))
+            logger.shutdown()
+        results.update(logging_scenarios(requests, concurrency))
+    finally:
+        backend.set_backend(previous_backend)
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "requests": requests,
+            "concurrency": concurrency,
+            "ec2_latency_ms": latency * 1000,
+            "cache_enabled": cache_enabled,
+            "async_logging": async_logging,
+            "fleet_size": fleet_size,
+            "ec2_calls": client.calls,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, max_regression):
+    """List scenarios that regressed past the allowed fraction.
+
+    A scenario regresses when its throughput drops, or its p99 latency
+    grows, by more than ``max_regression`` relative to the baseline.
+
+    Args:
+        current (dict): Results document from this run
+        baseline (dict): Results document from a previous run
+        max_regression (float): Allowed relative change (0.2 = 20%)
+
+    Returns:
+        list: Human-readable regression messages (empty if none)
+    """
+    regressions = []
+    for name, base in baseline.get("results", {}).items():
+        result = current.get("results", {}).get(name)
+        if result is None:
+            continue
+        base_rps = base["requests_per_sec"]
+        if base_rps and result["requests_per_sec"] < base_rps * (
+            1 - max_regression
+        ):
+            regressions.append(
+                f"{name}: {result['requests_per_sec']} req/s "
+                f"vs baseline {base_rps} req/s"
+            )
+        base_p99 = base["p99_ms"]
+        if base_p99 and result["p99_ms"] > base_p99 * (1 + max_regression):
+            regressions.append(
+                f"{name}: p99 {result['p99_ms']} ms "
+                f"vs baseline {base_p99} ms"
+            )
+    return regressions
+
+
+def main(argv=None):
+    """Command-line entry point. Returns the process exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=5.0,
+                        help="simulated EC2 latency per call")
+    parser.add_argument("--fleet-size", type=int, default=1000)
+    parser.add_argument("--cache", action="store_true",
+                        help="enable the result cache")
+    parser.add_argument("--sync-logging", action="store_true",
+                        help="write logs synchronously in the app")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    document = run(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        latency=args.latency_ms / 1000,
+        cache_enabled=args.cache,
+        async_logging=not args.sync_logging,
+        fleet_size=args.fleet_size,
+    )
+
+    text = json.dumps(document, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(document, baseline, args.max_regression)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""Memory benchmark for fleet-wide health data.
+
+Builds the same fake fleet as plain health status dicts, as slotted
+:class:`InstanceHealth` records and as :class:`FleetColumns`, and reports
+the memory each keeps alive per instance, plus the time taken to map
+health per instance versus over the whole column.
+
+Rows are decoded from JSON, like EC2 responses, so every string starts
+out as its own object; whatever a representation keeps referencing
+counts against it, and strings it interns or encodes can be freed.
+
+Usage:
+    python -m benchmarks.memory --size 100000 --output memory.json
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from app.infrastructure.cloud.fake_ec2 import FakeFleet
+from app.services.fleet_records import (
+    FleetColumns,
+    InstanceHealth,
+    map_health_codes,
+    pack_checks,
+)
+from app.services.health_check import map_health_status
+
+
+def fleet_rows_json(size, seed=42, region="us-east-1"):
+    """Return a fake fleet as a JSON document of raw rows."""
+    fleet = FakeFleet(region, size=size, seed=seed)
+    return json.dumps([
+        [i.instance_id, i.state, i.status, i.availability_zone, i.tags]
+        for i in fleet.instances.values()
+    ])
+
+
+def as_dicts(rows):
+    """Build the plain ``{instance_id: status dict}`` representation."""
+    return {
+        instance_id: {
+            "state": state,
+            "status_code": status_code,
+            "health": map_health_status(state, status_code),
+            "availability_zone": zone,
+            "tags": tags,
+        }
+        for instance_id, state, status_code, zone, tags in rows
+    }
+
+
+def as_records(rows):
+    """Build ``{instance_id: InstanceHealth}`` records."""
+    return {
+        instance_id: InstanceHealth.from_status({
+            "state": state,
+            "status_code": status_code,
+            "availability_zone": zone,
+            "tags": tags,
+        })
+        for instance_id, state, status_code, zone, tags in rows
+    }
+
+
+def as_columns(rows):
+    """Build a columnar :class:`FleetColumns` fleet."""
+    return FleetColumns.build(rows)
+
+
+REPRESENTATIONS = {
+    "dicts": as_dicts,
+    "records": as_records,
+    "columns": as_columns,
+}
+
+
+def retained_bytes(document, build):
+    """Return bytes still allocated after building from decoded rows."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        rows = json.loads(document)
+        result = build(rows)
+        del rows
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return retained
+
+
+def mapping_speed(document):
+    """Time per-instance versus whole-column health mapping, in ms."""
+    rows = json.loads(document)
+    started = time.perf_counter()
+    for _, state, status_code, _, _ in rows:
+        map_health_status(state, status_code)
+    per_instance = time.perf_counter() - started
+
+    checks = bytes(pack_checks(row[1], row[2]) for row in rows)
+    started = time.perf_counter()
+    map_health_codes(checks)
+    per_column = time.perf_counter() - started
+    return {
+        "per_instance_ms": round(per_instance * 1000, 3),
+        "per_column_ms": round(per_column * 1000, 3),
+    }
+
+
+def run(size=100000, seed=42):
+    """Measure every representation and return the results document.
+
+    Args:
+        size (int): Instances in the fake fleet
+        seed (int): Fleet seed
+
+    Returns:
+        dict: 'meta' describing the run, 'results' per representation
+              and 'health_mapping' timings
+    """
+    document = fleet_rows_json(size, seed)
+    results = {}
+    for name, build in REPRESENTATIONS.items():
+        retained = retained_bytes(document, build)
+        results[name] = {
+            "bytes": retained,
+            "bytes_per_instance": round(retained / size, 1),
+        }
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "size": size,
+            "seed": seed,
+        },
+        "results": results,
+        "health_mapping": mapping_speed(document),
+    }
+
+
+def main(argv=None):
+    """Command-line entry point. Returns the process exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args(argv)
+
+    document = run(size=args.size, seed=args.seed)
+    text = json.dumps(document, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
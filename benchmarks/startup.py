@@ -0,0 +1,187 @@
+"""Cold-start benchmark for the Health Check API.
+
+Each sample runs in a fresh Python process and times importing
+``app.main``, ``create_app`` and the first health request, once with the
+AWS SDK loaded lazily on first use and once with the startup warm-up
+(``EC2_WARMUP_ENABLED``). Medians over the samples are written as JSON.
+
+The default fake backend needs no AWS access. ``--backend boto3`` talks
+to real EC2, so it needs credentials and network access; the first
+request and warm-up then include credential resolution and TLS setup.
+
+Usage:
+    python -m benchmarks.startup --output startup.json
+    python -m benchmarks.startup --backend boto3 --repeats 5
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+
+VALID_KEY = "test-key-1"
+MODES = {
+    "lazy": {"EC2_WARMUP_ENABLED": "false"},
+    "warmup": {"EC2_WARMUP_ENABLED": "true"},
+}
+PHASES = ("import_ms", "create_app_ms", "first_request_ms", "total_ms")
+
+
+def _elapsed_ms(started):
+    """Return milliseconds since a ``time.perf_counter()`` reading."""
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def sample(instance_id=None):
+    """Time one cold start in the current process and return the result.
+
+    Must run in a process that has not imported the app yet; :func:`run`
+    calls it through ``python -m benchmarks.startup --sample``.
+
+    Args:
+        instance_id (str): Instance to look up (default: the first
+                           instance of the fake fleet)
+
+    Returns:
+        dict: Phase timings in ms, the first response's status code and
+              whether boto3 was imported after each phase
+    """
+    started = time.perf_counter()
+    from app.config import get_config_class
+    from app.main import create_app
+    result = {
+        "import_ms": _elapsed_ms(started),
+        "boto3_after_import": "boto3" in sys.modules,
+    }
+
+    phase = time.perf_counter()
+    app = create_app(get_config_class(default="testing"))
+    result["create_app_ms"] = _elapsed_ms(phase)
+    result["boto3_after_create_app"] = "boto3" in sys.modules
+
+    if instance_id is None:
+        from app.infrastructure.cloud import backend
+        fleet = backend.get_client(app.config["AWS_REGIONS"][0]).fleet
+        instance_id = fleet.ordered_ids[0]
+
+    phase = time.perf_counter()
+    response = app.test_client().get(
+        f"/api/health/{instance_id}", headers={"X-API-Key": VALID_KEY}
+    )
+    result["first_request_ms"] = _elapsed_ms(phase)
+    result["total_ms"] = _elapsed_ms(started)
+    result["status_code"] = response.status_code
+
+    from app.main import shutdown_app
+    shutdown_app(app)
+    return result
+
+
+def run_sample(mode, backend_name, instance_id, log_dir):
+    """Run :func:`sample` in a fresh interpreter for one mode."""
+    env = dict(
+        os.environ,
+        APP_ENV="testing",
+        CLOUD_BACKEND=backend_name,
+        LOG_FILE=os.path.join(log_dir, "api.log"),
+        # Measure startup, not the per-key and outbound quotas
+        API_KEY_RATE_LIMIT="0",
+        EC2_RATE_LIMIT_ENABLED="false",
+        **MODES[mode],
+    )
+    command = [sys.executable, "-m", "benchmarks.startup", "--sample"]
+    if instance_id:
+        command += ["--instance-id", instance_id]
+    completed = subprocess.run(
+        command, env=env, capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples):
+    """Reduce per-process samples to medians and flags."""
+    return {
+        **{
+            f"median_{phase}": round(
+                statistics.median(s[phase] for s in samples), 2
+            )
+            for phase in PHASES
+        },
+        "boto3_after_import": any(s["boto3_after_import"] for s in samples),
+        "boto3_after_create_app": any(
+            s["boto3_after_create_app"] for s in samples
+        ),
+        "status_codes": sorted({s["status_code"] for s in samples}),
+    }
+
+
+def run(repeats=5, backend_name="fake", instance_id=None):
+    """Sample every mode ``repeats`` times and return the results document.
+
+    Args:
+        repeats (int): Fresh processes per mode
+        backend_name (str): Cloud backend, 'fake' or 'boto3'
+        instance_id (str): Instance the first request looks up
+
+    Returns:
+        dict: 'meta' describing the run and 'results' per mode
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as log_dir:
+        for mode in MODES:
+            samples = [
+                run_sample(mode, backend_name, instance_id, log_dir)
+                for _ in range(repeats)
+            ]
+            results[mode] = summarize(samples)
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "repeats": repeats,
+            "backend": backend_name,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    """Command-line entry point. Returns the process exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--backend", choices=("fake", "boto3"),
+                        default="fake")
+    parser.add_argument("--instance-id",
+                        help="instance for the first request "
+                             "(default: first fake instance)")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--sample", action="store_true",
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.sample:
+        print(json.dumps(sample(args.instance_id)))
+        return 0
+
+    document = run(
+        repeats=args.repeats,
+        backend_name=args.backend,
+        instance_id=args.instance_id,
+    )
+    text = json.dumps(document, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""gunicorn settings for serving the Health Check API.
+
+Request handling is dominated by waiting on AWS, so the default is a few
+processes with many threads each (``gthread``) rather than one process
+per CPU core. Every setting can be overridden from the environment.
+
+The app is loaded once in the master (``preload_app``) and forked into
+workers. Background threads are stopped before the fork and restarted in
+each worker, and a worker that exits drains its log queue and cache
+refreshes first.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}")
+# gthread by default; gevent (pip install gevent) serves many long-lived
+# /api/health/stream connections without a thread each
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.getenv(
+    "GUNICORN_WORKERS", str(min(4, multiprocessing.cpu_count()))
+))
+# Each open /api/health/stream connection holds one thread, so at most
+# STREAM_MAX_CONNECTIONS of them are accepted per worker
+threads = int(os.getenv("GUNICORN_THREADS", "16"))
+# Concurrent connections per worker for async worker classes
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))
+# gevent patches the standard library when a worker starts, so with it
+# the app is loaded in each worker after patching instead of preloaded
+preload_app = worker_class == "gthread"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# Recycle workers now and then to bound memory growth
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+# Requests are logged by the app itself (see LOG_FILE); all workers append
+# to the same file and whichever worker crosses a limit rotates it
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def _application():
+    """Return the app preloaded by the master process."""
+    from wsgi import application
+
+    return application
+
+
+def when_ready(server):
+    """Stop the master's background threads before workers are forked."""
+    if not preload_app:
+        return
+    from app.main import stop_background_tasks
+
+    stop_background_tasks(_application())
+
+
+def post_fork(server, worker):
+    """Restart background threads inside each new worker."""
+    if not preload_app:
+        return
+    from app.main import start_background_tasks
+
+    start_background_tasks(_application())
+
+
+def worker_exit(server, worker):
+    """Drain the log queue and caches before the worker exits."""
+    from app.main import shutdown_app
+
+    shutdown_app(_application(), timeout=graceful_timeout / 2)
@@ -0,0 +1,54 @@
+"""Shared pytest fixtures."""
+import pytest
+
+from app.config import TestingConfig
+from app.infrastructure.cloud import backend, ec2_client, resilience
+from app.main import create_app
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test Flask application."""
+    app = create_app(TestingConfig)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    """Create a test client for the Flask application."""
+    return app.test_client()
+
+
+class FakeClock:
+    """Manually advanced clock; set or add to ``now`` to move time."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Return a controllable clock starting at 0."""
+    return FakeClock()
+
+
+@pytest.fixture
+def fleet_status():
+    """Return a factory for fleet health status dicts (zone and tags)."""
+    def build(health, state="running", zone="us-east-1a", **tags):
+        return {"state": state, "status_code": "ok", "health": health,
+                "availability_zone": zone, "tags": tags}
+    return build
+
+
+@pytest.fixture(autouse=True)
+def reset_ec2_clients():
+    """Drop pooled EC2 clients so each test sees its own boto3 patches."""
+    ec2_client.reset_clients()
+    yield
+    ec2_client.reset_clients()
+    backend.set_backend(backend.Boto3Backend())
+    resilience.configure({})
@@ -1,21 +1,6 @@
 """Test module for Health Check API endpoints."""
 import pytest
 import json
-from app.main import create_app
-from app.config import TestingConfig
-
-
-@pytest.fixture
-def app():
-    """Create and configure a test Flask application."""
-    app = create_app(TestingConfig)
-    return app
-
-
-@pytest.fixture
-def client(app):
-    """Create a test client for the Flask application."""
-    return app.test_client()
 
 
 @pytest.fixture
@@ -463,7 +448,7 @@ class TestHealthCheckServiceWithHealthStatus:
         
         # Mock boto3 client
         mock_client = mocker.MagicMock()
-        mocker.patch('app.services.health_check.boto3.client', return_value=mock_client)
+        mocker.patch('app.infrastructure.cloud.ec2_client.boto3.client', return_value=mock_client)
         
         # Setup mock responses
         mock_client.describe_instances.return_value = {
@@ -497,7 +482,7 @@ class TestHealthCheckServiceWithHealthStatus:
         
         # Mock boto3 client
         mock_client = mocker.MagicMock()
-        mocker.patch('app.services.health_check.boto3.client', return_value=mock_client)
+        mocker.patch('app.infrastructure.cloud.ec2_client.boto3.client', return_value=mock_client)
         
         # Setup mock responses for unhealthy instance
         mock_client.describe_instances.return_value = {
@@ -528,7 +513,7 @@ class TestHealthCheckServiceWithHealthStatus:
         
         # Mock boto3 client
         mock_client = mocker.MagicMock()
-        mocker.patch('app.services.health_check.boto3.client', return_value=mock_client)
+        mocker.patch('app.infrastructure.cloud.ec2_client.boto3.client', return_value=mock_client)
         
         # Setup mock responses for stopped instance
         mock_client.describe_instances.return_value = {
@@ -603,3 +588,365 @@ class TestHealthCheckEndpointWithHealthStatus:
         data = json.loads(response.data)
         assert data["health"] == "unhealthy"
 
+
+
+def _paginator_client(mocker, instances, statuses):
+    """Build a mock EC2 client whose paginators return the given data."""
+    mock_client = mocker.MagicMock()
+
+    def get_paginator(name):
+        paginator = mocker.MagicMock()
+        if name == "describe_instances":
+            def paginate(Filters):
+                wanted = set(Filters[0]["Values"])
+                return [{"Reservations": [{"Instances": [
+                    {"InstanceId": i, "State": {"Name": state}}
+                    for i, state in instances.items() if i in wanted
+                ]}]}]
+        else:
+            def paginate(InstanceIds, IncludeAllInstances):
+                return [{"InstanceStatuses": [
+                    {"InstanceId": i,
+                     "InstanceStatus": {"Status": statuses[i]}}
+                    for i in InstanceIds if i in statuses
+                ]}]
+        paginator.paginate.side_effect = paginate
+        return paginator
+
+    mock_client.get_paginator.side_effect = get_paginator
+    mocker.patch(
+        "app.infrastructure.cloud.ec2_client.boto3.client",
+        return_value=mock_client
+    )
+    return mock_client
+
+
+class TestBatchHealthService:
+    """Tests for get_instances_health batch resolution."""
+
+    def test_batch_maps_found_and_missing_ids(self, mocker):
+        """Test that unknown IDs come back as None without failing."""
+        from app.services.health_check import get_instances_health
+
+        _paginator_client(
+            mocker,
+            instances={"i-a": "running", "i-b": "stopped"},
+            statuses={"i-a": "ok"},
+        )
+
+        result = get_instances_health(["i-a", "i-b", "i-missing", "i-a"])
+
+        assert list(result) == ["i-a", "i-b", "i-missing"]
+        assert result["i-a"]["health"] == "healthy"
+        assert result["i-b"]["health"] == "stopped"
+        assert result["i-b"]["status_code"] == "unknown"
+        assert result["i-missing"] is None
+
+    def test_batch_chunks_to_per_call_limit(self, mocker):
+        """Test that IDs are split into chunks of MAX_IDS_PER_CALL."""
+        from app.services.health_check import (
+            MAX_IDS_PER_CALL,
+            get_instances_health,
+        )
+
+        ids = [f"i-{n:05d}" for n in range(MAX_IDS_PER_CALL * 2 + 1)]
+        mock_client = _paginator_client(
+            mocker,
+            instances={i: "running" for i in ids},
+            statuses={i: "ok" for i in ids},
+        )
+
+        result = get_instances_health(ids)
+
+        assert len(result) == len(ids)
+        assert all(r["health"] == "healthy" for r in result.values())
+        names = [c.args[0] for c in mock_client.get_paginator.call_args_list]
+        assert names.count("describe_instances") == 3
+        assert names.count("describe_instance_status") == 3
+
+
+class TestBatchHealthEndpoint:
+    """Test suite for the POST /api/health/batch endpoint."""
+
+    def test_batch_returns_per_id_results(
+        self, client, valid_api_key, mocker
+    ):
+        """Test that the batch endpoint reports found and missing IDs."""
+        mocker.patch(
+            "app.api.routes.get_instances_health",
+            return_value={
+                "i-a": {"state": "running", "status_code": "ok",
+                        "health": "healthy"},
+                "i-missing": None,
+            }
+        )
+
+        headers = {"X-API-Key": valid_api_key}
+        response = client.post(
+            "/api/health/batch",
+            json={"instance_ids": ["i-a", "i-missing"]},
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["results"]["i-a"]["health"] == "healthy"
+        assert data["results"]["i-missing"] == {"error": "Instance not found"}
+        assert data["timestamp"].endswith("Z")
+
+    def test_batch_requires_api_key(self, client):
+        """Test that the batch endpoint is protected by the API key check."""
+        response = client.post(
+            "/api/health/batch", json={"instance_ids": ["i-a"]}
+        )
+
+        assert response.status_code == 401
+
+    def test_batch_rejects_malformed_body(self, client, valid_api_key):
+        """Test that a missing or empty instance_ids list returns 400."""
+        headers = {"X-API-Key": valid_api_key}
+
+        response = client.post(
+            "/api/health/batch", json={}, headers=headers
+        )
+        assert response.status_code == 400
+
+        response = client.post(
+            "/api/health/batch", json={"instance_ids": [1]}, headers=headers
+        )
+        assert response.status_code == 400
+
+    def test_batch_rejects_oversized_request(
+        self, app, client, valid_api_key
+    ):
+        """Test that requests above BATCH_MAX_INSTANCES return 400."""
+        app.config["BATCH_MAX_INSTANCES"] = 2
+        headers = {"X-API-Key": valid_api_key}
+
+        response = client.post(
+            "/api/health/batch",
+            json={"instance_ids": ["i-a", "i-b", "i-c"]},
+            headers=headers,
+        )
+
+        assert response.status_code == 400
+
+    def test_batch_aws_error_returns_500(
+        self, client, valid_api_key, mocker
+    ):
+        """Test that AWS errors during a batch return 500."""
+        mocker.patch(
+            "app.api.routes.get_instances_health",
+            side_effect=Exception("AWS API Error: AccessDenied")
+        )
+
+        headers = {"X-API-Key": valid_api_key}
+        response = client.post(
+            "/api/health/batch",
+            json={"instance_ids": ["i-a"]},
+            headers=headers,
+        )
+
+        assert response.status_code == 500
+
+
+class TestHealthCheckCaching:
+    """Tests for cached responses on /api/health/<instance_id>."""
+
+    def test_repeated_requests_hit_cache(
+        self, client, valid_api_key, mocker
+    ):
+        """Test that a second request is served without calling AWS."""
+        health_mock = mocker.patch(
+            "app.api.routes.get_instance_health",
+            return_value={"state": "running", "status_code": "ok",
+                          "health": "healthy"}
+        )
+
+        headers = {"X-API-Key": valid_api_key}
+        client.get("/api/health/i-0123456789abcdef0", headers=headers)
+        response = client.get(
+            "/api/health/i-0123456789abcdef0", headers=headers
+        )
+
+        assert response.status_code == 200
+        assert health_mock.call_count == 1
+        data = json.loads(response.data)
+        assert data["cached_at"].endswith("Z")
+        assert data["age_ms"] >= 0
+
+    def test_cache_can_be_disabled(self, valid_api_key, mocker):
+        """Test that HEALTH_CACHE_ENABLED=False always queries AWS."""
+        from app.main import create_app
+        from app.config import TestingConfig
+
+        class NoCacheConfig(TestingConfig):
+            HEALTH_CACHE_ENABLED = False
+
+        health_mock = mocker.patch(
+            "app.api.routes.get_instance_health",
+            return_value={"state": "running", "status_code": "ok",
+                          "health": "healthy"}
+        )
+        client = create_app(NoCacheConfig).test_client()
+
+        headers = {"X-API-Key": valid_api_key}
+        client.get("/api/health/i-0123456789abcdef0", headers=headers)
+        response = client.get(
+            "/api/health/i-0123456789abcdef0", headers=headers
+        )
+
+        assert health_mock.call_count == 2
+        assert json.loads(response.data)["age_ms"] == 0
+
+
+class TestConditionalGet:
+    """Tests for ETag, Cache-Control and 304 responses."""
+
+    def test_response_carries_etag_and_max_age(
+        self, client, valid_api_key, mocker
+    ):
+        """Test that fresh results advertise their remaining freshness."""
+        mocker.patch(
+            "app.api.routes.get_instance_health",
+            return_value={"state": "running", "status_code": "ok",
+                          "health": "healthy"}
+        )
+
+        response = client.get(
+            "/api/health/i-0123456789abcdef0",
+            headers={"X-API-Key": valid_api_key},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["ETag"].startswith('"')
+        assert response.headers["Cache-Control"] == "max-age=5"
+
+    def test_matching_etag_returns_304_without_aws(
+        self, client, valid_api_key, mocker
+    ):
+        """Test that a cached, unchanged result answers 304 with no body."""
+        health_mock = mocker.patch(
+            "app.api.routes.get_instance_health",
+            return_value={"state": "running", "status_code": "ok",
+                          "health": "healthy"}
+        )
+        headers = {"X-API-Key": valid_api_key}
+        first = client.get("/api/health/i-0123456789abcdef0", headers=headers)
+
+        response = client.get(
+            "/api/health/i-0123456789abcdef0",
+            headers={**headers, "If-None-Match": first.headers["ETag"]},
+        )
+
+        assert response.status_code == 304
+        assert response.data == b""
+        assert response.headers["ETag"] == first.headers["ETag"]
+        assert health_mock.call_count == 1
+
+    def test_changed_health_returns_new_etag(
+        self, client, valid_api_key, mocker
+    ):
+        """Test that a different health value does not match the old ETag."""
+        from app.api.routes import health_etag
+
+        old_etag = health_etag(
+            {"state": "running", "status_code": "ok", "health": "healthy"}
+        )
+        mocker.patch(
+            "app.api.routes.get_instance_health",
+            return_value={"state": "running", "status_code": "impaired",
+                          "health": "unhealthy"}
+        )
+
+        response = client.get(
+            "/api/health/i-0123456789abcdef0",
+            headers={"X-API-Key": valid_api_key,
+                     "If-None-Match": f'"{old_etag}"'},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] != f'"{old_etag}"'
+
+
+class TestSingleCallResolution:
+    """Tests for the single-round-trip health resolution mode."""
+
+    def test_single_call_skips_describe_instances(self, mocker):
+        """Test that state comes from describe_instance_status alone."""
+        from app.services.health_check import get_instance_health
+
+        mock_client = mocker.MagicMock()
+        mocker.patch(
+            'app.infrastructure.cloud.ec2_client.boto3.client',
+            return_value=mock_client
+        )
+        mock_client.describe_instance_status.return_value = {
+            'InstanceStatuses': [{
+                'InstanceState': {'Name': 'running'},
+                'InstanceStatus': {'Status': 'failed'}
+            }]
+        }
+
+        result = get_instance_health('i-test123', mode='single-call')
+
+        assert result == {
+            'state': 'running', 'status_code': 'failed',
+            'health': 'unhealthy'
+        }
+        assert mock_client.describe_instance_status.call_count == 1
+        assert not mock_client.describe_instances.called
+
+    def test_single_call_falls_back_when_no_status(self, mocker):
+        """Test fallback to describe_instances when no status is returned."""
+        from app.services.health_check import get_instance_health
+
+        mock_client = mocker.MagicMock()
+        mocker.patch(
+            'app.infrastructure.cloud.ec2_client.boto3.client',
+            return_value=mock_client
+        )
+        mock_client.describe_instance_status.return_value = {
+            'InstanceStatuses': []
+        }
+        mock_client.describe_instances.return_value = {
+            'Reservations': [{
+                'Instances': [{'State': {'Name': 'stopped'}}]
+            }]
+        }
+
+        result = get_instance_health('i-test123', mode='single-call')
+
+        assert result['health'] == 'stopped'
+        assert result['status_code'] == 'unknown'
+        assert mock_client.describe_instance_status.call_count == 1
+        assert mock_client.describe_instances.call_count == 1
+
+    def test_endpoint_passes_configured_mode(
+        self, app, client, valid_api_key, mocker
+    ):
+        """Test that HEALTH_RESOLUTION_MODE reaches the service."""
+        app.config["HEALTH_RESOLUTION_MODE"] = "single-call"
+        health_mock = mocker.patch(
+            "app.api.routes.get_instance_health",
+            return_value={"state": "running", "status_code": "ok",
+                          "health": "healthy"}
+        )
+
+        headers = {"X-API-Key": valid_api_key}
+        client.get("/api/health/i-test123", headers=headers)
+
+        health_mock.assert_called_once_with(
+            "i-test123", mode="single-call", region="us-east-1"
+        )
+
+    def test_unknown_mode_is_rejected(self):
+        """Test that create_app refuses an unknown resolution mode."""
+        from app.main import create_app
+        from app.config import TestingConfig
+
+        class BadModeConfig(TestingConfig):
+            HEALTH_RESOLUTION_MODE = "three-call"
+
+        with pytest.raises(ValueError):
+            create_app(BadModeConfig)
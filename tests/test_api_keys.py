@@ -0,0 +1,104 @@
+"""Test module for API key validation and per-key quotas."""
+import pytest
+
+from app.config import TestingConfig
+from app.main import create_app
+from app.services.api_keys import KeyRing, parse_quotas
+
+
+class TestKeyRing:
+    """Tests for hashed key lookup and quota accounting."""
+
+    def test_verify_accepts_only_exact_keys(self):
+        """Test that keys match exactly and are not stored in clear."""
+        ring = KeyRing(["key-a", " key-b ", ""])
+
+        assert len(ring) == 2
+        assert ring.verify("key-a") is not None
+        assert ring.verify("key-b") is not None
+        assert ring.verify("key-a ") is None
+        assert ring.verify("KEY-A") is None
+        assert ring.verify("") is None
+        assert ring.verify(None) is None
+        assert b"key-a" not in repr(vars(ring)).encode()
+
+    def test_consume_enforces_per_key_quota(self):
+        """Test that one key running out does not affect another."""
+        ring = KeyRing(
+            ["noisy", "quiet"], rate=1, burst=2,
+            quotas={"quiet": (1, 5)},
+        )
+        noisy = ring.verify("noisy")
+        quiet = ring.verify("quiet")
+
+        assert [ring.consume(noisy) for _ in range(2)] == [0.0, 0.0]
+        assert ring.consume(noisy) > 0
+        assert all(ring.consume(quiet) == 0.0 for _ in range(5))
+
+    def test_zero_rate_disables_quota(self):
+        """Test that a rate of 0 never limits the key."""
+        ring = KeyRing(["key"], rate=0)
+        digest = ring.verify("key")
+
+        assert all(ring.consume(digest) == 0.0 for _ in range(1000))
+
+    def test_parse_quotas(self):
+        """Test the key=rate[:burst] override format."""
+        assert parse_quotas(" ci=1:5, dash=50 ,") == {
+            "ci": (1.0, 5),
+            "dash": (50.0, None),
+        }
+        assert parse_quotas("") == {}
+        with pytest.raises(ValueError):
+            parse_quotas("no-rate-given")
+
+
+class TestRateLimitedEndpoint:
+    """Tests for 429 responses from check_api_key."""
+
+    @pytest.fixture
+    def limited_app(self):
+        """App where test-key-1 may make two requests."""
+        config_class = type("LimitedConfig", (TestingConfig,), {
+            "API_KEY_RATE_LIMIT": 0.01,
+            "API_KEY_RATE_BURST": 2,
+            "API_KEY_QUOTAS": "test-key-2=0",
+        })
+        return create_app(config_class)
+
+    def test_over_quota_returns_429_before_service(self, limited_app, mocker):
+        """Test that over-quota requests never reach the service layer."""
+        mock_health = mocker.patch('app.api.routes.get_instance_health')
+        mock_health.return_value = {
+            'state': 'running', 'status_code': 'ok', 'health': 'healthy'
+        }
+        client = limited_app.test_client()
+        headers = {"X-API-Key": "test-key-1"}
+
+        statuses = [
+            client.get(f"/api/health/i-{n}", headers=headers).status_code
+            for n in range(3)
+        ]
+        response = client.get("/api/health/i-3", headers=headers)
+
+        assert statuses == [200, 200, 429]
+        assert response.status_code == 429
+        assert response.get_json() == {"error": "Rate limit exceeded"}
+        assert int(response.headers["Retry-After"]) >= 1
+        assert mock_health.call_count == 2
+
+    def test_unlimited_key_is_not_throttled(self, limited_app, mocker):
+        """Test that a per-key override of 0 removes the quota."""
+        mocker.patch(
+            'app.api.routes.get_instance_health', return_value=None
+        )
+        client = limited_app.test_client()
+
+        statuses = {
+            client.get(
+                "/api/health/i-x", headers={"X-API-Key": "test-key-2"}
+            ).status_code
+            for _ in range(5)
+        }
+
+        assert statuses == {404}
@@ -0,0 +1,67 @@
+"""Test module for the benchmark harness."""
+from benchmarks import load, memory, startup
+
+
+class TestBenchmarkHarness:
+    """Smoke tests so the benchmark suite keeps working."""
+
+    def test_run_reports_every_scenario(self):
+        """Test that a tiny run covers all scenarios without errors."""
+        document = load.run(requests=20, concurrency=2, latency=0)
+
+        assert set(document["results"]) == {
+            "test_client.single_instance",
+            "test_client.auth_failure",
+            "wsgi.single_instance",
+            "wsgi.auth_failure",
+            "logging.sync",
+            "logging.async",
+        }
+        for result in document["results"].values():
+            assert result["requests"] == 20
+            assert result["errors"] == 0
+            assert result["p50_ms"] <= result["p99_ms"]
+
+    def test_compare_flags_throughput_and_p99_regressions(self):
+        """Test that regressions beyond the threshold are reported."""
+        baseline = {"results": {"a": {"requests_per_sec": 100,
+                                      "p99_ms": 10}}}
+        slower = {"results": {"a": {"requests_per_sec": 70, "p99_ms": 15}}}
+        similar = {"results": {"a": {"requests_per_sec": 95,
+                                     "p99_ms": 11}}}
+
+        assert len(load.compare(slower, baseline, 0.2)) == 2
+        assert load.compare(similar, baseline, 0.2) == []
+
+
+class TestStartupBenchmark:
+    """Smoke tests for the cold-start benchmark."""
+
+    def test_run_samples_lazy_and_warm_starts(self):
+        """Test that each mode starts a fresh process and answers."""
+        document = startup.run(repeats=1)
+
+        assert set(document["results"]) == {"lazy", "warmup"}
+        for result in document["results"].values():
+            assert result["status_codes"] == [200]
+            assert result["boto3_after_import"] is False
+            assert result["median_import_ms"] <= result["median_total_ms"]
+
+
+class TestMemoryBenchmark:
+    """Smoke tests for the fleet memory benchmark."""
+
+    def test_compact_representations_use_less_memory(self):
+        """Test that records and columns beat plain dicts."""
+        document = memory.run(size=2000)
+        results = document["results"]
+
+        assert results["columns"]["bytes_per_instance"] < (
+            results["dicts"]["bytes_per_instance"]
+        )
+        assert results["records"]["bytes_per_instance"] < (
+            results["dicts"]["bytes_per_instance"]
+        )
+        assert set(document["health_mapping"]) == {
+            "per_instance_ms", "per_column_ms"
+        }
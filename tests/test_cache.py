@@ -0,0 +1,135 @@
+"""Test module for the instance health result cache."""
+import json
+import threading
+import time
+
+import pytest
+
+from app.config import TestingConfig
+from app.main import create_app
+from app.services.cache import HealthCache
+
+
+@pytest.fixture
+def cache(clock):
+    """Return a small cache driven by the fake clock."""
+    cache = HealthCache(
+        max_entries=2, ttl=5, stale_ttl=30, negative_ttl=1, clock=clock
+    )
+    yield cache
+    cache.shutdown()
+
+
+class TestHealthCache:
+    """Tests for TTL, LRU and stale-while-revalidate behaviour."""
+
+    def test_fresh_entries_skip_the_loader(self, cache, clock):
+        """Test that a fresh entry is served without calling AWS again."""
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return {"health": "healthy"}
+
+        cache.get("i-a", loader)
+        clock.now = 4
+        result = cache.get("i-a", loader)
+
+        assert len(calls) == 1
+        assert result.value == {"health": "healthy"}
+        assert result.age_ms == 4000
+        assert result.stale is False
+
+    def test_stale_entry_served_while_refreshing(self, cache, clock):
+        """Test that stale data is returned and refreshed in background."""
+        cache.get("i-a", lambda: {"health": "healthy"})
+        clock.now = 10
+        refreshed = threading.Event()
+
+        def loader():
+            refreshed.set()
+            return {"health": "unhealthy"}
+
+        result = cache.get("i-a", loader)
+
+        assert result.stale is True
+        assert result.value == {"health": "healthy"}
+        assert refreshed.wait(timeout=2)
+        cache.shutdown()
+        assert cache.get("i-a", loader).value == {"health": "unhealthy"}
+
+    def test_expired_entry_is_reloaded_inline(self, cache, clock):
+        """Test that entries past the stale window are reloaded."""
+        cache.get("i-a", lambda: {"health": "healthy"})
+        clock.now = 100
+
+        result = cache.get("i-a", lambda: {"health": "stopped"})
+
+        assert result.value == {"health": "stopped"}
+        assert result.stale is False
+
+    def test_not_found_uses_negative_ttl(self, cache, clock):
+        """Test that None results expire after the shorter negative TTL."""
+        cache.get("i-missing", lambda: None)
+        clock.now = 0.5
+        assert cache.get("i-missing", lambda: {"health": "x"}).value is None
+
+        clock.now = 2
+        result = cache.get("i-missing", lambda: {"health": "healthy"})
+        assert result.value == {"health": "healthy"}
+
+    def test_least_recently_used_entry_is_evicted(self, cache):
+        """Test that the cache is bounded by max_entries."""
+        cache.get("i-a", lambda: {"health": "a"})
+        cache.get("i-b", lambda: {"health": "b"})
+        cache.get("i-a", lambda: {"health": "a"})
+        cache.get("i-c", lambda: {"health": "c"})
+
+        assert len(cache) == 2
+        assert cache.get("i-b", lambda: {"health": "new"}).value == {
+            "health": "new"
+        }
+
+    def test_loader_errors_are_not_cached(self, cache):
+        """Test that exceptions propagate and leave nothing cached."""
+        def failing_loader():
+            raise RuntimeError("AWS API Error")
+
+        with pytest.raises(RuntimeError):
+            cache.get("i-a", failing_loader)
+
+        assert len(cache) == 0
+
+
+class TestCacheInApp:
+    """Tests for the cache behind GET /api/health/<instance_id>."""
+
+    def test_stale_hit_refreshes_in_background(self, clock, mocker):
+        """Test that a stale hit reloads without an app context."""
+        lookup = mocker.patch(
+            "app.api.routes.get_instance_health",
+            return_value={"state": "running", "status_code": "ok",
+                          "health": "healthy"},
+        )
+        config_class = type("CachedConfig", (TestingConfig,), {
+            "HEALTH_CACHE_ENABLED": True,
+            "COALESCE_ENABLED": False,
+        })
+        app = create_app(config_class)
+        cache = HealthCache(ttl=5, stale_ttl=30, clock=clock)
+        app.extensions["health_cache"] = cache
+        client = app.test_client()
+        headers = {"X-API-Key": "test-key-1"}
+
+        client.get("/api/health/i-a", headers=headers)
+        clock.now = 10
+        stale = client.get("/api/health/i-a", headers=headers)
+        deadline = time.monotonic() + 5
+        while lookup.call_count < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        cache.shutdown()
+        fresh = client.get("/api/health/i-a", headers=headers)
+
+        assert json.loads(stale.data)["stale"] is True
+        assert lookup.call_count == 2
+        assert "stale" not in json.loads(fresh.data)
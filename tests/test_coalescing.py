@@ -0,0 +1,97 @@
+"""Test module for single-flight request coalescing."""
+import threading
+import time
+
+import pytest
+
+from app.services.coalescing import SingleFlight
+
+
+def _run_concurrently(count, target):
+    """Start ``count`` threads running ``target`` and wait for them."""
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def _wait_for_callers(flight, count):
+    """Wait until ``count`` callers have entered the single-flight."""
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        stats = flight.stats()
+        if stats["executed"] + stats["coalesced"] >= count:
+            return
+        time.sleep(0.001)
+
+
+class TestSingleFlight:
+    """Tests for sharing in-flight lookups."""
+
+    def test_concurrent_callers_share_one_call(self):
+        """Test that callers arriving mid-flight reuse the result."""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def lookup():
+            calls.append(1)
+            release.wait(timeout=2)
+            return {"health": "healthy"}
+
+        threads = _run_concurrently(
+            8, lambda: results.append(flight.do("i-a", lookup))
+        )
+        _wait_for_callers(flight, 8)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == [{"health": "healthy"}] * 8
+        assert flight.stats() == {
+            "executed": 1, "coalesced": 7, "in_flight": 0
+        }
+
+    def test_exception_is_shared_by_waiters(self):
+        """Test that every waiter sees the leader's exception."""
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def lookup():
+            release.wait(timeout=2)
+            raise RuntimeError("Throttling")
+
+        def caller():
+            try:
+                flight.do("i-a", lookup)
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        threads = _run_concurrently(4, caller)
+        _wait_for_callers(flight, 4)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert errors == ["Throttling"] * 4
+
+    def test_different_keys_run_independently(self):
+        """Test that distinct keys are never coalesced."""
+        flight = SingleFlight()
+
+        assert flight.do(("us-east-1", "i-a"), lambda: "a") == "a"
+        assert flight.do(("eu-west-1", "i-a"), lambda: "b") == "b"
+        assert flight.stats()["executed"] == 2
+        assert flight.stats()["coalesced"] == 0
+
+    def test_finished_calls_are_not_remembered(self):
+        """Test that a later call for the same key runs again."""
+        flight = SingleFlight()
+
+        with pytest.raises(ValueError):
+            flight.do("i-a", lambda: (_ for _ in ()).throw(ValueError()))
+
+        assert flight.do("i-a", lambda: "retried") == "retried"
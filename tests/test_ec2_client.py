@@ -0,0 +1,193 @@
+"""Test module for the pooled EC2 client registry."""
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+from botocore.exceptions import ClientError, NoCredentialsError
+
+from app.config import TestingConfig
+from app.infrastructure.cloud import ec2_client
+from app.main import create_app
+
+
+class TestEC2ClientRegistry:
+    """Tests for per-region client reuse and configuration."""
+
+    def test_client_is_reused_per_region(self, mocker):
+        """Test that repeated lookups for a region build one client."""
+        factory = mocker.patch(
+            "app.infrastructure.cloud.ec2_client.boto3.client",
+            side_effect=lambda *args, **kwargs: mocker.MagicMock(),
+        )
+
+        first = ec2_client.get_ec2_client("us-east-1")
+        second = ec2_client.get_ec2_client("us-east-1")
+        other = ec2_client.get_ec2_client("eu-west-1")
+
+        assert first is second
+        assert first is not other
+        assert factory.call_count == 2
+
+    def test_concurrent_lookups_build_one_client(self, mocker):
+        """Test that racing threads share a single client."""
+        factory = mocker.patch(
+            "app.infrastructure.cloud.ec2_client.boto3.client",
+            side_effect=lambda *args, **kwargs: mocker.MagicMock(),
+        )
+        results = []
+
+        def lookup():
+            results.append(ec2_client.get_ec2_client("us-east-1"))
+
+        threads = [threading.Thread(target=lookup) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert factory.call_count == 1
+        assert all(client is results[0] for client in results)
+
+    def test_reset_clients_forces_rebuild(self, mocker):
+        """Test that reset_clients drops cached clients."""
+        factory = mocker.patch(
+            "app.infrastructure.cloud.ec2_client.boto3.client",
+            side_effect=lambda *args, **kwargs: mocker.MagicMock(),
+        )
+
+        ec2_client.get_ec2_client("us-east-1")
+        ec2_client.reset_clients()
+        ec2_client.get_ec2_client("us-east-1")
+
+        assert factory.call_count == 2
+
+    def test_configure_applies_pool_and_retry_settings(self, mocker):
+        """Test that Config values reach the botocore client config."""
+        factory = mocker.patch(
+            "app.infrastructure.cloud.ec2_client.boto3.client"
+        )
+        ec2_client.configure({
+            "EC2_MAX_POOL_CONNECTIONS": 42,
+            "EC2_RETRY_MODE": "adaptive",
+            "EC2_MAX_ATTEMPTS": 5,
+            "EC2_READ_TIMEOUT": 2.5,
+        })
+
+        try:
+            ec2_client.get_ec2_client("us-east-1")
+            boto_config = factory.call_args.kwargs["config"]
+
+            assert boto_config.max_pool_connections == 42
+            assert boto_config.read_timeout == 2.5
+            assert boto_config.retries == {
+                "mode": "adaptive", "max_attempts": 5
+            }
+        finally:
+            ec2_client.configure({})
+
+
+class TestLazySDKImport:
+    """Tests for importing boto3 on first use."""
+
+    def test_importing_the_app_does_not_import_boto3(self):
+        """Test that boto3 is only imported once a client is needed."""
+        code = (
+            "import sys\n"
+            "import app.main\n"
+            "assert 'boto3' not in sys.modules\n"
+            "from app.infrastructure.cloud import ec2_client\n"
+            "ec2_client.boto3\n"
+            "assert 'boto3' in sys.modules\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        completed = subprocess.run(
+            [sys.executable, "-c", code], cwd=root,
+            capture_output=True, text=True,
+        )
+
+        assert completed.returncode == 0, completed.stderr
+
+    def test_unknown_attribute_raises(self):
+        """Test that the lazy loader only serves SDK modules."""
+        with pytest.raises(AttributeError):
+            ec2_client.not_an_sdk_module
+
+    def test_fork_reset_drops_inherited_clients(self, mocker):
+        """Test that a forked child builds its own clients."""
+        factory = mocker.patch(
+            "app.infrastructure.cloud.ec2_client.boto3.client",
+            side_effect=lambda *args, **kwargs: mocker.MagicMock(),
+        )
+        ec2_client.get_ec2_client("us-east-1")
+
+        ec2_client._reset_after_fork()
+        ec2_client.get_ec2_client("us-east-1")
+
+        assert factory.call_count == 2
+
+
+class TestWarmUp:
+    """Tests for building clients and opening connections at startup."""
+
+    def test_warm_up_opens_requested_connections(self, mocker):
+        """Test that warm-up makes one cheap call per connection."""
+        mock_client = mocker.MagicMock()
+        mocker.patch(
+            "app.infrastructure.cloud.ec2_client.boto3.client",
+            return_value=mock_client,
+        )
+
+        result = ec2_client.warm_up("us-east-1", connections=3)
+
+        assert result["error"] is None
+        assert mock_client.describe_regions.call_count == 3
+        assert ec2_client.get_ec2_client("us-east-1") is mock_client
+
+    def test_api_errors_still_count_as_warm(self, mocker):
+        """Test that an AWS error response is not a warm-up failure."""
+        mock_client = mocker.MagicMock()
+        mock_client.describe_regions.side_effect = ClientError(
+            {"Error": {"Code": "UnauthorizedOperation", "Message": "no"}},
+            "DescribeRegions",
+        )
+        mocker.patch(
+            "app.infrastructure.cloud.ec2_client.boto3.client",
+            return_value=mock_client,
+        )
+
+        assert ec2_client.warm_up("us-east-1")["error"] is None
+
+    def test_connection_failures_are_reported(self, mocker):
+        """Test that failing to reach AWS is recorded, not raised."""
+        mocker.patch(
+            "app.infrastructure.cloud.ec2_client.boto3.client",
+            side_effect=NoCredentialsError(),
+        )
+
+        result = ec2_client.warm_up("us-east-1")
+
+        assert "credentials" in result["error"]
+
+    def test_create_app_warms_configured_regions(self, mocker):
+        """Test that EC2_WARMUP_ENABLED warms every region at startup."""
+        warm_up = mocker.patch(
+            "app.infrastructure.cloud.ec2_client.warm_up",
+            return_value={"seconds": 0.0, "error": None},
+        )
+        config_class = type("WarmConfig", (TestingConfig,), {
+            "EC2_WARMUP_ENABLED": True,
+            "EC2_WARMUP_CONNECTIONS": 2,
+            "AWS_REGIONS": ["us-east-1", "eu-west-1"],
+        })
+
+        app = create_app(config_class)
+
+        assert sorted(app.extensions["warmup"]) == ["eu-west-1", "us-east-1"]
+        warm_up.assert_any_call("eu-west-1", 2)
+
+    def test_warm_up_is_off_by_default(self, app):
+        """Test that the default config leaves clients to first use."""
+        assert "warmup" not in app.extensions
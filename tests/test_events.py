@@ -0,0 +1,231 @@
+"""Test module for health change events and the SSE stream."""
+import json
+import time
+
+import pytest
+
+from app.config import TestingConfig
+from app.main import create_app
+from app.services.events import HealthEventBus, HealthWatcher
+
+
+HEALTHY = {"state": "running", "status_code": "ok", "health": "healthy"}
+IMPAIRED = {"state": "running", "status_code": "impaired",
+            "health": "unhealthy"}
+VALID_KEY = "test-key-1"
+
+
+class TestHealthEventBus:
+    """Tests for change detection and replay."""
+
+    def test_only_health_changes_emit_events(self):
+        """Test that unchanged health is absorbed silently."""
+        bus = HealthEventBus()
+
+        assert bus.publish({"i-a": HEALTHY, "i-b": HEALTHY}) == 2
+        assert bus.publish({"i-a": dict(HEALTHY), "i-b": IMPAIRED}) == 1
+
+        events = bus.wait(2, timeout=0)
+        assert [e.instance_id for e in events] == ["i-b"]
+        assert events[0].to_dict()["previous_health"] == "healthy"
+        assert events[0].to_dict()["health"] == "unhealthy"
+
+    def test_complete_publish_reports_removed_instances(self):
+        """Test that instances missing from a full fleet are removed."""
+        bus = HealthEventBus()
+        bus.publish({"i-a": HEALTHY, "i-b": HEALTHY})
+
+        assert bus.publish({"i-a": HEALTHY}, complete=True) == 1
+        assert bus.current() == (3, {"i-a": HEALTHY})
+        assert bus.wait(2, timeout=0)[0].status is None
+
+    def test_wait_signals_gap_when_events_are_evicted(self):
+        """Test that resuming too far back asks for a resync."""
+        bus = HealthEventBus(max_events=2)
+        bus.publish({"i-a": HEALTHY, "i-b": HEALTHY, "i-c": HEALTHY})
+
+        assert bus.wait(0, timeout=0) is None
+        assert len(bus.wait(1, timeout=0)) == 2
+        assert bus.wait(3, timeout=0) == []
+
+
+class TestHealthWatcher:
+    """Tests for the shared refresh loop."""
+
+    def test_refreshes_union_of_subscribed_ids(self, mocker):
+        """Test that subscribers share one batch lookup."""
+        batch = mocker.patch(
+            "app.services.events.get_instances_health",
+            return_value={"i-a": HEALTHY, "i-b": None},
+        )
+        bus = HealthEventBus()
+        watcher = HealthWatcher(bus, interval=60)
+        watcher._subscriptions = {1: frozenset({"i-a"}),
+                                  2: frozenset({"i-a", "i-b"})}
+
+        assert watcher.refresh_once() is True
+
+        batch.assert_called_once_with(["i-a", "i-b"], region="us-east-1")
+        assert bus.current() == (1, {"i-a": HEALTHY})
+
+    def test_fleet_subscriber_polls_whole_region(self, mocker):
+        """Test that a fleet-wide subscriber switches to a region poll."""
+        fleet = mocker.patch(
+            "app.services.events.fetch_regions_health",
+            return_value={"i-a": HEALTHY},
+        )
+        batch = mocker.patch("app.services.events.get_instances_health")
+        watcher = HealthWatcher(
+            HealthEventBus(), interval=60, regions=["us-east-1", "eu-west-1"]
+        )
+        watcher._subscriptions = {1: frozenset({"i-a"}), 2: None}
+
+        watcher.refresh_once()
+
+        fleet.assert_called_once_with(["us-east-1", "eu-west-1"])
+        assert not batch.called
+
+    def test_loop_stops_after_last_unsubscribe(self, mocker):
+        """Test that the refresh thread exits when nobody listens."""
+        mocker.patch(
+            "app.services.events.get_instances_health", return_value={}
+        )
+        watcher = HealthWatcher(HealthEventBus(), interval=60)
+
+        token = watcher.subscribe({"i-a"})
+        thread = watcher._thread
+        watcher.unsubscribe(token)
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert watcher._thread is None
+
+
+def read_event(chunks):
+    """Return the next SSE message from a streamed response."""
+    return next(chunks).decode("utf-8")
+
+
+def parse_event(message):
+    """Parse an SSE message into (id, event, data)."""
+    fields = dict(
+        line.split(": ", 1) for line in message.strip().splitlines()
+    )
+    return int(fields["id"]), fields["event"], json.loads(fields["data"])
+
+
+class TestHealthStreamEndpoint:
+    """Tests for GET /api/health/stream."""
+
+    @pytest.fixture
+    def stream_app(self, mocker):
+        """App whose shared refresh loop never reaches AWS."""
+        mocker.patch(
+            "app.services.events.get_instances_health", return_value={}
+        )
+        config_class = type("StreamConfig", (TestingConfig,), {
+            "STREAM_HEARTBEAT_INTERVAL": 0.05,
+            "STREAM_REFRESH_INTERVAL": 60,
+        })
+        return create_app(config_class)
+
+    def test_stream_sends_snapshot_then_changes(self, stream_app):
+        """Test the initial snapshot, change events and heartbeats."""
+        bus = stream_app.extensions["health_events"]
+        bus.publish({"i-a": HEALTHY, "i-other": HEALTHY})
+
+        response = stream_app.test_client().get(
+            "/api/health/stream?ids=i-a",
+            headers={"X-API-Key": VALID_KEY},
+            buffered=False,
+        )
+        chunks = iter(response.response)
+        try:
+            assert response.mimetype == "text/event-stream"
+            event_id, event, data = parse_event(read_event(chunks))
+            assert (event_id, event) == (2, "snapshot")
+            assert data["instances"] == {"i-a": HEALTHY}
+
+            bus.publish({"i-other": IMPAIRED, "i-a": IMPAIRED})
+            event_id, event, data = parse_event(read_event(chunks))
+            assert (event_id, event) == (4, "health")
+            assert data["health"] == "unhealthy"
+
+            assert read_event(chunks) == ": heartbeat\n\n"
+        finally:
+            response.close()
+
+    def test_last_event_id_replays_missed_events(self, stream_app):
+        """Test that a reconnecting client gets only what it missed."""
+        bus = stream_app.extensions["health_events"]
+        bus.publish({"i-a": HEALTHY})
+        bus.publish({"i-a": IMPAIRED})
+
+        response = stream_app.test_client().get(
+            "/api/health/stream",
+            headers={"X-API-Key": VALID_KEY, "Last-Event-ID": "1"},
+            buffered=False,
+        )
+        try:
+            event_id, event, data = parse_event(
+                read_event(iter(response.response))
+            )
+        finally:
+            response.close()
+
+        assert (event_id, event) == (2, "health")
+        assert data["previous_health"] == "healthy"
+
+    def test_disconnect_releases_subscription(self, stream_app):
+        """Test that closing the stream unsubscribes from the watcher."""
+        watcher = stream_app.extensions["health_watcher"]
+        response = stream_app.test_client().get(
+            "/api/health/stream?ids=i-a",
+            headers={"X-API-Key": VALID_KEY},
+            buffered=False,
+        )
+        read_event(iter(response.response))
+        assert len(watcher._subscriptions) == 1
+
+        response.close()
+        deadline = time.monotonic() + 5
+        while watcher._subscriptions and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert watcher._subscriptions == {}
+
+    def test_streams_beyond_the_limit_get_503(self, mocker):
+        """Test that STREAM_MAX_CONNECTIONS bounds open streams."""
+        mocker.patch(
+            "app.services.events.get_instances_health", return_value={}
+        )
+        config_class = type("LimitedStreamConfig", (TestingConfig,), {
+            "STREAM_MAX_CONNECTIONS": 1,
+            "STREAM_RETRY_AFTER": 7,
+        })
+        client = create_app(config_class).test_client()
+        headers = {"X-API-Key": VALID_KEY}
+
+        first = client.get(
+            "/api/health/stream", headers=headers, buffered=False
+        )
+        refused = client.get("/api/health/stream", headers=headers)
+        first.close()
+        reopened = client.get(
+            "/api/health/stream", headers=headers, buffered=False
+        )
+        reopened.close()
+
+        assert first.status_code == 200
+        assert refused.status_code == 503
+        assert refused.headers["Retry-After"] == "7"
+        assert reopened.status_code == 200
+
+    def test_empty_ids_rejected(self, client):
+        """Test that an empty ids parameter is a 400."""
+        response = client.get(
+            "/api/health/stream?ids=,",
+            headers={"X-API-Key": VALID_KEY},
+        )
+
+        assert response.status_code == 400
@@ -0,0 +1,100 @@
+"""Test module for the pluggable cloud backend and fake EC2 fleet."""
+import pytest
+from botocore.exceptions import ClientError
+
+from app.infrastructure.cloud import backend
+from app.infrastructure.cloud.fake_ec2 import (
+    FakeEC2Backend,
+    FakeEC2Client,
+    FakeFleet,
+)
+from app.services.health_check import get_instance_health
+from app.services.poller import fetch_fleet_health
+
+
+class TestFakeFleet:
+    """Tests for the deterministic in-memory fleet."""
+
+    def test_same_seed_builds_same_fleet(self):
+        """Test that fleets are reproducible from their seed."""
+        first = FakeFleet("us-east-1", size=50, seed=7)
+        second = FakeFleet("us-east-1", size=50, seed=7)
+        other = FakeFleet("us-east-1", size=50, seed=8)
+
+        assert first.ordered_ids == second.ordered_ids
+        assert first.ordered_ids != other.ordered_ids
+
+    def test_poller_pages_through_large_fleet(self):
+        """Test that NextToken pagination covers every instance."""
+        client = FakeEC2Client(FakeFleet("us-east-1", size=2500))
+
+        instances = fetch_fleet_health(client)
+
+        assert len(instances) == 2500
+        # Three pages for each of the two describe calls
+        assert client.calls == 6
+
+    def test_unknown_id_raises_not_found(self):
+        """Test that InstanceIds lookups fail like the real API."""
+        client = FakeEC2Client(FakeFleet("us-east-1", size=1))
+
+        with pytest.raises(ClientError) as error:
+            client.describe_instances(InstanceIds=["i-missing"])
+
+        assert error.value.response["Error"]["Code"] == (
+            "InvalidInstanceID.NotFound"
+        )
+
+
+class TestFakeFaultInjection:
+    """Tests for injected errors and throttling."""
+
+    def test_error_rate_injects_failures(self):
+        """Test that every call fails at an error rate of 1."""
+        client = FakeEC2Client(
+            FakeFleet("us-east-1", size=1), error_rate=1.0,
+            error_codes=("Unavailable",),
+        )
+
+        with pytest.raises(ClientError) as error:
+            client.describe_instance_status(IncludeAllInstances=True)
+
+        assert error.value.response["Error"]["Code"] == "Unavailable"
+
+    def test_throttling_raises_request_limit_exceeded(self):
+        """Test that calls beyond the rate limit are throttled."""
+        client = FakeEC2Client(
+            FakeFleet("us-east-1", size=1), max_calls_per_sec=3
+        )
+        codes = []
+        for _ in range(5):
+            try:
+                client.describe_instances()
+            except ClientError as e:
+                codes.append(e.response["Error"]["Code"])
+
+        assert codes == ["RequestLimitExceeded"] * 2
+        assert client.throttled == 2
+
+
+class TestBackendSelection:
+    """Tests for choosing the backend from configuration."""
+
+    def test_configure_selects_fake_backend(self):
+        """Test that CLOUD_BACKEND=fake serves lookups from the fleet."""
+        backend.configure({"CLOUD_BACKEND": "fake", "FAKE_FLEET_SIZE": 10})
+        fake_client = backend.get_client("us-east-1")
+        instance_id = fake_client.fleet.ordered_ids[0]
+        fake_client.fleet.set_state(instance_id, "running", "impaired")
+
+        result = get_instance_health(instance_id, region="us-east-1")
+
+        assert isinstance(backend.get_backend(), FakeEC2Backend)
+        assert result["state"] == "running"
+        assert result["status_code"] == "impaired"
+        assert get_instance_health("i-missing", region="us-east-1") is None
+
+    def test_unknown_backend_is_rejected(self):
+        """Test that an unknown CLOUD_BACKEND raises ValueError."""
+        with pytest.raises(ValueError):
+            backend.configure({"CLOUD_BACKEND": "azure"})
@@ -0,0 +1,154 @@
+"""Test module for compact instance health records and columns."""
+import pytest
+
+from app.services.fleet_records import (
+    HEALTH,
+    STATES,
+    STATUS_CODES,
+    Codebook,
+    FleetColumns,
+    InstanceHealth,
+    map_health_codes,
+    pack_checks,
+)
+from app.services.health_check import map_health_status
+
+
+FULL_STATUS = {
+    "state": "running",
+    "status_code": "failed",
+    "health": "unhealthy",
+    "availability_zone": "us-east-1a",
+    "tags": {"service": "checkout", "env": "prod"},
+}
+
+
+class TestHealthMapping:
+    """Tests for mapping health over whole columns."""
+
+    def test_column_mapping_matches_scalar_mapping(self):
+        """Test that every state/status pair maps as map_health_status."""
+        pairs = [
+            (STATES.value(s), STATUS_CODES.value(c))
+            for s in range(len(STATES))
+            for c in range(len(STATUS_CODES))
+        ]
+
+        codes = map_health_codes(
+            bytes(pack_checks(state, status) for state, status in pairs)
+        )
+
+        assert [HEALTH.value(code) for code in codes] == [
+            map_health_status(state, status) for state, status in pairs
+        ]
+
+    def test_new_values_extend_the_table(self):
+        """Test that values first seen at runtime are mapped too."""
+        checks = pack_checks("rebooting", "ok")
+
+        assert HEALTH.value(map_health_codes([checks])[0]) == "unknown"
+
+    def test_codebook_rejects_too_many_values(self):
+        """Test that codes stay within their bit width."""
+        book = Codebook("test", limit=3)
+        book.code("a")
+        book.code("b")
+
+        with pytest.raises(ValueError):
+            book.code("c")
+        assert book.code("a") == 1
+        assert book.value(0) is None
+
+
+class TestInstanceHealth:
+    """Tests for the slotted single-instance record."""
+
+    def test_round_trip_with_placement(self):
+        """Test that a fleet poll result survives encoding."""
+        record = InstanceHealth.from_status(FULL_STATUS)
+
+        assert record.to_dict() == FULL_STATUS
+        assert record.health == "unhealthy"
+        assert not hasattr(record, "__dict__")
+
+    def test_round_trip_without_placement(self):
+        """Test that single-lookup results keep their three keys."""
+        status = {"state": "stopped", "status_code": "not-applicable",
+                  "health": "stopped"}
+
+        record = InstanceHealth.from_status(status)
+
+        assert record.to_dict() == status
+        assert not record.has_placement
+
+    def test_missing_health_is_derived(self):
+        """Test that health is mapped when the status lacks it."""
+        record = InstanceHealth.from_status(
+            {"state": "running", "status_code": "ok"}
+        )
+
+        assert record.health == "healthy"
+
+    def test_equality(self):
+        """Test that equal statuses give equal records."""
+        assert InstanceHealth.from_status(FULL_STATUS) == (
+            InstanceHealth.from_status(dict(FULL_STATUS))
+        )
+        assert InstanceHealth.from_status(FULL_STATUS) != (
+            InstanceHealth.from_status(dict(FULL_STATUS, tags={}))
+        )
+
+
+class TestFleetColumns:
+    """Tests for the columnar fleet container."""
+
+    def test_build_maps_health_for_every_row(self):
+        """Test that raw rows are encoded and classified."""
+        fleet = FleetColumns.build([
+            ("i-b", "running", "ok", "us-east-1b", {}),
+            ("i-a", "running", "failed", "us-east-1a", {"env": "prod"}),
+            ("i-c", "stopped", "not-applicable", None, {}),
+        ])
+
+        assert list(fleet) == ["i-a", "i-b", "i-c"]
+        assert fleet["i-a"] == {
+            "state": "running", "status_code": "failed",
+            "health": "unhealthy", "availability_zone": "us-east-1a",
+            "tags": {"env": "prod"},
+        }
+        assert fleet.get("i-c")["health"] == "stopped"
+        assert fleet.get("i-zzz") is None
+        assert "i-b" in fleet and "i-zzz" not in fleet
+        assert fleet.record("i-a") == InstanceHealth.from_status(fleet["i-a"])
+        assert fleet.health_counts()["healthy"] == 1
+
+    def test_from_statuses_equals_source_mapping(self):
+        """Test that status dicts round-trip through the columns."""
+        statuses = {"i-a": FULL_STATUS, "i-b": dict(FULL_STATUS, tags={})}
+
+        fleet = FleetColumns.from_statuses(statuses)
+
+        assert fleet == statuses
+        assert dict(fleet.items()) == statuses
+        assert FleetColumns.from_statuses(fleet) is fleet
+
+    def test_merge_combines_regions_in_id_order(self):
+        """Test that regional fleets merge into one sorted fleet."""
+        east = FleetColumns.build([
+            ("i-c", "running", "ok", "us-east-1a", {}),
+            ("i-a", "stopped", "not-applicable", "us-east-1b", {}),
+        ])
+        west = {"i-b": FULL_STATUS}
+
+        fleet = FleetColumns.merge([east, west])
+
+        assert list(fleet) == ["i-a", "i-b", "i-c"]
+        assert fleet == dict(east, **west)
+        assert FleetColumns.merge([east]) is east
+
+    def test_columns_are_read_only(self):
+        """Test that the container cannot be modified like a dict."""
+        fleet = FleetColumns.from_statuses({"i-a": FULL_STATUS})
+
+        with pytest.raises(TypeError):
+            fleet["i-a"] = {}
@@ -0,0 +1,211 @@
+"""Test module for per-instance health history and flap detection."""
+import json
+
+import pytest
+
+from app.config import TestingConfig
+from app.main import create_app
+from app.services.events import HealthEventBus
+from app.services.history import HealthHistory
+
+
+VALID_KEY = "test-key-1"
+
+
+def _status(health, state="running"):
+    """Build a health status dict with the given mapped health."""
+    return {"state": state, "status_code": "ok", "health": health}
+
+
+class TestHealthHistory:
+    """Tests for recording transitions in bounded ring buffers."""
+
+    def test_records_only_health_changes(self, clock):
+        """Test that repeated results do not add entries."""
+        history = HealthHistory(clock=clock)
+
+        for health in ("healthy", "healthy", "unhealthy", "unhealthy",
+                       "healthy"):
+            history.record("i-a", _status(health))
+            clock.now += 10
+
+        result = history.history("i-a")
+        assert [t["health"] for t in result["transitions"]] == [
+            "healthy", "unhealthy", "healthy"
+        ]
+        assert [t["previous_health"] for t in result["transitions"]] == [
+            None, "healthy", "unhealthy"
+        ]
+        assert result["transitions"][1]["timestamp"] == 20.0
+        assert result["flap_count"] == 2
+        assert not result["truncated"]
+
+    def test_ring_keeps_newest_entries(self, clock):
+        """Test that a full buffer overwrites its oldest transitions."""
+        history = HealthHistory(capacity=3, clock=clock)
+
+        for health in ("healthy", "unhealthy", "healthy", "unhealthy",
+                       "initializing"):
+            history.record("i-a", _status(health))
+            clock.now += 1
+
+        result = history.history("i-a")
+        assert [t["health"] for t in result["transitions"]] == [
+            "healthy", "unhealthy", "initializing"
+        ]
+        assert result["truncated"]
+        # The oldest retained entry was itself a change
+        assert result["flap_count"] == 3
+
+    def test_flap_count_respects_window(self, clock):
+        """Test that only transitions within the window are counted."""
+        history = HealthHistory(clock=clock)
+        for health in ("healthy", "unhealthy", "healthy", "unhealthy"):
+            history.record("i-a", _status(health))
+            clock.now += 100
+
+        assert history.history("i-a", window=1000)["flap_count"] == 3
+        assert history.history("i-a", window=250)["flap_count"] == 2
+        assert history.history("i-a", window=250, flap_threshold=2)[
+            "flapping"
+        ]
+
+    def test_unknown_instance_has_no_history(self):
+        """Test that instances never seen report None."""
+        assert HealthHistory().history("i-zzz") is None
+
+    def test_fleet_size_is_bounded(self, clock):
+        """Test that the least recently seen instances are evicted."""
+        history = HealthHistory(max_instances=2, clock=clock)
+
+        history.record("i-a", _status("healthy"))
+        history.record("i-b", _status("healthy"))
+        history.record("i-a", _status("healthy"))
+        history.record("i-c", _status("healthy"))
+
+        assert len(history) == 2
+        assert history.history("i-b") is None
+        assert history.history("i-a") is not None
+
+    def test_idle_instances_are_evicted(self, clock):
+        """Test that instances unseen for idle_ttl are dropped."""
+        history = HealthHistory(idle_ttl=60, clock=clock)
+        history.record("i-old", _status("healthy"))
+        clock.now += 30
+        history.record("i-new", _status("healthy"))
+        clock.now += 40
+
+        history.record("i-new", _status("healthy"))
+
+        assert history.history("i-old") is None
+        assert history.history("i-new") is not None
+
+    def test_removed_instances_keep_history(self, clock):
+        """Test that a vanished instance's history stays readable."""
+        history = HealthHistory(clock=clock)
+        history.record("i-a", _status("healthy"))
+
+        history.record("i-a", None)
+
+        assert len(history.history("i-a")["transitions"]) == 1
+
+
+class TestBusObservers:
+    """Tests for feeding history from the event bus."""
+
+    def test_observer_sees_unchanged_results(self):
+        """Test that every_result listeners hear repeated results."""
+        bus = HealthEventBus()
+        seen = []
+        changes = []
+        bus.add_listener(lambda i, s: seen.append(i), every_result=True)
+        bus.add_listener(lambda i, s: changes.append(i))
+
+        bus.publish({"i-a": _status("healthy")})
+        bus.publish({"i-a": _status("healthy")})
+
+        assert seen == ["i-a", "i-a"]
+        assert changes == ["i-a"]
+
+    def test_stable_instances_are_not_idle(self, clock):
+        """Test that re-polled instances keep their history."""
+        history = HealthHistory(idle_ttl=60, clock=clock)
+        bus = HealthEventBus()
+        bus.add_listener(history.record, every_result=True)
+
+        bus.publish({"i-a": _status("unhealthy")})
+        for _ in range(5):
+            clock.now += 30
+            bus.publish({"i-a": _status("unhealthy")})
+
+        assert len(history.history("i-a")["transitions"]) == 1
+
+
+class TestHistoryEndpoint:
+    """Tests for GET /api/health/<instance_id>/history."""
+
+    def test_history_reports_flapping(self, mocker):
+        """Test that alternating lookups show up as flapping."""
+        config_class = type("UncachedConfig", (TestingConfig,), {
+            "HEALTH_CACHE_ENABLED": False,
+        })
+        client = create_app(config_class).test_client()
+        lookup = mocker.patch("app.api.routes.get_instance_health")
+        headers = {"X-API-Key": VALID_KEY}
+        for health in ("healthy", "unhealthy", "healthy", "unhealthy"):
+            lookup.return_value = _status(health)
+            client.get("/api/health/i-a/history", headers=headers)
+
+        response = client.get("/api/health/i-a/history", headers=headers)
+
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert data["health"] == "unhealthy"
+        assert [t["health"] for t in data["transitions"]] == [
+            "healthy", "unhealthy", "healthy", "unhealthy"
+        ]
+        assert data["transitions"][0]["timestamp"].endswith("Z")
+        assert data["flap_count"] == 3
+        assert data["flap_threshold"] == 4
+        assert data["flapping"] is False
+
+    def test_plain_lookups_feed_history(self, client, mocker):
+        """Test that /api/health/<id> results are recorded too."""
+        mocker.patch(
+            "app.api.routes.get_instance_health",
+            return_value=_status("healthy"),
+        )
+        headers = {"X-API-Key": VALID_KEY}
+
+        client.get("/api/health/i-a", headers=headers)
+        response = client.get(
+            "/api/health/i-a/history?window=60", headers=headers
+        )
+
+        data = json.loads(response.data)
+        assert data["window_seconds"] == 60
+        assert len(data["transitions"]) == 1
+
+    def test_unknown_instance_returns_404(self, client, mocker):
+        """Test that an instance AWS does not know is not found."""
+        mocker.patch("app.api.routes.get_instance_health", return_value=None)
+
+        response = client.get(
+            "/api/health/i-zzz/history", headers={"X-API-Key": VALID_KEY}
+        )
+
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize("window", ["0", "-5", "soon", "inf"])
+    def test_invalid_window_returns_400(self, client, window):
+        """Test that the window must be a positive number."""
+        response = client.get(
+            f"/api/health/i-a/history?window={window}",
+            headers={"X-API-Key": VALID_KEY},
+        )
+
+        assert response.status_code == 400
+
+    def test_requires_api_key(self, client):
+        """Test that history is protected like other endpoints."""
+        assert client.get("/api/health/i-a/history").status_code == 401
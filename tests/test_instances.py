@@ -0,0 +1,113 @@
+"""Test module for the paginated and streamed instance listing."""
+import json
+
+import pytest
+
+from app.api.routes import decode_cursor, encode_cursor
+from app.config import TestingConfig
+from app.infrastructure.cloud import backend
+from app.main import create_app
+from app.services.poller import fetch_fleet_health
+from app.services.tag_index import InstanceIndex
+
+
+HEADERS = {"X-API-Key": "test-key-1"}
+
+
+@pytest.fixture
+def fleet_app():
+    """App with a fake 250-instance fleet published to the bus."""
+    config_class = type("FleetConfig", (TestingConfig,), {
+        "CLOUD_BACKEND": "fake",
+        "FAKE_FLEET_SIZE": 250,
+    })
+    app = create_app(config_class)
+    fleet = fetch_fleet_health(backend.get_client("us-east-1"))
+    app.extensions["health_events"].publish(fleet, complete=True)
+    app.fleet = fleet
+    return app
+
+
+class TestIndexPaging:
+    """Tests for sorted paging over the instance index."""
+
+    def test_pages_resume_after_removed_cursor(self):
+        """Test that a cursor stays valid when its instance goes away."""
+        index = InstanceIndex()
+        for instance_id in ("i-c", "i-a", "i-d", "i-b"):
+            index.update(instance_id, {"health": "healthy",
+                                       "state": "running"})
+
+        rows, more = index.page(limit=2)
+        assert [i for i, _ in rows] == ["i-a", "i-b"] and more
+        index.update("i-b", None)
+
+        rows, more = index.page(after="i-b", limit=2)
+        assert [i for i, _ in rows] == ["i-c", "i-d"] and not more
+
+    def test_iter_instances_crosses_chunks(self):
+        """Test that iteration yields every instance exactly once."""
+        index = InstanceIndex()
+        for n in range(25):
+            index.update(f"i-{n:03d}", {"health": "healthy"})
+
+        ids = [i for i, _ in index.iter_instances(chunk_size=7)]
+
+        assert ids == [f"i-{n:03d}" for n in range(25)]
+
+
+class TestInstancesEndpoint:
+    """Tests for GET /api/instances."""
+
+    def test_cursor_walk_returns_every_instance_once(self, fleet_app):
+        """Test that following next_cursor visits the fleet in order."""
+        client = fleet_app.test_client()
+        seen = []
+        url = "/api/instances?limit=100"
+        while url:
+            data = client.get(url, headers=HEADERS).get_json()
+            seen += [row["instance_id"] for row in data["instances"]]
+            cursor = data["next_cursor"]
+            url = (
+                f"/api/instances?limit=100&cursor={cursor}" if cursor
+                else None
+            )
+
+        assert seen == sorted(fleet_app.fleet)
+
+    def test_ndjson_streams_rows(self, fleet_app):
+        """Test that NDJSON returns one JSON object per line."""
+        response = fleet_app.test_client().get(
+            "/api/instances",
+            headers={**HEADERS, "Accept": "application/x-ndjson"},
+        )
+
+        lines = response.get_data(as_text=True).splitlines()
+        rows = [json.loads(line) for line in lines]
+        assert response.mimetype == "application/x-ndjson"
+        assert len(rows) == 250
+        assert rows[0]["instance_id"] == min(fleet_app.fleet)
+        assert "tags" in rows[0]
+
+    def test_ndjson_starts_after_cursor(self, fleet_app):
+        """Test that a cursor also applies to the stream."""
+        after = sorted(fleet_app.fleet)[199]
+        response = fleet_app.test_client().get(
+            f"/api/instances?cursor={encode_cursor(after)}",
+            headers={**HEADERS, "Accept": "application/x-ndjson"},
+        )
+
+        assert len(response.get_data(as_text=True).splitlines()) == 50
+
+    @pytest.mark.parametrize("query", [
+        "?limit=0", "?limit=abc", "?limit=5000", "?cursor=not-a-cursor",
+    ])
+    def test_bad_parameters_rejected(self, client, query):
+        """Test that invalid limits and cursors are a 400."""
+        response = client.get(f"/api/instances{query}", headers=HEADERS)
+
+        assert response.status_code == 400
+
+    def test_cursor_round_trip(self):
+        """Test that cursors decode to the instance they encode."""
+        assert decode_cursor(encode_cursor("i-0abc")) == "i-0abc"
@@ -0,0 +1,135 @@
+"""Test module for the background request log writer."""
+import threading
+
+import pytest
+
+from app.infrastructure.logging import logger
+from app.infrastructure.logging.logger import AsyncLogWriter
+
+
+class TestAsyncLogWriter:
+    """Tests for queued, batched log writes."""
+
+    def test_lines_are_written_in_order(self, tmp_path):
+        """Test that queued lines reach the file in order after a flush."""
+        path = tmp_path / "logs" / "api.log"
+        writer = AsyncLogWriter(str(path), batch_size=3, flush_interval=5)
+        writer.start()
+
+        for n in range(7):
+            writer.write(f"line {n}\n")
+        writer.flush()
+
+        assert path.read_text().splitlines() == [
+            f"line {n}" for n in range(7)
+        ]
+        writer.close()
+
+    def test_close_drains_pending_lines(self, tmp_path):
+        """Test that close writes buffered lines before returning."""
+        path = tmp_path / "api.log"
+        writer = AsyncLogWriter(str(path), batch_size=1000,
+                                flush_interval=60)
+        writer.start()
+
+        writer.write("pending\n")
+        writer.close()
+
+        assert path.read_text() == "pending\n"
+
+    def test_drop_policy_counts_overflow(self, tmp_path):
+        """Test that a full queue drops lines and counts them."""
+        writer = AsyncLogWriter(str(tmp_path / "api.log"), queue_size=2)
+
+        # Writer thread not started, so the queue fills up
+        results = [writer.write(f"{n}\n") for n in range(5)]
+
+        assert results == [True, True, False, False, False]
+        assert writer.dropped == 3
+
+    def test_block_policy_waits_for_space(self, tmp_path):
+        """Test that the block policy never drops lines."""
+        path = tmp_path / "api.log"
+        writer = AsyncLogWriter(str(path), queue_size=1, batch_size=1,
+                                overflow="block")
+        writer.write("first\n")
+        done = threading.Event()
+
+        def blocked_write():
+            writer.write("second\n")
+            done.set()
+
+        threading.Thread(target=blocked_write).start()
+        assert not done.wait(timeout=0.1)
+
+        writer.start()
+        assert done.wait(timeout=2)
+        writer.close()
+
+        assert path.read_text() == "first\nsecond\n"
+        assert writer.dropped == 0
+
+    def test_unknown_overflow_policy_rejected(self, tmp_path):
+        """Test that only drop and block policies are accepted."""
+        with pytest.raises(ValueError):
+            AsyncLogWriter(str(tmp_path / "api.log"), overflow="spill")
+
+    def test_failed_write_does_not_stop_writer(self, tmp_path):
+        """Test that a failing write is counted and later lines still land."""
+        path = tmp_path / "api.log"
+        writer = AsyncLogWriter(str(path), batch_size=1, flush_interval=5)
+        real_write = writer.log_file.write
+        calls = []
+
+        def flaky_write(data):
+            calls.append(data)
+            if len(calls) == 1:
+                raise OSError("No space left on device")
+            real_write(data)
+
+        writer.log_file.write = flaky_write
+        writer.start()
+
+        writer.write("lost\n")
+        writer.flush()
+        writer.write("kept\n")
+
+        flushed = threading.Thread(target=writer.flush)
+        flushed.start()
+        flushed.join(timeout=2)
+        assert not flushed.is_alive()
+
+        writer.close()
+        assert writer.write_errors == 1
+        assert path.read_text() == "kept\n"
+
+
+class TestLogRequest:
+    """Tests for log_request with and without the background writer."""
+
+    def test_log_format_is_unchanged(self, tmp_path, monkeypatch):
+        """Test that the synchronous path keeps the existing line format."""
+        monkeypatch.setattr(logger, "LOG_FILE", str(tmp_path / "api.log"))
+        logger.shutdown()
+
+        logger.log_request("GET", "/api/health/i-a", "abcdefghijklmnop",
+                           200, "ok")
+
+        line = (tmp_path / "api.log").read_text()
+        assert line.endswith(
+            " | GET /api/health/i-a | Key: abcdefghij | "
+            "Status: 200 | Result: ok\n"
+        )
+
+    def test_configured_writer_receives_lines(self, tmp_path, monkeypatch):
+        """Test that configure routes log_request through the writer."""
+        monkeypatch.setattr(logger, "LOG_FILE", str(tmp_path / "api.log"))
+        logger.configure({"LOG_ASYNC_ENABLED": True, "LOG_BATCH_SIZE": 1})
+        try:
+            logger.log_request("GET", "/api/health/i-a", "", 401,
+                               "Missing API key")
+            logger._writer.flush()
+        finally:
+            logger.shutdown()
+
+        assert "Key: N/A | Status: 401" in (tmp_path / "api.log").read_text()
@@ -0,0 +1,148 @@
+"""Test module for Prometheus-compatible metrics."""
+import threading
+
+import pytest
+
+from app.infrastructure.metrics.prometheus import (
+    Counter,
+    Histogram,
+    render_metrics,
+    reset_metrics,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    """Start every test with empty process-wide metrics."""
+    reset_metrics()
+    yield
+    reset_metrics()
+
+
+class TestMetricTypes:
+    """Tests for counter and histogram recording and rendering."""
+
+    def test_counter_merges_shards_across_threads(self):
+        """Test that increments from many threads are all counted."""
+        counter = Counter("test_total", "Test counter.", ("status",))
+
+        def work():
+            for _ in range(1000):
+                counter.inc(status=200)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert counter.values() == {("200",): 8000}
+        assert 'test_total{status="200"} 8000' in counter.render()
+
+    def test_histogram_renders_cumulative_buckets(self):
+        """Test bucket, sum and count lines of a histogram."""
+        histogram = Histogram(
+            "test_seconds", "Test histogram.", ("stage",),
+            buckets=(0.1, 1.0)
+        )
+        histogram.observe(0.05, stage="x")
+        histogram.observe(0.5, stage="x")
+        histogram.observe(5, stage="x")
+
+        lines = histogram.render()
+
+        assert 'test_seconds_bucket{stage="x",le="0.1"} 1' in lines
+        assert 'test_seconds_bucket{stage="x",le="1.0"} 2' in lines
+        assert 'test_seconds_bucket{stage="x",le="+Inf"} 3' in lines
+        assert 'test_seconds_sum{stage="x"} 5.55' in lines
+        assert 'test_seconds_count{stage="x"} 3' in lines
+
+
+class TestMetricsEndpoint:
+    """Tests for the /api/metrics endpoint."""
+
+    def test_metrics_report_stages_and_counters(self, client, mocker):
+        """Test that a health request shows up in every metric family."""
+        mocker.patch(
+            "app.api.routes.get_instance_health",
+            return_value={"state": "running", "status_code": "ok",
+                          "health": "healthy"}
+        )
+        headers = {"X-API-Key": "test-key-1"}
+        client.get("/api/health/i-a", headers=headers)
+        client.get("/api/health/i-a", headers={"X-API-Key": "bad"})
+
+        response = client.get("/api/metrics", headers=headers)
+        body = response.data.decode()
+
+        assert response.status_code == 200
+        assert response.mimetype == "text/plain"
+        assert 'health_api_responses_total{status="200"} 1' in body
+        assert 'health_api_responses_total{status="401"} 1' in body
+        assert 'health_api_health_results_total{health="healthy"} 1' in body
+        assert 'stage="api_key_check"' in body
+        assert 'stage="log_write"' in body
+        assert ('health_api_request_duration_seconds_count'
+                '{endpoint="health.health_check"} 2') in body
+        assert '# TYPE health_api_cache_lookups_total counter' in body
+        assert 'health_api_cache_lookups_total{outcome="miss"} 1' in body
+        assert ('health_api_coalescing_calls_total{outcome="executed"} 1'
+                in body)
+
+    def test_ec2_calls_and_errors_are_recorded(self, mocker):
+        """Test that EC2 stages and AWS error codes are counted."""
+        from botocore.exceptions import ClientError
+        from app.services.health_check import get_instance_health
+
+        mock_client = mocker.MagicMock()
+        mocker.patch(
+            "app.infrastructure.cloud.ec2_client.boto3.client",
+            return_value=mock_client
+        )
+        mock_client.describe_instances.side_effect = ClientError(
+            {"Error": {"Code": "RequestLimitExceeded", "Message": "slow"}},
+            "DescribeInstances",
+        )
+
+        with pytest.raises(ClientError):
+            get_instance_health("i-a")
+
+        body = render_metrics()
+        assert 'stage="ec2_describe_instances"' in body
+        assert 'health_api_aws_errors_total{code="RequestLimitExceeded"} 1' \
+            in body
+
+    def test_batch_and_poll_errors_are_recorded(self, mocker):
+        """Test that every EC2 path counts AWS errors, not just lookups."""
+        from botocore.exceptions import ClientError
+        from app.services.health_check import get_instances_health
+        from app.services.poller import fetch_regions_health
+
+        def failing_pages(**kwargs):
+            raise ClientError(
+                {"Error": {"Code": "UnauthorizedOperation",
+                           "Message": "denied"}},
+                "DescribeInstances",
+            )
+            yield
+
+        mock_client = mocker.MagicMock()
+        mock_client.get_paginator.return_value.paginate.side_effect = (
+            failing_pages
+        )
+        mocker.patch(
+            "app.infrastructure.cloud.ec2_client.boto3.client",
+            return_value=mock_client
+        )
+
+        with pytest.raises(ClientError):
+            get_instances_health(["i-a"], region="us-east-1")
+        with pytest.raises(ClientError):
+            fetch_regions_health(["us-east-1"])
+
+        assert ('health_api_aws_errors_total{code="UnauthorizedOperation"} 2'
+                in render_metrics())
+
+    def test_metrics_require_api_key(self, client):
+        """Test that metrics are protected like other endpoints."""
+        assert client.get("/api/metrics").status_code == 401
@@ -0,0 +1,150 @@
+"""Test module for the background fleet poller."""
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+from app.services.poller import FleetPoller, FleetSnapshot
+
+
+def _fleet_client(mocker, instances, statuses):
+    """Build a mock EC2 client that pages through a whole region."""
+    mock_client = mocker.MagicMock()
+
+    def get_paginator(name):
+        paginator = mocker.MagicMock()
+        if name == "describe_instances":
+            paginator.paginate.return_value = [
+                {"Reservations": [{"Instances": [
+                    {"InstanceId": i, "State": {"Name": state}}
+                ]}]}
+                for i, state in instances.items()
+            ]
+        else:
+            paginator.paginate.return_value = [{"InstanceStatuses": [
+                {"InstanceId": i, "InstanceStatus": {"Status": status}}
+                for i, status in statuses.items()
+            ]}]
+        return paginator
+
+    mock_client.get_paginator.side_effect = get_paginator
+    mocker.patch(
+        "app.infrastructure.cloud.ec2_client.boto3.client",
+        return_value=mock_client
+    )
+    return mock_client
+
+
+class TestFleetPoller:
+    """Tests for building and swapping fleet snapshots."""
+
+    def test_poll_once_classifies_whole_fleet(self, mocker):
+        """Test that a poll maps every instance with map_health_status."""
+        _fleet_client(
+            mocker,
+            instances={"i-a": "running", "i-b": "running", "i-c": "stopped"},
+            statuses={"i-a": "ok", "i-b": "impaired", "i-c": "not-applicable"},
+        )
+        poller = FleetPoller("us-east-1")
+
+        snapshot = poller.poll_once()
+
+        assert poller.snapshot is snapshot
+        assert len(snapshot) == 3
+        assert snapshot.get("i-a")["health"] == "healthy"
+        assert snapshot.get("i-b")["health"] == "initializing"
+        assert snapshot.get("i-c")["health"] == "stopped"
+        assert snapshot.get("i-missing") is None
+
+    def test_snapshot_is_read_only(self):
+        """Test that a published snapshot cannot be mutated."""
+        snapshot = FleetSnapshot({}, datetime.utcnow(), time.monotonic())
+
+        with pytest.raises(TypeError):
+            snapshot.instances["i-a"] = {}
+
+    def test_failed_poll_keeps_previous_snapshot(self, mocker):
+        """Test that AWS errors leave the last good snapshot in place."""
+        _fleet_client(mocker, instances={"i-a": "running"}, statuses={})
+        poller = FleetPoller("us-east-1", interval=0.01)
+        good = poller.poll_once()
+        mocker.patch(
+            "app.services.poller.fetch_fleet_health",
+            side_effect=Exception("Throttling")
+        )
+
+        poller.start()
+        deadline = time.monotonic() + 2
+        while poller.last_error is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        poller.stop()
+
+        assert poller.snapshot is good
+        assert str(poller.last_error) == "Throttling"
+
+
+class TestSnapshotBackedEndpoint:
+    """Tests for answering /api/health/<instance_id> from a snapshot."""
+
+    def test_endpoint_served_from_snapshot(self, app, client, mocker):
+        """Test that a ready snapshot answers without calling AWS."""
+        health_mock = mocker.patch("app.api.routes.get_instance_health")
+        poller = FleetPoller("us-east-1")
+        poller.snapshot = FleetSnapshot(
+            {"i-a": {"state": "running", "status_code": "failed",
+                     "health": "unhealthy"}},
+            datetime.utcnow(),
+            time.monotonic(),
+        )
+        app.extensions["fleet_poller"] = poller
+
+        headers = {"X-API-Key": "test-key-1"}
+        found = client.get("/api/health/i-a", headers=headers)
+        missing = client.get("/api/health/i-zzz", headers=headers)
+
+        assert found.status_code == 200
+        assert json.loads(found.data)["health"] == "unhealthy"
+        assert missing.status_code == 404
+        assert not health_mock.called
+
+    def test_snapshot_answers_conditional_get(self, app, client, mocker):
+        """Test that a 304 is decided from the snapshot alone."""
+        health_mock = mocker.patch("app.api.routes.get_instance_health")
+        poller = FleetPoller("us-east-1", interval=30)
+        poller.snapshot = FleetSnapshot(
+            {"i-a": {"state": "running", "status_code": "ok",
+                     "health": "healthy"}},
+            datetime.utcnow(),
+            time.monotonic(),
+        )
+        app.extensions["fleet_poller"] = poller
+
+        headers = {"X-API-Key": "test-key-1"}
+        first = client.get("/api/health/i-a", headers=headers)
+        second = client.get(
+            "/api/health/i-a",
+            headers={**headers, "If-None-Match": first.headers["ETag"]},
+        )
+
+        assert first.headers["Cache-Control"] in (
+            "max-age=29", "max-age=30"
+        )
+        assert second.status_code == 304
+        assert not health_mock.called
+
+    def test_endpoint_falls_back_before_first_poll(
+        self, app, client, mocker
+    ):
+        """Test that lookups go to AWS until the first snapshot exists."""
+        mocker.patch(
+            "app.api.routes.get_instance_health",
+            return_value={"state": "running", "status_code": "ok",
+                          "health": "healthy"}
+        )
+        app.extensions["fleet_poller"] = FleetPoller("us-east-1")
+
+        headers = {"X-API-Key": "test-key-1"}
+        response = client.get("/api/health/i-a", headers=headers)
+
+        assert response.status_code == 200
@@ -0,0 +1,307 @@
+"""Test module for multi-region lookup and the region index."""
+import json
+import os
+import threading
+
+import pytest
+
+from app.config import TestingConfig
+from app.infrastructure.cloud.fake_ec2 import FakeFleet
+from app.main import create_app, shutdown_app, stop_background_tasks
+from app.services.regions import RegionIndex, RegionResolver
+
+
+REGIONS = ["us-east-1", "eu-west-1", "ap-south-1"]
+
+
+@pytest.fixture
+def resolver():
+    """Return a resolver over three regions."""
+    resolver = RegionResolver(REGIONS)
+    yield resolver
+    resolver.close()
+
+
+class TestRegionResolver:
+    """Tests for parallel fan-out and learned regions."""
+
+    def test_unknown_instance_fans_out_and_is_remembered(self, resolver):
+        """Test that the region that finds the instance is learned."""
+        calls = []
+        lock = threading.Lock()
+
+        def lookup(region):
+            with lock:
+                calls.append(region)
+            if region == "eu-west-1":
+                return {"health": "healthy"}
+            return None
+
+        assert resolver.resolve("i-a", lookup) == {"health": "healthy"}
+        assert resolver.index.get("i-a") == "eu-west-1"
+
+        calls.clear()
+        assert resolver.resolve("i-a", lookup) == {"health": "healthy"}
+        assert calls == ["eu-west-1"]
+
+    def test_instance_missing_everywhere_returns_none(self, resolver):
+        """Test that None is returned when no region knows the ID."""
+        assert resolver.resolve("i-missing", lambda region: None) is None
+        assert resolver.index.get("i-missing") is None
+
+    def test_moved_instance_triggers_new_search(self, resolver):
+        """Test that a stale index entry falls back to the other regions."""
+        resolver.index.remember("i-a", "us-east-1")
+
+        def lookup(region):
+            return {"region": region} if region == "ap-south-1" else None
+
+        assert resolver.resolve("i-a", lookup) == {"region": "ap-south-1"}
+        assert resolver.index.get("i-a") == "ap-south-1"
+
+    def test_error_raised_only_when_nothing_found(self, resolver):
+        """Test that one failing region does not hide a hit elsewhere."""
+        def lookup(region):
+            if region == "us-east-1":
+                raise RuntimeError("AccessDenied")
+            return {"health": "healthy"} if region == "eu-west-1" else None
+
+        assert resolver.resolve("i-a", lookup) == {"health": "healthy"}
+
+        def failing(region):
+            if region == "us-east-1":
+                raise RuntimeError("AccessDenied")
+            return None
+
+        with pytest.raises(RuntimeError):
+            resolver.resolve("i-b", failing)
+
+
+class TestResolveMany:
+    """Tests for batch lookups routed by region."""
+
+    def test_known_instances_go_to_their_region(self, resolver):
+        """Test that remembered instances cost one call per region."""
+        resolver.index.remember("i-a", "eu-west-1")
+        resolver.index.remember("i-b", "eu-west-1")
+        calls = []
+        lock = threading.Lock()
+
+        def lookup(region, ids):
+            with lock:
+                calls.append((region, sorted(ids)))
+            return {i: {"region": region} for i in ids}
+
+        result = resolver.resolve_many(["i-a", "i-b"], lookup)
+
+        assert result == {"i-a": {"region": "eu-west-1"},
+                          "i-b": {"region": "eu-west-1"}}
+        assert calls == [("eu-west-1", ["i-a", "i-b"])]
+
+    def test_unknown_and_moved_instances_are_searched(self, resolver):
+        """Test that the rest are found in any region and remembered."""
+        resolver.index.remember("i-moved", "us-east-1")
+        homes = {"i-new": "ap-south-1", "i-moved": "eu-west-1"}
+
+        def lookup(region, ids):
+            return {i: ({"region": region} if homes.get(i) == region
+                        else None) for i in ids}
+
+        result = resolver.resolve_many(
+            ["i-new", "i-moved", "i-missing"], lookup
+        )
+
+        assert result == {"i-new": {"region": "ap-south-1"},
+                          "i-moved": {"region": "eu-west-1"},
+                          "i-missing": None}
+        assert resolver.index.get("i-new") == "ap-south-1"
+        assert resolver.index.get("i-moved") == "eu-west-1"
+
+    def test_error_raised_only_when_something_is_missing(self, resolver):
+        """Test that a failing region only fails unresolved batches."""
+        def lookup(region, ids):
+            if region == "us-east-1":
+                raise RuntimeError("AccessDenied")
+            return {i: {"region": region} if i == "i-a" else None
+                    for i in ids}
+
+        assert resolver.resolve_many(["i-a"], lookup) == {
+            "i-a": {"region": "eu-west-1"}
+        }
+        with pytest.raises(RuntimeError):
+            resolver.resolve_many(["i-a", "i-missing"], lookup)
+
+
+class TestRegionIndex:
+    """Tests for bounding and persisting the region index."""
+
+    def test_index_is_bounded(self):
+        """Test that the least recently used entries are evicted."""
+        index = RegionIndex(max_entries=2)
+        index.remember("i-a", "us-east-1")
+        index.remember("i-b", "us-east-1")
+        index.get("i-a")
+        index.remember("i-c", "us-east-1")
+
+        assert len(index) == 2
+        assert index.get("i-b") is None
+        assert index.get("i-a") == "us-east-1"
+
+    def test_index_survives_restart(self, tmp_path):
+        """Test that a saved index is loaded by a new resolver."""
+        path = str(tmp_path / "regions.json")
+        first = RegionResolver(REGIONS, index_path=path)
+        first.index.remember("i-a", "eu-west-1")
+        first.close()
+
+        assert json.loads(open(path).read()) == {"i-a": "eu-west-1"}
+
+        second = RegionResolver(REGIONS, index_path=path)
+        assert second.index.get("i-a") == "eu-west-1"
+        second.close()
+
+    def test_unchanged_index_is_not_saved(self, tmp_path):
+        """Test that a process that learned nothing leaves the file alone."""
+        path = str(tmp_path / "regions.json")
+        master = RegionIndex()
+        master.load(path)
+        worker = RegionIndex()
+        worker.load(path)
+        worker.remember("i-learned", "eu-west-1")
+
+        assert worker.save(path) is True
+        assert master.save(path) is False
+        assert json.loads(open(path).read()) == {"i-learned": "eu-west-1"}
+
+    def test_concurrent_savers_merge(self, tmp_path):
+        """Test that workers saving one file keep each other's entries."""
+        path = str(tmp_path / "regions.json")
+        seed = RegionIndex()
+        seed.remember("i-gone", "us-east-1")
+        seed.remember("i-kept", "us-east-1")
+        seed.save(path)
+        first, second = RegionIndex(), RegionIndex()
+        first.load(path)
+        second.load(path)
+        first.remember("i-a", "eu-west-1")
+        first.forget("i-gone")
+        second.remember("i-b", "ap-south-1")
+
+        threads = [threading.Thread(target=index.save, args=(path,))
+                   for index in (first, second)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert json.loads(open(path).read()) == {
+            "i-kept": "us-east-1", "i-a": "eu-west-1", "i-b": "ap-south-1"
+        }
+        assert not [name for name in os.listdir(tmp_path)
+                    if name.endswith(".tmp")]
+        assert not first.changed and not second.changed
+
+    def test_preforked_master_keeps_worker_entries(self, tmp_path):
+        """Test that shutting down the master after a worker loses nothing."""
+        path = str(tmp_path / "regions.json")
+        config_class = type("IndexedConfig", (TestingConfig,), {
+            "AWS_REGIONS": REGIONS,
+            "REGION_INDEX_PATH": path,
+        })
+        app = create_app(config_class)
+        pid = os.fork()
+        if pid == 0:
+            # Worker: learn an entry and save it on exit
+            try:
+                app.extensions["region_resolver"].index.remember(
+                    "i-learned", "eu-west-1"
+                )
+                shutdown_app(app)
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+
+        shutdown_app(app)
+
+        assert json.loads(open(path).read()) == {"i-learned": "eu-west-1"}
+
+
+class TestMultiRegionEndpoint:
+    """Tests for multi-region lookups through the API."""
+
+    def test_endpoint_finds_instance_in_other_region(self, mocker):
+        """Test that /api/health finds instances outside AWS_REGION."""
+        class MultiRegionConfig(TestingConfig):
+            AWS_REGIONS = ["us-east-1", "eu-west-1"]
+
+        def fake_health(instance_id, mode, region=None):
+            if region == "eu-west-1":
+                return {"state": "running", "status_code": "ok",
+                        "health": "healthy"}
+            return None
+
+        mocker.patch(
+            "app.api.routes.get_instance_health", side_effect=fake_health
+        )
+        app = create_app(MultiRegionConfig)
+
+        response = app.test_client().get(
+            "/api/health/i-a", headers={"X-API-Key": "test-key-1"}
+        )
+
+        assert response.status_code == 200
+        resolver = app.extensions["region_resolver"]
+        assert resolver.index.get("i-a") == "eu-west-1"
+        resolver.close()
+
+    @pytest.fixture
+    def fake_config(self):
+        """Two-region config backed by small fake fleets."""
+        return type("FakeRegionsConfig", (TestingConfig,), {
+            "AWS_REGIONS": ["us-east-1", "eu-west-1"],
+            "CLOUD_BACKEND": "fake",
+            "FAKE_FLEET_SIZE": 20,
+            "HEALTH_CACHE_ENABLED": False,
+        })
+
+    def test_poller_snapshot_covers_every_region(self, fake_config):
+        """Test that the fleet poller serves instances from all regions."""
+        config_class = type("PolledConfig", (fake_config,), {
+            "FLEET_POLLER_ENABLED": True,
+        })
+        app = create_app(config_class)
+        poller = app.extensions["fleet_poller"]
+        poller.stop()
+        poller.poll_once()
+        instance_id = FakeFleet("eu-west-1", size=20).ordered_ids[0]
+
+        response = app.test_client().get(
+            f"/api/health/{instance_id}", headers={"X-API-Key": "test-key-1"}
+        )
+        stop_background_tasks(app)
+        app.extensions["region_resolver"].close()
+
+        assert response.status_code == 200
+        assert len(poller.snapshot) == 40
+
+    def test_batch_finds_instances_in_every_region(self, fake_config):
+        """Test that POST /api/health/batch routes IDs to their regions."""
+        app = create_app(fake_config)
+        ids = [
+            FakeFleet("us-east-1", size=20).ordered_ids[0],
+            FakeFleet("eu-west-1", size=20).ordered_ids[0],
+            "i-missing",
+        ]
+
+        response = app.test_client().post(
+            "/api/health/batch", json={"instance_ids": ids},
+            headers={"X-API-Key": "test-key-1"},
+        )
+        resolver = app.extensions["region_resolver"]
+        resolver.close()
+
+        results = json.loads(response.data)["results"]
+        assert "health" in results[ids[0]]
+        assert "health" in results[ids[1]]
+        assert results["i-missing"] == {"error": "Instance not found"}
+        assert resolver.index.get(ids[1]) == "eu-west-1"
@@ -0,0 +1,207 @@
+"""Test module for the outbound EC2 rate limiter and circuit breaker."""
+import pytest
+from botocore.exceptions import ClientError
+
+from app.config import TestingConfig
+from app.infrastructure.cloud import backend, resilience
+from app.infrastructure.cloud.fake_ec2 import FakeEC2Client, FakeFleet
+from app.infrastructure.cloud.resilience import (
+    AdaptiveTokenBucket,
+    CircuitBreaker,
+    CircuitOpenError,
+    Guard,
+    GuardedEC2Client,
+    RateLimitedError,
+)
+from app.main import create_app
+from app.services.poller import fetch_fleet_health
+
+
+VALID_KEY = "test-key-1"
+
+
+class TestAdaptiveTokenBucket:
+    """Tests for the shared outbound token bucket."""
+
+    def test_rejects_once_burst_is_spent(self, clock):
+        """Test that calls beyond the burst are refused without waiting."""
+        bucket = AdaptiveTokenBucket(
+            rate=10, burst=3, max_wait=0.0, clock=clock
+        )
+
+        assert [bucket.acquire() for _ in range(4)] == [
+            True, True, True, False
+        ]
+        clock.now += 0.1
+        assert bucket.acquire() is True
+
+    def test_waits_for_token_within_budget(self, clock):
+        """Test that callers sleep for a token up to max_wait."""
+        sleeps = []
+        bucket = AdaptiveTokenBucket(
+            rate=10, burst=1, max_wait=0.5, clock=clock,
+            sleep=sleeps.append,
+        )
+
+        assert bucket.acquire() is True
+        assert bucket.acquire() is True
+        assert sleeps == [pytest.approx(0.1)]
+
+    def test_throttling_halves_rate_and_success_restores_it(self, clock):
+        """Test additive-increase, multiplicative-decrease backoff."""
+        bucket = AdaptiveTokenBucket(
+            rate=20, burst=5, min_rate=4, increase=1, clock=clock
+        )
+
+        bucket.on_throttled()
+        bucket.on_throttled()
+        bucket.on_throttled()
+        assert bucket.rate == 4
+
+        for _ in range(3):
+            bucket.on_success()
+        assert bucket.rate == 7
+        for _ in range(50):
+            bucket.on_success()
+        assert bucket.rate == 20
+
+
+class TestCircuitBreaker:
+    """Tests for the consecutive-failure circuit breaker."""
+
+    def test_opens_after_threshold_and_fails_fast(self, clock):
+        """Test that the circuit opens after N consecutive failures."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10,
+                                 clock=clock)
+
+        breaker.on_failure()
+        breaker.before_call()
+        breaker.on_failure()
+
+        with pytest.raises(CircuitOpenError) as error:
+            breaker.before_call()
+        assert error.value.retry_after == 10
+
+    def test_half_open_probe_closes_or_reopens(self, clock):
+        """Test that one probe is allowed after the reset timeout."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5,
+                                 clock=clock)
+        breaker.on_failure()
+
+        clock.now = 5
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.on_failure()
+        assert breaker.state == resilience.CIRCUIT_OPEN
+
+        clock.now = 10
+        breaker.before_call()
+        breaker.on_success()
+        assert breaker.state == resilience.CIRCUIT_CLOSED
+        assert breaker.snapshot()["times_opened"] == 2
+
+
+class TestGuard:
+    """Tests for guarded EC2 clients."""
+
+    def test_client_errors_do_not_trip_breaker(self):
+        """Test that NotFound is not counted as an upstream failure."""
+        breaker = CircuitBreaker(failure_threshold=1)
+        client = GuardedEC2Client(
+            FakeEC2Client(FakeFleet("us-east-1", size=1)),
+            Guard(breaker=breaker),
+        )
+
+        with pytest.raises(ClientError):
+            client.describe_instances(InstanceIds=["i-missing"])
+
+        assert breaker.state == resilience.CIRCUIT_CLOSED
+
+    def test_throttling_backs_off_and_opens_circuit(self):
+        """Test that throttled calls slow the limiter and open the circuit."""
+        limiter = AdaptiveTokenBucket(rate=100, burst=100)
+        breaker = CircuitBreaker(failure_threshold=2)
+        fake = FakeEC2Client(
+            FakeFleet("us-east-1", size=1), error_rate=1.0,
+            error_codes=("RequestLimitExceeded",),
+        )
+        client = GuardedEC2Client(fake, Guard(limiter, breaker))
+
+        for _ in range(2):
+            with pytest.raises(ClientError):
+                client.describe_instance_status(IncludeAllInstances=True)
+        with pytest.raises(CircuitOpenError):
+            client.describe_instance_status(IncludeAllInstances=True)
+
+        assert limiter.rate == 25
+        assert fake.calls == 2
+
+    def test_paginator_pages_are_guarded(self):
+        """Test that each page fetch takes a limiter token."""
+        limiter = AdaptiveTokenBucket(rate=1, burst=4, max_wait=0.0)
+        client = GuardedEC2Client(
+            FakeEC2Client(FakeFleet("us-east-1", size=2500)),
+            Guard(limiter=limiter),
+        )
+
+        # Six pages fit in neither a burst of four nor the wait budget
+        with pytest.raises(RateLimitedError):
+            fetch_fleet_health(client)
+        assert limiter.rejected == 1
+
+
+class TestCircuitBreakerEndpoints:
+    """Tests for degraded responses and the upstream state endpoint."""
+
+    @pytest.fixture
+    def fake_app(self):
+        """App on the fake backend with a one-failure circuit breaker."""
+        config_class = type("FakeConfig", (TestingConfig,), {
+            "CLOUD_BACKEND": "fake",
+            "FAKE_FLEET_SIZE": 5,
+            "CIRCUIT_FAILURE_THRESHOLD": 1,
+            "HEALTH_CACHE_TTL": 0,
+            "HEALTH_CACHE_STALE_TTL": 0,
+        })
+        return create_app(config_class)
+
+    def test_open_circuit_serves_last_known_result(self, fake_app):
+        """Test that cached results are served while the circuit is open."""
+        fake = backend.get_backend().get_client("us-east-1")
+        instance_id = fake.fleet.ordered_ids[0]
+        client = fake_app.test_client()
+        headers = {"X-API-Key": VALID_KEY}
+
+        assert client.get(
+            f"/api/health/{instance_id}", headers=headers
+        ).status_code == 200
+
+        fake.error_rate = 1.0
+        assert client.get(
+            f"/api/health/{instance_id}", headers=headers
+        ).status_code == 500
+
+        response = client.get(f"/api/health/{instance_id}", headers=headers)
+        assert response.status_code == 200
+        assert response.get_json()["stale"] is True
+
+        other_id = fake.fleet.ordered_ids[1]
+        response = client.get(f"/api/health/{other_id}", headers=headers)
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) >= 1
+
+    def test_upstream_endpoint_reports_state(self, fake_app):
+        """Test that the breaker and limiter state are exposed."""
+        response = fake_app.test_client().get(
+            "/api/upstream", headers={"X-API-Key": VALID_KEY}
+        )
+
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body["circuit"]["state"] == "closed"
+        assert body["rate_limiter"]["configured_rate"] == 20
+
+    def test_upstream_endpoint_requires_api_key(self, client):
+        """Test that the state endpoint is authenticated."""
+        assert client.get("/api/upstream").status_code == 401
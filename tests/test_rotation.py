@@ -0,0 +1,158 @@
+"""Test module for request log rotation."""
+import gzip
+import os
+import threading
+
+from app.infrastructure.logging.rotation import RotatingLogFile
+
+
+class TestRotatingLogFile:
+    """Tests for size, age and retention handling."""
+
+    def test_rotates_when_size_exceeded(self, tmp_path):
+        """Test that a write crossing max_bytes starts a new file."""
+        path = tmp_path / "api.log"
+        log_file = RotatingLogFile(str(path), max_bytes=20, backup_count=5)
+
+        log_file.write("a" * 15 + "\n")
+        log_file.write("b" * 15 + "\n")
+        log_file.close()
+
+        segments = log_file.segments()
+        assert len(segments) == 1
+        assert open(segments[0]).read() == "a" * 15 + "\n"
+        assert path.read_text() == "b" * 15 + "\n"
+
+    def test_rotates_when_age_exceeded(self, tmp_path, monkeypatch):
+        """Test that a file older than max_age is rotated."""
+        clock = [100.0]
+        monkeypatch.setattr(
+            "app.infrastructure.logging.rotation.time.time",
+            lambda: clock[0]
+        )
+        path = tmp_path / "api.log"
+        log_file = RotatingLogFile(str(path), max_age=60)
+
+        log_file.write("old\n")
+        clock[0] += 61
+        log_file.write("new\n")
+        log_file.close()
+
+        assert path.read_text() == "new\n"
+        assert len(log_file.segments()) == 1
+
+    def test_reopened_file_keeps_its_age(self, tmp_path):
+        """Test that age comes from the first line, not the open time."""
+        path = tmp_path / "api.log"
+        path.write_text("2020-01-01 00:00:00 | GET /api/health | old\n")
+        log_file = RotatingLogFile(str(path), max_age=3600)
+
+        log_file.write("first write\n")
+        log_file.write("second write\n")
+        log_file.close()
+
+        segments = log_file.segments()
+        assert len(segments) == 1
+        assert open(segments[0]).read().startswith("2020-01-01")
+        assert path.read_text() == "first write\nsecond write\n"
+
+    def test_size_is_counted_in_bytes(self, tmp_path):
+        """Test that multi-byte characters count towards max_bytes."""
+        path = tmp_path / "api.log"
+        log_file = RotatingLogFile(str(path), max_bytes=10)
+
+        log_file.write("\u00e9" * 4)
+        log_file.write("\u00e9" * 4)
+        log_file.close()
+
+        assert path.stat().st_size == 8
+        assert len(log_file.segments()) == 1
+
+    def test_retention_keeps_newest_segments(self, tmp_path):
+        """Test that only backup_count segments survive."""
+        path = tmp_path / "api.log"
+        log_file = RotatingLogFile(str(path), max_bytes=5, backup_count=2)
+
+        for n in range(5):
+            log_file.write(f"{n}" * 5)
+        log_file.close()
+
+        segments = log_file.segments()
+        assert [open(s).read() for s in segments] == ["22222", "33333"]
+        assert path.read_text() == "44444"
+
+    def test_rotated_segments_are_gzipped(self, tmp_path, monkeypatch):
+        """Test that compression produces .gz segments off-thread."""
+        monkeypatch.setattr(
+            "app.infrastructure.logging.rotation.REOPEN_GRACE", 0.0
+        )
+        path = tmp_path / "api.log"
+        log_file = RotatingLogFile(
+            str(path), max_bytes=5, backup_count=3, compress=True
+        )
+
+        log_file.write("first")
+        log_file.write("second")
+        log_file.close()
+
+        segments = log_file.segments()
+        assert len(segments) == 1
+        assert segments[0].endswith(".gz")
+        assert gzip.open(segments[0]).read() == b"first"
+        assert not [
+            s for s in os.listdir(tmp_path)
+            if s.startswith("api.log.") and not s.endswith((".gz", ".lock"))
+        ]
+
+
+class TestSharedLogFile:
+    """Tests for several processes writing one rotating log file."""
+
+    def test_other_writer_reopens_instead_of_rotating_again(self, tmp_path):
+        """Test that a file rotated by one writer is reopened by another."""
+        path = tmp_path / "api.log"
+        first = RotatingLogFile(str(path), max_bytes=10, backup_count=5)
+        second = RotatingLogFile(str(path), max_bytes=10, backup_count=5)
+
+        first.write("aaaaaaaa\n")
+        second.flush()
+        second.write("b\n")
+        first.flush()
+        first.write("cccccccc\n")
+        second.write("d\n")
+        first.close()
+        second.close()
+
+        segments = first.segments()
+        assert [open(s).read() for s in segments] == ["aaaaaaaa\nb\n"]
+        assert path.read_text() == "cccccccc\nd\n"
+
+    def test_concurrent_writers_lose_no_lines(self, tmp_path):
+        """Test that every line survives writers rotating one path."""
+        path = tmp_path / "api.log"
+
+        def writer(name):
+            log_file = RotatingLogFile(
+                str(path), max_bytes=200, backup_count=1000
+            )
+            for n in range(300):
+                log_file.write(f"{name}-{n}\n")
+                log_file.flush()
+            log_file.close()
+
+        threads = [threading.Thread(target=writer, args=(name,))
+                   for name in ("first", "second", "third")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        segments = RotatingLogFile(str(path)).segments()
+        lines = path.read_text().splitlines()
+        for segment in segments:
+            lines.extend(open(segment).read().splitlines())
+        assert sorted(lines) == sorted(
+            f"{name}-{n}" for name in ("first", "second", "third")
+            for n in range(300)
+        )
+        assert len(segments) > 3
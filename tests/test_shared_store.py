@@ -0,0 +1,280 @@
+"""Test module for the SQLite snapshot shared between workers."""
+import json
+import multiprocessing
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import TestingConfig
+from app.main import create_app
+from app.services.poller import FleetPoller
+from app.services.shared_store import SharedHealthStore
+
+
+FLEET = {
+    "i-a": {"state": "running", "status_code": "ok", "health": "healthy",
+            "availability_zone": "us-east-1a", "tags": {"env": "prod"}},
+    "i-b": {"state": "stopped", "status_code": "not-applicable",
+            "health": "stopped", "availability_zone": "us-east-1b",
+            "tags": {}},
+}
+
+
+def _claim_in_child(path, results):
+    """Report whether a separate process can take the writer role."""
+    results.put(SharedHealthStore(path).claim_writer())
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    """Path of a fresh shared store database."""
+    return str(tmp_path / "fleet.db")
+
+
+class TestSharedHealthStore:
+    """Tests for writing and reading stored snapshots."""
+
+    def test_round_trip(self, store_path):
+        """Test that a written snapshot reads back unchanged."""
+        store = SharedHealthStore(store_path)
+        taken_at = datetime.utcnow()
+
+        generation = store.write(FLEET, taken_at)
+        snapshot = store.load_snapshot()
+
+        assert generation == 1
+        assert snapshot.generation == 1
+        assert snapshot.taken_at == taken_at
+        assert len(snapshot) == 2
+        assert snapshot.get("i-a") == FLEET["i-a"]
+        assert snapshot.get("i-zzz") is None
+        assert dict(snapshot.instances.items()) == FLEET
+        assert list(snapshot.instances) == ["i-a", "i-b"]
+
+    def test_empty_store_has_no_snapshot(self, store_path):
+        """Test that nothing is served before the first write."""
+        assert SharedHealthStore(store_path).load_snapshot() is None
+
+    def test_write_replaces_previous_snapshot(self, store_path):
+        """Test that instances missing from a new write are removed."""
+        store = SharedHealthStore(store_path)
+        store.write(FLEET, datetime.utcnow())
+
+        generation = store.write({"i-a": FLEET["i-a"]}, datetime.utcnow())
+
+        assert generation == 2
+        assert store.get("i-b") is None
+        assert len(store.load_snapshot()) == 1
+
+    def test_snapshot_survives_reopening(self, store_path):
+        """Test that a new process sees what an earlier one wrote."""
+        SharedHealthStore(store_path).write(FLEET, datetime.utcnow())
+
+        reopened = SharedHealthStore(store_path, role="reader")
+
+        assert reopened.load_snapshot().get("i-b")["health"] == "stopped"
+
+    def test_only_one_writer_at_a_time(self, store_path):
+        """Test that the writer lock is exclusive and can be handed on."""
+        first = SharedHealthStore(store_path)
+        second = SharedHealthStore(store_path)
+
+        assert first.claim_writer()
+        assert first.claim_writer()
+        assert not second.claim_writer()
+
+        first.release_writer()
+        assert second.claim_writer()
+        second.release_writer()
+
+    def test_writer_lock_excludes_other_processes(self, store_path):
+        """Test that another process cannot write while one holds the lock."""
+        store = SharedHealthStore(store_path)
+        assert store.claim_writer()
+        results = multiprocessing.Queue()
+
+        child = multiprocessing.Process(
+            target=_claim_in_child, args=(store_path, results)
+        )
+        child.start()
+        child.join(10)
+        store.release_writer()
+
+        assert results.get(timeout=1) is False
+
+    def test_is_writer_does_not_claim(self, store_path):
+        """Test that is_writer reports the election without taking part."""
+        store = SharedHealthStore(store_path)
+        assert not store.is_writer()
+
+        assert store.claim_writer()
+        assert store.is_writer()
+        store.release_writer()
+        assert not store.is_writer()
+
+    def test_fixed_roles(self, store_path):
+        """Test that explicit roles bypass the election."""
+        assert SharedHealthStore(store_path, role="writer").claim_writer()
+        assert SharedHealthStore(store_path, role="writer").is_writer()
+        assert not SharedHealthStore(store_path, role="reader").claim_writer()
+        with pytest.raises(ValueError):
+            SharedHealthStore(store_path, role="leader")
+
+
+class TestPollerWithSharedStore:
+    """Tests for polling through a shared store."""
+
+    def test_writer_polls_and_stores(self, store_path, mocker):
+        """Test that the writer fetches from AWS and saves the snapshot."""
+        fetch = mocker.patch(
+            "app.services.poller.fetch_fleet_health", return_value=FLEET
+        )
+        mocker.patch("app.services.poller.get_client")
+        store = SharedHealthStore(store_path)
+        poller = FleetPoller("us-east-1", interval=30, store=store)
+
+        snapshot = poller.poll_once()
+        poller.stop()
+
+        assert fetch.call_count == 1
+        assert snapshot.generation == 1
+        assert store.load_snapshot().get("i-a")["health"] == "healthy"
+
+    def test_reader_serves_stored_snapshot_without_aws(
+        self, store_path, mocker
+    ):
+        """Test that non-writers never call AWS."""
+        fetch = mocker.patch("app.services.poller.fetch_fleet_health")
+        writer = SharedHealthStore(store_path)
+        writer.claim_writer()
+        writer.write(FLEET, datetime.utcnow())
+        published = []
+        poller = FleetPoller(
+            "us-east-1", store=SharedHealthStore(store_path)
+        )
+        poller.add_listener(published.append)
+
+        first = poller.poll_once()
+        second = poller.poll_once()
+        writer.write({"i-a": FLEET["i-a"]}, datetime.utcnow())
+        third = poller.poll_once()
+        writer.release_writer()
+
+        assert not fetch.called
+        assert first is second
+        assert first.get("i-a") == FLEET["i-a"]
+        assert third.generation == 2
+        assert len(published) == 2
+
+    def test_reader_waits_for_first_snapshot(self, store_path, mocker):
+        """Test that a reader serves nothing until the writer has written."""
+        writer = SharedHealthStore(store_path)
+        writer.claim_writer()
+        poller = FleetPoller("us-east-1", store=SharedHealthStore(store_path))
+
+        assert poller.poll_once() is None
+        writer.release_writer()
+
+    def test_restart_serves_warm_snapshot(self, store_path, mocker):
+        """Test that a fresh stored snapshot is reused after a restart."""
+        fetch = mocker.patch("app.services.poller.fetch_fleet_health")
+        SharedHealthStore(store_path).write(FLEET, datetime.utcnow())
+        poller = FleetPoller(
+            "us-east-1", interval=30, store=SharedHealthStore(store_path)
+        )
+
+        snapshot = poller.poll_once()
+        poller.stop()
+
+        assert not fetch.called
+        assert snapshot.get("i-b")["health"] == "stopped"
+
+    def test_writer_refreshes_old_snapshot(self, store_path, mocker):
+        """Test that the writer polls once the stored snapshot ages."""
+        fetch = mocker.patch(
+            "app.services.poller.fetch_fleet_health", return_value=FLEET
+        )
+        mocker.patch("app.services.poller.get_client")
+        SharedHealthStore(store_path).write(
+            FLEET, datetime.utcnow() - timedelta(seconds=40)
+        )
+        poller = FleetPoller(
+            "us-east-1", interval=30, store=SharedHealthStore(store_path)
+        )
+
+        snapshot = poller.poll_once()
+        poller.stop()
+
+        assert fetch.call_count == 1
+        assert snapshot.generation == 2
+
+    def test_writer_polls_no_more_than_once_per_interval(
+        self, store_path, mocker
+    ):
+        """Test that store checks within an interval never poll AWS."""
+        fetch = mocker.patch(
+            "app.services.poller.fetch_fleet_health", return_value=FLEET
+        )
+        mocker.patch("app.services.poller.get_client")
+        SharedHealthStore(store_path).write(
+            FLEET, datetime.utcnow() - timedelta(seconds=20)
+        )
+        poller = FleetPoller(
+            "us-east-1", interval=30, store=SharedHealthStore(store_path)
+        )
+
+        for _ in range(5):
+            poller.poll_once()
+        poller.stop()
+
+        assert not fetch.called
+
+    def test_background_writer_keeps_the_poll_interval(
+        self, store_path, mocker
+    ):
+        """Test that the writer's loop polls AWS as often as no store."""
+        mocker.patch("app.services.poller.STORE_CHECK_INTERVAL", 0.05)
+        fetch = mocker.patch(
+            "app.services.poller.fetch_fleet_health", return_value=FLEET
+        )
+        mocker.patch("app.services.poller.get_client")
+        poller = FleetPoller(
+            "us-east-1", interval=0.5, store=SharedHealthStore(store_path)
+        )
+
+        poller.start()
+        time.sleep(1.2)
+        poller.stop()
+
+        # Polls at about 0, 0.5 and 1.0 seconds, despite ~24 store checks
+        assert 2 <= fetch.call_count <= 3
+
+
+class TestSharedStoreEndpoint:
+    """Tests for serving /api/health/<instance_id> from the shared store."""
+
+    def test_worker_answers_from_stored_snapshot(self, store_path, mocker):
+        """Test that an app configured as a reader serves stored data."""
+        health_mock = mocker.patch("app.api.routes.get_instance_health")
+        SharedHealthStore(store_path).write(FLEET, datetime.utcnow())
+        config_class = type("SharedConfig", (TestingConfig,), {
+            "FLEET_POLLER_ENABLED": True,
+            "SHARED_STORE_PATH": store_path,
+            "SHARED_STORE_ROLE": "reader",
+        })
+        app = create_app(config_class)
+        poller = app.extensions["fleet_poller"]
+        poller.stop()
+        poller.poll_once()
+
+        response = app.test_client().get(
+            "/api/health/i-a", headers={"X-API-Key": "test-key-1"}
+        )
+
+        assert response.status_code == 200
+        assert json.loads(response.data)["health"] == "healthy"
+        assert not health_mock.called
+        assert app.extensions["instance_index"].query(
+            [[("tag", "env", "prod")]]
+        ).keys() == {"i-a"}
@@ -0,0 +1,118 @@
+"""Test module for the incrementally maintained fleet summary."""
+from collections import Counter
+
+import pytest
+
+from app.config import TestingConfig
+from app.infrastructure.cloud import backend
+from app.main import create_app
+from app.services.poller import fetch_fleet_health
+from app.services.summary import FleetSummary
+
+
+VALID_KEY = "test-key-1"
+
+
+class TestFleetSummary:
+    """Tests for incremental count maintenance."""
+
+    def test_counts_move_between_buckets(self, fleet_status):
+        """Test that updates move an instance rather than add it twice."""
+        summary = FleetSummary()
+        summary.update("i-a", fleet_status("healthy", service="web"))
+        summary.update("i-b", fleet_status("healthy", service="db"))
+        summary.update("i-a", fleet_status("unhealthy", service="web"))
+
+        result = summary.summary("tag:service")
+
+        assert result["total"] == 2
+        assert result["by_health"]["healthy"] == 1
+        assert result["by_health"]["unhealthy"] == 1
+        assert result["by_health"]["terminated"] == 0
+        assert result["by_state"] == {"running": 2}
+        assert result["breakdown"]["web"]["by_health"]["unhealthy"] == 1
+        assert result["breakdown"]["web"]["total"] == 1
+
+    def test_removal_drops_empty_groups(self, fleet_status):
+        """Test that removed instances leave no zero-count groups."""
+        summary = FleetSummary()
+        summary.update("i-a", fleet_status("healthy", zone="us-east-1b"))
+        summary.update("i-a", None)
+        summary.update("i-missing", None)
+
+        assert summary.summary("availability_zone")["breakdown"] == {}
+        assert summary.summary()["by_state"] == {}
+        assert summary.dimensions() == []
+
+    def test_lookup_without_placement_keeps_last_seen(self, fleet_status):
+        """Test that single-instance results keep AZ and tags."""
+        summary = FleetSummary()
+        summary.update(
+            "i-a", fleet_status("healthy", zone="us-east-1c", env="prod")
+        )
+        summary.update("i-a", {"state": "stopped",
+                               "status_code": "not-applicable",
+                               "health": "stopped"})
+
+        breakdown = summary.summary("tag:env")["breakdown"]
+        assert breakdown["prod"]["by_health"]["stopped"] == 1
+        assert summary.summary("availability_zone")["breakdown"][
+            "us-east-1c"
+        ]["total"] == 1
+
+
+class TestSummaryEndpoint:
+    """Tests for GET /api/health/summary."""
+
+    @pytest.fixture
+    def fleet_app(self):
+        """App on a fake 300-instance fleet published to the bus."""
+        config_class = type("FleetConfig", (TestingConfig,), {
+            "CLOUD_BACKEND": "fake",
+            "FAKE_FLEET_SIZE": 300,
+        })
+        app = create_app(config_class)
+        fleet = fetch_fleet_health(backend.get_client("us-east-1"))
+        app.extensions["health_events"].publish(fleet, complete=True)
+        app.fleet = fleet
+        return app
+
+    def test_summary_matches_full_scan(self, fleet_app):
+        """Test that maintained counts equal a scan of the fleet."""
+        response = fleet_app.test_client().get(
+            "/api/health/summary?by=tag:service",
+            headers={"X-API-Key": VALID_KEY},
+        )
+
+        assert response.status_code == 200
+        data = response.get_json()
+        expected = Counter(s["health"] for s in fleet_app.fleet.values())
+        assert data["total"] == 300
+        assert {k: v for k, v in data["by_health"].items() if v} == expected
+        assert data["by"] == "tag:service"
+        assert sum(g["total"] for g in data["breakdown"].values()) == 300
+
+    def test_lookups_update_summary(self, fleet_app):
+        """Test that an individual lookup moves the instance's counts."""
+        fake = backend.get_backend().get_client("us-east-1")
+        instance_id = fake.fleet.ordered_ids[0]
+        fake.fleet.set_state(instance_id, "terminated", "not-applicable")
+        client = fleet_app.test_client()
+        headers = {"X-API-Key": VALID_KEY}
+        before = client.get("/api/health/summary", headers=headers)
+
+        client.get(f"/api/health/{instance_id}", headers=headers)
+        after = client.get("/api/health/summary", headers=headers)
+
+        terminated = after.get_json()["by_health"]["terminated"]
+        assert terminated == before.get_json()["by_health"]["terminated"] + 1
+        assert after.get_json()["total"] == 300
+
+    def test_unknown_dimension_rejected(self, client):
+        """Test that an unsupported breakdown is a 400."""
+        response = client.get(
+            "/api/health/summary?by=tag:",
+            headers={"X-API-Key": VALID_KEY},
+        )
+
+        assert response.status_code == 400
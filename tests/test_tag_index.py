@@ -0,0 +1,127 @@
+"""Test module for the tag-indexed fleet query."""
+import pytest
+
+from app.config import TestingConfig
+from app.infrastructure.cloud import backend
+from app.main import create_app
+from app.services.poller import fetch_fleet_health
+from app.services.tag_index import InstanceIndex, parse_tag_filter
+
+
+VALID_KEY = "test-key-1"
+
+
+class TestInstanceIndex:
+    """Tests for in-place posting updates and intersection."""
+
+    @pytest.fixture
+    def index(self, fleet_status):
+        """Index of three instances across two services."""
+        index = InstanceIndex()
+        index.update("i-a", fleet_status("healthy", service="checkout"))
+        index.update("i-b", fleet_status("unhealthy", service="checkout"))
+        index.update("i-c", fleet_status("unhealthy", service="search"))
+        return index
+
+    def test_intersects_filters(self, index):
+        """Test that every filter must match."""
+        matches = index.query([
+            [("tag", "service", "checkout")],
+            [("health", "unhealthy")],
+        ])
+
+        assert list(matches) == ["i-b"]
+
+    def test_alternatives_within_filter_are_unioned(self, index):
+        """Test that comma-separated values match any of them."""
+        matches = index.query([
+            [("health", "healthy"), ("health", "unhealthy")],
+            [("tag", "service", "checkout")],
+        ])
+
+        assert list(matches) == ["i-a", "i-b"]
+
+    def test_updates_refile_in_place(self, index, fleet_status):
+        """Test that changed health and tags move the instance."""
+        index.update("i-b", fleet_status("healthy", service="search"))
+        index.update("i-c", None)
+
+        assert list(index.query([[("tag", "service", "search")]])) == [
+            "i-b"
+        ]
+        assert index.query([[("health", "unhealthy")]]) == {}
+        assert len(index) == 2
+        assert ("tag", "service", "checkout") in index._postings
+        assert ("health", "unhealthy") not in index._postings
+
+    def test_lookup_without_tags_keeps_them(self, index):
+        """Test that single-instance results keep the last seen tags."""
+        index.update("i-a", {"state": "stopped",
+                             "status_code": "not-applicable",
+                             "health": "stopped"})
+
+        matches = index.query([[("tag", "service", "checkout")],
+                               [("health", "stopped")]])
+        assert matches["i-a"]["tags"] == {"service": "checkout"}
+
+    def test_parse_tag_filter(self):
+        """Test both separators and AWS-style keys."""
+        assert parse_tag_filter("service:checkout") == (
+            "service", "checkout"
+        )
+        assert parse_tag_filter("aws:cloudformation:stack-name:api") == (
+            "aws:cloudformation:stack-name", "api"
+        )
+        assert parse_tag_filter("arn=arn:aws:iam::1:role/x") == (
+            "arn", "arn:aws:iam::1:role/x"
+        )
+        with pytest.raises(ValueError):
+            parse_tag_filter("no-separator")
+
+
+class TestHealthQueryEndpoint:
+    """Tests for GET /api/health."""
+
+    @pytest.fixture
+    def fleet_app(self):
+        """App on a fake fleet published to the bus."""
+        config_class = type("FleetConfig", (TestingConfig,), {
+            "CLOUD_BACKEND": "fake",
+            "FAKE_FLEET_SIZE": 300,
+        })
+        app = create_app(config_class)
+        fleet = fetch_fleet_health(backend.get_client("us-east-1"))
+        app.extensions["health_events"].publish(fleet, complete=True)
+        app.fleet = fleet
+        return app
+
+    def test_query_matches_scan(self, fleet_app):
+        """Test that indexed results equal filtering the whole fleet."""
+        response = fleet_app.test_client().get(
+            "/api/health?tag=service:checkout&tag=env=prod"
+            "&health=healthy,unhealthy",
+            headers={"X-API-Key": VALID_KEY},
+        )
+
+        expected = sorted(
+            instance_id for instance_id, s in fleet_app.fleet.items()
+            if s["tags"]["service"] == "checkout"
+            and s["tags"]["env"] == "prod"
+            and s["health"] in ("healthy", "unhealthy")
+        )
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data["count"] == len(expected) > 0
+        assert [i["instance_id"] for i in data["instances"]] == expected
+        assert data["instances"][0]["tags"]["service"] == "checkout"
+
+    @pytest.mark.parametrize("query", [
+        "", "?health=", "?health=sick", "?tag=oops",
+    ])
+    def test_bad_filters_rejected(self, client, query):
+        """Test that missing or malformed filters are a 400."""
+        response = client.get(
+            f"/api/health{query}", headers={"X-API-Key": VALID_KEY}
+        )
+
+        assert response.status_code == 400
@@ -0,0 +1,356 @@
+"""Test module for batched webhook delivery of health changes."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.config import TestingConfig
+from app.main import create_app, stop_background_tasks
+from app.services.events import HealthEventBus
+from app.services.webhooks import (
+    IDEMPOTENCY_HEADER,
+    SIGNATURE_HEADER,
+    WebhookDispatcher,
+    coalesce,
+    sign,
+)
+
+
+VALID_KEY = "test-key-1"
+
+
+def _status(health):
+    """Build a health status dict with the given mapped health."""
+    return {"state": "running", "status_code": "ok", "health": health}
+
+
+class Receiver:
+    """Local HTTP server recording webhook POSTs.
+
+    Answers with the queued status codes in order, then 200. ``delay``
+    makes every response slow.
+    """
+
+    def __init__(self, statuses=(), delay=0.0):
+        self.statuses = list(statuses)
+        self.delay = delay
+        self.requests = []
+        self.received = threading.Condition()
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                time.sleep(receiver.delay)
+                with receiver.received:
+                    status = (
+                        receiver.statuses.pop(0) if receiver.statuses
+                        else 200
+                    )
+                    receiver.requests.append((dict(self.headers), body))
+                    receiver.received.notify_all()
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/hook"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def wait_for(self, count, timeout=5.0):
+        """Wait until ``count`` requests arrived; return their bodies."""
+        with self.received:
+            self.received.wait_for(
+                lambda: len(self.requests) >= count, timeout
+            )
+            return [json.loads(body) for _, body in self.requests]
+
+    def close(self):
+        """Stop the server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def receiver():
+    """A receiver that accepts every POST."""
+    receiver = Receiver()
+    yield receiver
+    receiver.close()
+
+
+def _wait_until(condition, timeout=5.0):
+    """Poll ``condition`` until it holds or the timeout passes."""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestCoalesce:
+    """Tests for reducing events to net changes."""
+
+    def _events(self, *results):
+        bus = HealthEventBus()
+        for instance_id, health in results:
+            bus.publish({instance_id: _status(health)})
+        return bus.wait(0, 0)
+
+    def test_keeps_net_change_per_instance(self):
+        """Test that several transitions collapse into one."""
+        events = self._events(
+            ("i-a", "healthy"), ("i-a", "initializing"),
+            ("i-a", "unhealthy"),
+        )
+
+        changes = coalesce(events)
+
+        assert len(changes) == 1
+        assert changes[0]["previous_health"] == "healthy"
+        assert changes[0]["health"] == "unhealthy"
+        assert changes[0]["transitions"] == 2
+
+    def test_drops_changes_that_cancel_out(self):
+        """Test that an instance back where it started is not sent."""
+        events = self._events(
+            ("i-a", "healthy"), ("i-a", "unhealthy"), ("i-a", "healthy"),
+        )
+
+        assert coalesce(events) == []
+
+    def test_skips_first_sightings_and_removals(self):
+        """Test that only transitions between known health values count."""
+        bus = HealthEventBus()
+        bus.publish({"i-a": _status("healthy"), "i-b": _status("healthy")})
+        bus.publish({"i-a": _status("unhealthy")}, complete=True)
+
+        changes = coalesce(bus.wait(0, 0))
+
+        assert [c["instance_id"] for c in changes] == ["i-a"]
+
+
+class TestWebhookDispatcher:
+    """Tests for delivering batches to a local receiver."""
+
+    def _dispatcher(self, bus, urls, **kwargs):
+        options = {"window": 0.05, "backoff": 0.01, "max_backoff": 0.05}
+        options.update(kwargs)
+        return WebhookDispatcher(bus, urls, **options)
+
+    def test_changes_are_batched_and_signed(self, receiver):
+        """Test that changes within a window arrive in one signed POST."""
+        bus = HealthEventBus()
+        bus.publish({"i-a": _status("healthy"), "i-b": _status("healthy")})
+        dispatcher = self._dispatcher(bus, [receiver.url], secret="s3cret")
+        dispatcher.start()
+
+        bus.publish({"i-a": _status("unhealthy")})
+        bus.publish({"i-b": _status("initializing")})
+        batches = receiver.wait_for(1)
+        dispatcher.stop()
+
+        assert len(batches) == 1
+        assert {
+            (c["instance_id"], c["previous_health"], c["health"])
+            for c in batches[0]["changes"]
+        } == {("i-a", "healthy", "unhealthy"),
+              ("i-b", "healthy", "initializing")}
+        headers, body = receiver.requests[0]
+        assert headers[SIGNATURE_HEADER] == sign(body, "s3cret")
+        assert dispatcher.stats()["delivered"] == 1
+
+    def test_large_batches_are_split(self, receiver):
+        """Test that max_batch bounds the changes per POST."""
+        bus = HealthEventBus()
+        fleet = {f"i-{n}": _status("healthy") for n in range(5)}
+        bus.publish(fleet)
+        dispatcher = self._dispatcher(bus, [receiver.url], max_batch=2)
+        dispatcher.start()
+
+        bus.publish({i: _status("unhealthy") for i in fleet})
+        batches = receiver.wait_for(3)
+        dispatcher.stop()
+
+        assert sorted(len(b["changes"]) for b in batches) == [1, 2, 2]
+
+    def test_failed_deliveries_are_retried(self):
+        """Test that 5xx responses are retried with backoff."""
+        receiver = Receiver(statuses=[503, 500])
+        dispatcher = self._dispatcher(HealthEventBus(), [receiver.url])
+        dispatcher.start()
+
+        dispatcher.dispatch([{"instance_id": "i-a"}])
+        receiver.wait_for(3)
+        assert _wait_until(lambda: dispatcher.stats()["delivered"] == 1)
+        dispatcher.stop()
+        receiver.close()
+
+        assert dispatcher.stats()["retried"] == 2
+        assert dispatcher.stats()["failed"] == 0
+
+    def test_retries_repeat_the_idempotency_key(self):
+        """Test that every attempt carries the batch's random batch_id."""
+        receiver = Receiver(statuses=[503])
+        dispatcher = self._dispatcher(HealthEventBus(), [receiver.url])
+        dispatcher.start()
+
+        dispatcher.dispatch([{"instance_id": "i-a"}])
+        dispatcher.dispatch([{"instance_id": "i-b"}])
+        batches = receiver.wait_for(3)
+        dispatcher.stop()
+        receiver.close()
+
+        keys = [headers[IDEMPOTENCY_HEADER]
+                for headers, _ in receiver.requests]
+        assert keys == [batch["batch_id"] for batch in batches]
+        assert len(set(keys)) == 2
+        assert all(len(key) == 32 for key in keys)
+
+    def test_followers_skip_delivery(self, receiver):
+        """Test that nothing is sent while the leader check is False."""
+        bus = HealthEventBus()
+        bus.publish({"i-a": _status("healthy")})
+        dispatcher = self._dispatcher(
+            bus, [receiver.url], leader=lambda: False
+        )
+        dispatcher.start()
+
+        bus.publish({"i-a": _status("unhealthy")})
+        assert _wait_until(lambda: dispatcher.stats()["skipped"] == 1)
+        dispatcher.stop()
+
+        assert receiver.requests == []
+        assert dispatcher.stats()["delivered"] == 0
+
+    def test_rejected_batches_are_not_retried(self):
+        """Test that a 4xx response fails the delivery at once."""
+        receiver = Receiver(statuses=[400])
+        dispatcher = self._dispatcher(HealthEventBus(), [receiver.url])
+        dispatcher.start()
+
+        dispatcher.dispatch([{"instance_id": "i-a"}])
+        assert _wait_until(lambda: dispatcher.stats()["failed"] == 1)
+        dispatcher.stop()
+        receiver.close()
+
+        assert len(receiver.requests) == 1
+        assert dispatcher.stats()["retried"] == 0
+
+    def test_unreachable_receiver_gives_up(self):
+        """Test that connection errors stop after max_retries."""
+        receiver = Receiver()
+        url = receiver.url
+        receiver.close()
+        dispatcher = self._dispatcher(
+            HealthEventBus(), [url], max_retries=2
+        )
+        dispatcher.start()
+
+        dispatcher.dispatch([{"instance_id": "i-a"}])
+        assert _wait_until(lambda: dispatcher.stats()["failed"] == 1)
+        dispatcher.stop()
+
+        assert dispatcher.stats()["retried"] == 2
+
+    def test_pending_deliveries_are_bounded(self):
+        """Test that batches are dropped rather than queued without end."""
+        receiver = Receiver(delay=0.3)
+        dispatcher = self._dispatcher(
+            HealthEventBus(), [receiver.url], workers=1, max_pending=2
+        )
+        dispatcher.start()
+
+        queued = sum(
+            dispatcher.dispatch([{"instance_id": f"i-{n}"}])
+            for n in range(5)
+        )
+        dispatcher.stop()
+        receiver.close()
+
+        assert queued == 2
+        assert dispatcher.stats()["dropped"] == 3
+
+    def test_rejects_non_http_urls(self):
+        """Test that only http(s) receivers are accepted."""
+        with pytest.raises(ValueError):
+            WebhookDispatcher(HealthEventBus(), ["file:///etc/passwd"])
+
+
+class TestWebhooksInApp:
+    """Tests for webhooks wired into the application."""
+
+    def test_slow_receiver_never_blocks_requests(self, mocker):
+        """Test that lookups return while a delivery is still running."""
+        receiver = Receiver(delay=1.0)
+        config_class = type("WebhookConfig", (TestingConfig,), {
+            "HEALTH_CACHE_ENABLED": False,
+            "WEBHOOK_URLS": [receiver.url],
+            "WEBHOOK_BATCH_WINDOW": 0.01,
+        })
+        app = create_app(config_class)
+        client = app.test_client()
+        lookup = mocker.patch("app.api.routes.get_instance_health")
+        headers = {"X-API-Key": VALID_KEY}
+
+        lookup.return_value = _status("healthy")
+        client.get("/api/health/i-a", headers=headers)
+        lookup.return_value = _status("unhealthy")
+        client.get("/api/health/i-a", headers=headers)
+        receiver.wait_for(1, timeout=0.5)
+
+        started = time.monotonic()
+        lookup.return_value = _status("healthy")
+        response = client.get("/api/health/i-a", headers=headers)
+        elapsed = time.monotonic() - started
+        metrics = client.get("/api/metrics", headers=headers)
+        batches = receiver.wait_for(2)
+        stop_background_tasks(app)
+        receiver.close()
+
+        assert response.status_code == 200
+        assert elapsed < 0.5
+        assert batches[0]["changes"][0]["health"] == "unhealthy"
+        assert b"health_api_webhook_pending" in metrics.data
+
+    def test_only_the_store_writer_delivers(self, tmp_path, mocker):
+        """Test that workers sharing a store elect one webhook sender."""
+        mocker.patch(
+            "app.services.poller.fetch_regions_health", return_value={}
+        )
+        config_class = type("SharedWebhookConfig", (TestingConfig,), {
+            "FLEET_POLLER_ENABLED": True,
+            "SHARED_STORE_PATH": str(tmp_path / "fleet.db"),
+            "WEBHOOK_URLS": ["http://127.0.0.1:9/hook"],
+            "WEBHOOK_BATCH_WINDOW": 0.01,
+        })
+        apps = []
+        for _ in range(2):
+            # One at a time, so the first app is the one that claims
+            app = create_app(config_class)
+            app.extensions["fleet_poller"].stop()
+            app.extensions["fleet_poller"].poll_once()
+            apps.append(app)
+
+        leaders = [app.extensions["webhooks"].leader() for app in apps]
+        for app in apps:
+            stop_background_tasks(app)
+            app.extensions["fleet_poller"].store.release_writer()
+
+        assert leaders == [True, False]
+
+    def test_webhook_role(self):
+        """Test that 'off' disables delivery and unknown roles fail."""
+        config_class = type("SilentConfig", (TestingConfig,), {
+            "WEBHOOK_URLS": ["http://127.0.0.1:9/hook"],
+            "WEBHOOK_ROLE": "off",
+        })
+        assert "webhooks" not in create_app(config_class).extensions
+
+        config_class.WEBHOOK_ROLE = "leader"
+        with pytest.raises(ValueError):
+            create_app(config_class)
@@ -0,0 +1,138 @@
+"""Test module for the production WSGI entry point and gunicorn hooks."""
+import importlib.util
+import os
+import sys
+
+import pytest
+
+from app.config import (
+    DevelopmentConfig,
+    ProductionConfig,
+    TestingConfig,
+    get_config_class,
+)
+from app.infrastructure.logging import logger
+from app.main import create_app, shutdown_app, start_background_tasks
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_gunicorn_config():
+    """Import gunicorn.conf.py the way gunicorn does, by path."""
+    spec = importlib.util.spec_from_file_location(
+        "gunicorn_conf", os.path.join(ROOT, "gunicorn.conf.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestConfigSelection:
+    """Tests for choosing the config class from APP_ENV."""
+
+    def test_app_env_selects_config(self, monkeypatch):
+        """Test that APP_ENV overrides the default."""
+        monkeypatch.setenv("APP_ENV", "Production")
+
+        assert get_config_class() is ProductionConfig
+
+    def test_default_used_without_app_env(self, monkeypatch):
+        """Test the caller's default when APP_ENV is unset."""
+        monkeypatch.delenv("APP_ENV", raising=False)
+
+        assert get_config_class() is DevelopmentConfig
+        assert get_config_class(default="testing") is TestingConfig
+
+    def test_unknown_app_env_rejected(self, monkeypatch):
+        """Test that a typo fails loudly instead of running as dev."""
+        monkeypatch.setenv("APP_ENV", "prod")
+
+        with pytest.raises(ValueError):
+            get_config_class()
+
+
+class TestWsgiEntryPoint:
+    """Tests for wsgi.py and the gunicorn settings."""
+
+    def test_wsgi_builds_app_from_app_env(self, monkeypatch):
+        """Test that wsgi.application uses the APP_ENV config."""
+        monkeypatch.setenv("APP_ENV", "testing")
+        monkeypatch.delitem(sys.modules, "wsgi", raising=False)
+        monkeypatch.syspath_prepend(ROOT)
+
+        import wsgi
+
+        assert wsgi.application.config["TESTING"] is True
+
+    def test_gunicorn_defaults(self, monkeypatch):
+        """Test the threaded, preloaded worker model."""
+        monkeypatch.setenv("GUNICORN_THREADS", "32")
+
+        config = load_gunicorn_config()
+
+        assert config.worker_class == "gthread"
+        assert config.preload_app is True
+        assert config.threads == 32
+        assert config.workers >= 1
+
+    def test_gevent_workers_load_the_app_after_patching(
+        self, monkeypatch, mocker
+    ):
+        """Test that async workers skip preloading and the fork hooks."""
+        monkeypatch.setenv("GUNICORN_WORKER_CLASS", "gevent")
+        config = load_gunicorn_config()
+        start = mocker.patch("app.main.start_background_tasks")
+
+        config.when_ready(None)
+        config.post_fork(None, None)
+
+        assert config.preload_app is False
+        assert config.worker_connections == 1000
+        assert not start.called
+
+    def test_hooks_restart_and_drain(self, mocker):
+        """Test that hooks stop, restart and shut down the app."""
+        config = load_gunicorn_config()
+        app = object()
+        mocker.patch.object(config, "_application", return_value=app)
+        stop = mocker.patch("app.main.stop_background_tasks")
+        start = mocker.patch("app.main.start_background_tasks")
+        shutdown = mocker.patch("app.main.shutdown_app")
+
+        config.when_ready(None)
+        config.post_fork(None, None)
+        config.worker_exit(None, None)
+
+        stop.assert_called_once_with(app)
+        start.assert_called_once_with(app)
+        shutdown.assert_called_once_with(app, timeout=15)
+
+
+class TestBackgroundTasks:
+    """Tests for starting and draining background work."""
+
+    def test_shutdown_drains_log_queue(self, tmp_path):
+        """Test that queued log lines reach disk on shutdown."""
+        config_class = type("AsyncLogConfig", (TestingConfig,), {
+            "LOG_FILE": str(tmp_path / "api.log"),
+            "LOG_ASYNC_ENABLED": True,
+            "LOG_FLUSH_INTERVAL": 60,
+        })
+        app = create_app(config_class)
+        app.test_client().get("/api/health/i-a")
+
+        shutdown_app(app)
+
+        assert "Missing API key" in (tmp_path / "api.log").read_text()
+        assert logger.dropped_lines() is None
+
+    def test_start_restarts_stopped_poller(self, mocker):
+        """Test that a poller stopped before fork is started again."""
+        app = create_app(TestingConfig)
+        poller = mocker.MagicMock()
+        app.extensions["fleet_poller"] = poller
+
+        start_background_tasks(app)
+
+        poller.start.assert_called_once_with()
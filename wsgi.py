@@ -0,0 +1,12 @@
+"""WSGI entry point for production servers.
+
+Usage:
+    gunicorn wsgi:application
+
+The config class comes from APP_ENV and defaults to production here.
+gunicorn also reads ``gunicorn.conf.py`` from the working directory.
+"""
+from app.config import get_config_class
+from app.main import create_app
+
+application = create_app(get_config_class(default="production"))